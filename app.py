@@ -1,548 +1,100 @@
 from flask import Flask, request, jsonify, render_template
 from flask_cors import CORS
-import joblib
-import numpy as np
-import pandas as pd
-import re
-from scipy.sparse import hstack, csr_matrix
+from werkzeug.exceptions import RequestEntityTooLarge
 import os
-from datetime import datetime
-import nltk
-from nltk.corpus import stopwords
-
-# Download stopwords jika belum ada
-nltk.download('stopwords', quiet=True)
+import time
+from campaign_index import CampaignIndex
+from cascade import Cascade, load_domain_list
+from featurizer import NULL_TIMER, DomainReputation, ScanLimits, StageTimer, combine_batches
+from metrics import SIZE_BUCKETS, MetricsRegistry
+from micro_batcher import MicroBatcher, QueueFullError
+from model_registry import ModelHolder, ModelRegistry, ModelValidationError, load_model_state, load_smoke_set
+from prediction_cache import PredictionCache, content_key
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
 
-# Load model dan komponen yang diperlukan
+# Batas input. Email di atas MAX_EMAIL_CHARS ditolak (413); email di atas SCAN_MAX_CHARS
+# tetap diskor tetapi blob base64 dibuang dan hanya jendela awal (SCAN_HEAD_CHARS) +
+# akhir (SCAN_TAIL_CHARS) yang dipindai, ditandai `truncated: true` di response
+MAX_EMAIL_CHARS = int(os.environ.get('MAX_EMAIL_CHARS', 32 * 1024 * 1024))
+MAX_REQUEST_BYTES = int(os.environ.get('MAX_REQUEST_BYTES', 64 * 1024 * 1024))
+app.config['MAX_CONTENT_LENGTH'] = MAX_REQUEST_BYTES
+scan_limits = ScanLimits(
+    max_chars=int(os.environ.get('SCAN_MAX_CHARS', 100000)) or None,
+    head_chars=int(os.environ.get('SCAN_HEAD_CHARS', 80000)),
+    tail_chars=int(os.environ.get('SCAN_TAIL_CHARS', 20000)),
+    blob_min_chars=int(os.environ.get('SCAN_BLOB_MIN_CHARS', 200))
+)
+
+# Instrumentasi per tahap; METRICS_ENABLED=0 mematikan pengukuran di hot path
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '1') != '0'
+
+# Model: versi aktif di registry MODEL_REGISTRY (lihat model_registry.py) jika diset,
+# selain itu direktori model tunggal (bundle jika ada, selain itu file joblib).
+# Setiap versi punya Featurizer (stopword bundle-nya sendiri) dan engine inferensi
+# (INFERENCE_ENGINE / INFERENCE_THREADS); FEATURE_WORKERS > 1 memberi setiap versi
+# pool featurization sendiri. Versi baru divalidasi dengan smoke set (MODEL_SMOKE_SET,
+# opsional MODEL_SMOKE_MIN_ACCURACY) sebelum ditukar; MODEL_WATCH_INTERVAL (detik,
+# 0 mematikan) mengatur seberapa sering CURRENT di registry diperiksa.
 model_dir = 'phishing_detection_model'
-model = joblib.load(os.path.join(model_dir, 'xgboost_phishing_model.pkl'))
-tfidf = joblib.load(os.path.join(model_dir, 'tfidf_vectorizer.pkl'))
-numeric_features = joblib.load(os.path.join(model_dir, 'numeric_features.pkl'))
-target_col = joblib.load(os.path.join(model_dir, 'target_col.pkl'))
-model_metadata = joblib.load(os.path.join(model_dir, 'model_metadata.pkl'))
-
-# Definisikan fungsi preprocessing dan ekstraksi fitur yang sama dengan notebook
-def enhanced_preprocess_combined_text(text):
-    # Ekstraksi komponen penting
-    date_pattern = r'\w{3}\s\w{3}\s\d{1,2}\s\d{4}'
-    sender_pattern = r'[\w\.-]+@[\w\.-]+\.\w+'
-
-    # Ekstraksi tanggal
-    date_match = re.search(date_pattern, text)
-    extracted_date = date_match.group(0) if date_match else ""
-
-    # Ekstraksi pengirim
-    sender_match = re.search(sender_pattern, text)
-    extracted_sender = sender_match.group(0) if sender_match else ""
-
-    # Bersihkan teks dengan penanganan khusus untuk phishing
-    clean_text = re.sub(date_pattern, '', text)
-    clean_text = re.sub(sender_pattern, '', clean_text)
-
-    # Normalisasi karakter evasi
-    clean_text = clean_text.replace('â€', "'")
-    clean_text = clean_text.replace('â€œ', '"')
-    clean_text = clean_text.replace('â€˜', "'")
-
-    # Hapus pola attachment
-    clean_text = re.sub(r'see attached file', '', clean_text, flags=re.IGNORECASE)
-
-    # Hapus karakter khusus tapi pertahankan tanda baca penting
-    clean_text = re.sub(r'[^\w\s\.\!\?]', '', clean_text)
-
-    # Lowercase
-    clean_text = clean_text.lower()
-
-    # Hapus stopwords
-    stop_words = set(stopwords.words('english'))
-    clean_text = ' '.join([word for word in clean_text.split() if word not in stop_words])
-
-    return clean_text, extracted_date, extracted_sender
-
-def extract_phishing_features(text):
-    features = {}
-
-    # ... (kode di sini sama dan tidak berubah) ...
-    # 1. Suspicious Keywords (diperluas)
-    phishing_keywords = [
-        'urgent', 'immediate', 'action required', 'verify your account',
-        'suspended', 'limited time', 'click here', 'update now',
-        'confirm', 'security alert', 'unusual sign-in', 'locked account',
-        'billing issue', 'payment failed', 'account locked', 'verify identity',
-        'secure your account', 'unauthorized access', 'expiring today',
-        'act now', 'limited offer', 'exclusive deal', 'confirm immediately'
-    ]
-    features['suspicious_keyword_count'] = sum(1 for keyword in phishing_keywords if keyword in text.lower())
-
-    # 2. Realistic Suspicious Domains
-    legitimate_short_domains = ['bit.ly', 't.co', 'goo.gl', 'ow.ly', 'buff.ly', 'mcaf.ee']
-    suspicious_short_domains = [
-        'tinyurl.com', 'short.url', 'tiny.cc', 'is.gd', 'adf.ly',
-        'vzturl.com', 'cli.re', 'q.gs', 'u.to', 'yourl.io', 'po.st'
-    ]
-
-    features['has_legitimate_short_domain'] = 1 if any(domain in text.lower() for domain in legitimate_short_domains) else 0
-    features['has_suspicious_short_domain'] = 1 if any(domain in text.lower() for domain in suspicious_short_domains) else 0
-
-    # Deteksi typosquatting
-    legitimate_domains = ['paypal.com', 'amazon.com', 'microsoft.com', 'apple.com', 'google.com']
-    features['has_typosquatting'] = 0
-
-    for domain in legitimate_domains:
-        if domain in text.lower():
-            typo_variations = [
-                domain.replace('.com', '.co'),
-                domain.replace('.com', '.org'),
-                domain.replace('a', '4'), domain.replace('i', '1'),
-                domain.replace('o', '0'), domain.replace('l', '1'),
-                domain.replace('m', 'rn'), domain.replace('n', 'rn')
-            ]
-            if any(typo in text.lower() for typo in typo_variations):
-                features['has_typosquatting'] = 1
-                break
-
-    # Deteksi IP address sebagai URL
-    ip_pattern = r'https?://\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}'
-    features['has_ip_url'] = 1 if re.search(ip_pattern, text) else 0
-
-    # 3. Advanced Capital Word Analysis
-    words = text.split()
-    if words:
-        capital_words = [word for word in words if word.isupper() and len(word) > 1]
-        features['capital_word_ratio'] = len(capital_words) / len(words)
-
-        sentences = re.split(r'[.!?]+', text)
-        all_caps_sentences = sum(1 for sentence in sentences if sentence.strip() and sentence.strip().isupper())
-        features['all_caps_sentences_ratio'] = all_caps_sentences / max(len(sentences), 1)
-
-        # Deteksi kapital tidak wajar
-        brands = ['paypal', 'amazon', 'microsoft', 'apple', 'google', 'facebook']
-        acronyms = ['ID', 'URL', 'HTML', 'PDF', 'CEO', 'CFO']
-        unusual_capitals = 0
-
-        for i, word in enumerate(words):
-            if word.isupper() and len(word) > 1:
-                if i == 0 or words[i-1].endswith(('.', '!', '?')):
-                    continue
-                if word.lower() in brands or word in acronyms:
-                    continue
-                unusual_capitals += 1
-
-        features['unusual_capital_ratio'] = unusual_capitals / len(words)
-    else:
-        features['capital_word_ratio'] = 0
-        features['all_caps_sentences_ratio'] = 0
-        features['unusual_capital_ratio'] = 0
-
-    # 4. Advanced Exclamation Analysis
-    exclamation_count = text.count('!')
-    features['exclamation_count'] = exclamation_count
-    features['exclamation_ratio'] = exclamation_count / max(len(text), 1)
-    features['excessive_exclamation'] = 1 if exclamation_count > 5 else 0
-
-    consecutive_exclamation = len(re.findall(r'!{3,}', text))
-    features['consecutive_exclamation'] = consecutive_exclamation
-
-    exclamation_positions = [i for i, char in enumerate(text) if char == '!']
-    if exclamation_positions:
-        mid_sentence_exclamations = 0
-        for pos in exclamation_positions:
-            if pos + 1 < len(text) and text[pos+1] not in ['.', ' ', '\n']:
-                mid_sentence_exclamations += 1
-        features['mid_sentence_exclamation_ratio'] = mid_sentence_exclamations / len(exclamation_positions)
-    else:
-        features['mid_sentence_exclamation_ratio'] = 0
-
-    # 5. Urgency & Time Pressure
-    urgency_words = ['urgent', 'immediately', 'asap', 'hurry', 'fast', 'quick', 'now', 'today', 'soon']
-    features['urgency_word_count'] = sum(1 for word in urgency_words if word in text.lower())
-
-    time_limit_keywords = ['24 hours', '48 hours', 'by tomorrow', 'today only', 'expires today']
-    features['has_time_limit'] = 1 if any(keyword in text.lower() for keyword in time_limit_keywords) else 0
-
-    # 6. Personal Information Request
-    personal_info_keywords = [
-        'ssn', 'social security', 'credit card', 'bank account',
-        'password', 'pin', 'cvv', 'account number', 'card number',
-        'expiration date', 'security code', 'routing number'
-    ]
-    features['personal_info_request'] = 1 if any(keyword in text.lower() for keyword in personal_info_keywords) else 0
-
-    # 7. Threatening Language
-    threat_keywords = ['suspend', 'terminate', 'close', 'deactivate', 'block', 'restrict', 'penalty', 'fee', 'fine']
-    features['has_threat'] = 1 if any(keyword in text.lower() for keyword in threat_keywords) else 0
-
-    # 8. Generic & Personalization Analysis
-    generic_greetings = ['dear customer', 'dear user', 'dear sir/madam', 'valued customer', 'account holder']
-    features['has_generic_greeting'] = 1 if any(greeting in text.lower() for greeting in generic_greetings) else 0
-
-    personalization_placeholders = ['[name]', '[email]', '[customer]', '[user]']
-    features['has_personalization_placeholder'] = 1 if any(ph in text.lower() for ph in personalization_placeholders) else 0
-
-    # 9. Brand Mentions Analysis
-    brands = ['paypal', 'amazon', 'microsoft', 'apple', 'google', 'facebook', 'instagram']
-    brand_mentions = [brand for brand in brands if brand in text.lower()]
-    features['brand_mention_count'] = len(brand_mentions)
-
-    features['inconsistent_brand_mention'] = 0
-    if brand_mentions:
-        for brand in brand_mentions:
-            suspicious_variations = [
-                brand + 'support', brand + 'security', brand + 'team',
-                brand + 'update', brand + 'alert', brand + 'notice'
-            ]
-            if any(variation in text.lower() for variation in suspicious_variations):
-                features['inconsistent_brand_mention'] = 1
-                break
-
-    # 10. Spelling Errors
-    common_misspellings = {
-        'paypaI': 'paypal', 'appIe': 'apple', 'microsft': 'microsoft',
-        'amaz0n': 'amazon', 'g00gle': 'google', 'faceb00k': 'facebook',
-        'verifye': 'verify', 'securty': 'security', 'acount': 'account'
-    }
-    misspelling_count = sum(1 for misspelling in common_misspellings if misspelling in text.lower())
-    features['spelling_errors_count'] = misspelling_count
-
-    # 11. HTML & Technical Content
-    html_tags = ['<html', '<div', '<table', '<form', '<script', '<iframe']
-    features['has_html_content'] = 1 if any(tag in text.lower() for tag in html_tags) else 0
-
-    features['has_form_submission'] = 1 if '<form' in text.lower() and 'action=' in text.lower() else 0
-    features['has_javascript'] = 1 if 'javascript:' in text.lower() or '<script' in text.lower() else 0
-    features['has_tracking_pixel'] = 1 if any(pixel in text.lower() for pixel in [
-        'tracking pixel', 'open tracking', 'read receipt'
-    ]) else 0
-    features['has_unsubscribe_link'] = 1 if 'unsubscribe' in text.lower() else 0
-
-    # 12. Link Analysis
-    url_pattern = r'https?://[^\s]+'
-    urls = re.findall(url_pattern, text)
-    features['url_count'] = len(urls)
-
-    misleading_anchors = ['click here', 'verify now', 'update account', 'sign in']
-    features['has_misleading_link'] = 0
-
-    for anchor in misleading_anchors:
-        if anchor in text.lower():
-            anchor_pos = text.lower().find(anchor)
-            text_after_anchor = text[anchor_pos + len(anchor):anchor_pos + len(anchor) + 100]
-            if re.search(url_pattern, text_after_anchor):
-                features['has_misleading_link'] = 1
-                break
-
-    # 13. Behavioral Analysis
-    features['multiple_redirects'] = 1 if len(urls) > 3 else 0
-    features['shortened_url_only'] = 1 if (
-        bool(re.search(r'\b(bit\.ly|t\.co|goo\.gl)\b', text)) and len(urls) == 1
-    ) else 0
-    features['image_only_text'] = 1 if (
-        len(re.findall(r'\.(jpg|jpeg|png|gif)', text.lower())) > 0 and len(text.split()) < 20
-    ) else 0
-
-    # 14. Social Engineering Analysis
-    features['authority_impersonation'] = 1 if any(impersonation in text.lower() for impersonation in [
-        'fbi', 'cia', 'irs', 'police', 'government', 'bank', 'court'
-    ]) else 0
-
-    features['scarcity_tactic'] = 1 if any(scarcity in text.lower() for scarcity in [
-        'only 2 left', 'last chance', 'almost gone', 'running out'
-    ]) else 0
-
-    features['social_proof'] = 1 if any(proof in text.lower() for proof in [
-        'trusted by millions', 'used by fortune 500', 'recommended by experts'
-    ]) else 0
-
-    # 15. Psychological Triggers
-    fear_words = ['hack', 'breach', 'compromised', 'stolen', 'fraud', 'suspended']
-    features['fear_intensity'] = sum(1 for fear in fear_words if fear in text.lower())
-
-    greed_words = ['free', 'win', 'prize', 'reward', 'discount', 'bonus']
-    features['greed_trigger'] = sum(1 for greed in greed_words if greed in text.lower())
-
-    curiosity_words = ['see what happened', 'you won\'t believe', 'shocking discovery']
-    features['curiosity_trigger'] = sum(1 for curiosity in curiosity_words if curiosity in text.lower())
-
-    # 16. Action Requests
-    action_keywords = ['click', 'verify', 'update', 'confirm', 'sign in', 'log in', 'download']
-    features['action_request_count'] = sum(1 for keyword in action_keywords if keyword in text.lower())
-
-    # 17. Security Claims
-    security_claims = ['secure', 'encrypted', 'protected', 'safe', 'trusted']
-    features['security_claim_count'] = sum(1 for claim in security_claims if claim in text.lower())
-
-    # 18. Attachment Analysis
-    suspicious_extensions = ['.exe', '.zip', '.scr', '.bat', '.js', '.docm']
-    features['has_suspicious_attachment'] = 1 if any(ext in text.lower() for ext in suspicious_extensions) else 0
-
-    # 19. Contact Information
-    suspicious_contact = [
-        'call now', 'contact immediately', 'urgent call', 'phone verification',
-        'verify by phone', 'confirm by call'
-    ]
-    features['has_suspicious_contact'] = 1 if any(contact in text.lower() for contact in suspicious_contact) else 0
-
-    # 20. Contextual Analysis
-    features['mentions_recent_events'] = 1 if any(event in text.lower() for event in [
-        'covid', 'pandemic', 'election', 'holiday', 'black friday'
-    ]) else 0
-
-    features['seasonal_reference'] = 1 if any(season in text.lower() for season in [
-        'christmas', 'thanksgiving', 'new year', 'summer', 'winter'
-    ]) else 0
-
-    # 21. Sender Analysis
-    # <--- PERBAIKAN 1: BUG LOGIKA DI SINI ---
-    # Kode lama: if 'paypal' in text.lower() and 'paypal' not in text.lower():
-    # Ini akan selalu bernilai False. Seharusnya membandingkan konten dengan domain pengirim.
-    # Karena fitur ini lebih tentang analisis pengirim, dan kita sudah punya `advanced_sender_analysis`,
-    # fitur ini mungkin redundan atau butuh konteks sender_email. Untuk sekarang, kita set ke 0.
-    # Atau, jika ingin memeriksa inkonsistensi merek dalam teks saja:
-    mentioned_brands = [brand for brand in brands if brand in text.lower()]
-    if len(mentioned_brands) > 1:
-        features['sender_content_mismatch'] = 1 # Jika lebih dari satu merek disebut, bisa jadi mencurigakan
-    else:
-        features['sender_content_mismatch'] = 0
-
-    return features
-
-# ... (fungsi extract_url_features, extract_brand_features, dll. tidak berubah) ...
-def extract_url_features(text):
-    url_pattern = r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+'
-    urls = re.findall(url_pattern, text)
-
-    features = {}
-    features['url_count'] = len(urls)
-
-    if urls:
-        features['has_url_masking'] = 1 if any('bit.ly' in url or 'tinyurl' in url for url in urls) else 0
-        features['has_homograph'] = 1 if any(
-            re.search(r'[āàáâãäåæçćčđēėęěğįıñňöőŕřśšşťțůűųźžż]', url)
-            for url in urls
-        ) else 0
-    else:
-        features['has_url_masking'] = 0
-        features['has_homograph'] = 0
-
-    return features
-
-def extract_brand_features(text):
-    brands = ['paypal', 'amazon', 'microsoft', 'apple', 'google', 'facebook', 'instagram']
-    features = {}
-
-    for brand in brands:
-        features[f'has_{brand}'] = 1 if brand in text.lower() else 0
-
-    brand_spoofing = [
-        'paypaI', 'arnazon', 'microsft', 'appIe', 'goggle',
-        'faceboook', 'instagrarn'
-    ]
-    features['has_brand_spoofing'] = 1 if any(spoof in text.lower() for spoof in brand_spoofing) else 0
-
-    return features
-
-def extract_sender_features(sender_email):
-    features = {}
-
-    if '@' not in sender_email:
-        features['sender_domain'] = 'unknown'
-        features['is_free_email'] = 0
-        features['is_legitimate_domain'] = 0
-        features['is_new_domain'] = 0
-        features['domain_age_days'] = -1
-        return features
-
-    # Ekstrak domain
-    domain = sender_email.split('@')[-1].lower().strip()
-    features['sender_domain'] = domain
-
-    # Cek apakah domain adalah email gratis
-    free_email_domains = ['gmail.com', 'yahoo.com', 'hotmail.com', 'outlook.com',
-                         'aol.com', 'icloud.com', 'protonmail.com', 'zoho.com']
-    features['is_free_email'] = 1 if domain in free_email_domains else 0
-
-    # Daftar domain resmi perusahaan besar (bisa diperluas)
-    legitimate_domains = [
-        'paypal.com', 'amazon.com', 'microsoft.com', 'apple.com', 'google.com',
-        'facebook.com', 'instagram.com', 'twitter.com', 'linkedin.com',
-        'ebay.com', 'netflix.com', 'spotify.com', 'adobe.com',
-        'dropbox.com', 'slack.com', 'zoom.us', 'salesforce.com'
-    ]
-    features['is_legitimate_domain'] = 1 if domain in legitimate_domains else 0
-
-    # Deteksi domain yang baru dibuat (kurang dari 6 bulan)
-    new_domain_indicators = [
-        '.tk', '.ml', '.ga', '.cf', '.gq',  # TLD gratis yang sering disalahgunakan
-        '-shop', '-store', '-service', '-secure',  # Kata kunci domain mencurigakan
-        'shop-', 'store-', 'service-', 'secure-'
-    ]
-    features['is_new_domain'] = 1 if (
-        any(tld in domain for tld in ['.tk', '.ml', '.ga', '.cf', '.gq']) or
-        any(indicator in domain for indicator in new_domain_indicators)
-    ) else 0
-
-    # Simulasi umur domain (dalam hari)
-    if features['is_new_domain']:
-        features['domain_age_days'] = 30  # Simulasi domain baru (30 hari)
-    elif features['is_legitimate_domain']:
-        features['domain_age_days'] = 3650  # Simulasi domain lama (10 tahun)
-    else:
-        features['domain_age_days'] = 365  # Simulasi domain menengah (1 tahun)
-
-    return features
-
-def extract_file_extension_features(text):
-    features = {}
-
-    # Daftar ekstensi file yang mencurigakan
-    suspicious_extensions = {
-        # Eksekusi
-        'executable': ['.exe', '.scr', '.bat', '.com', '.pif', '.cmd', '.msi', '.jar'],
-        # Script
-        'script': ['.js', '.vbs', '.ps1', '.py', '.pl', '.rb', '.php', '.asp', '.jsp'],
-        # Macro
-        'macro': ['.docm', '.xlsm', '.pptm', '.dotm', '.xltm', '.potm'],
-        # Arsip
-        'archive': ['.zip', '.rar', '.7z', '.tar', '.gz', '.bz2'],
-        # Sistem
-        'system': ['.dll', '.sys', '.drv', '.ocx', '.cpl', '.deb', '.rpm'],
-        # Lainnya
-        'other': ['.reg', '.inf', '.iso', '.dmg', '.app', '.apk', '.deb']
-    }
-
-    # Deteksi ekstensi file dalam teks
-    detected_extensions = []
-    for category, extensions in suspicious_extensions.items():
-        for ext in extensions:
-            if ext.lower() in text.lower():
-                detected_extensions.append(ext)
-
-    # Fitur dasar
-    features['has_suspicious_extension'] = 1 if detected_extensions else 0
-    features['suspicious_extension_count'] = len(detected_extensions)
-
-    # Fitur kategori
-    for category, extensions in suspicious_extensions.items():
-        features[f'has_{category}_extension'] = 1 if any(ext in text.lower() for ext in extensions) else 0
-
-    # Fitur tingkat bahaya
-    high_risk_extensions = ['.exe', '.scr', '.bat', '.js', '.docm', '.xlsm']
-    features['has_high_risk_extension'] = 1 if any(ext in text.lower() for ext in high_risk_extensions) else 0
-
-    # Deteksi multiple ekstensi (misal: file.exe.zip)
-    multiple_ext_pattern = r'\.\w+\.\w+'
-    features['has_multiple_extensions'] = 1 if re.search(multiple_ext_pattern, text.lower()) else 0
-
-    # Deteksi ekstensi tersembunyi (misal: file.jpg.exe)
-    hidden_ext_pattern = r'\.(jpg|jpeg|png|gif|pdf|txt|doc|xls)\.(exe|scr|bat|js)'
-    features['has_hidden_extension'] = 1 if re.search(hidden_ext_pattern, text.lower()) else 0
-
-    # Deteksi ekstensi yang disamarkan
-    disguised_ext_patterns = [
-        r'\.ex[e3]',  # exe, ex3
-        r'\.sc[r7]',  # scr, sc7
-        r'\.ba[t2]',  # bat, ba2
-        r'\.js[a-z0-9]'  # jsa, js1, js2, dll.
-    ]
-    features['has_disguised_extension'] = 1 if any(re.search(pattern, text.lower()) for pattern in disguised_ext_patterns) else 0
-
-    return features
-
-def advanced_sender_analysis(sender_email, text_content):
-    features = {}
-    legitimate_domains = [
-        'paypal.com', 'amazon.com', 'microsoft.com', 'apple.com', 'google.com',
-        'facebook.com', 'instagram.com', 'twitter.com', 'linkedin.com',
-        'ebay.com', 'netflix.com', 'spotify.com', 'adobe.com',
-        'dropbox.com', 'slack.com', 'zoom.us', 'salesforce.com'
-    ]
-
-    # Deteksi ketidaksesuaian antara pengirim dan konten
-    brand_sender_mapping = {
-        'paypal.com': ['paypal', 'ebay'],
-        'amazon.com': ['amazon', 'aws'],
-        'microsoft.com': ['microsoft', 'windows', 'office', 'outlook'],
-        'apple.com': ['apple', 'icloud', 'itunes', 'iphone'],
-        'google.com': ['google', 'gmail', 'youtube', 'android'],
-        'facebook.com': ['facebook', 'instagram', 'whatsapp'],
-        'twitter.com': ['twitter', 'tweet'],
-        'linkedin.com': ['linkedin']
-    }
-
-    # Ekstrak domain pengirim
-    if '@' in sender_email:
-        sender_domain = sender_email.split('@')[-1].lower()
-
-        # Cek apakah konten menyebut merek yang tidak sesuai dengan domain
-        features['sender_content_mismatch'] = 0
-        for domain, brands in brand_sender_mapping.items():
-            if sender_domain == domain:
-                # Cek apakah ada merek pesaing yang disebut
-                competitor_brands = [
-                    'paypal', 'amazon', 'microsoft', 'apple', 'google',
-                    'facebook', 'twitter', 'linkedin'
-                ]
-                for brand in competitor_brands:
-                    if brand in text_content.lower() and brand not in brands:
-                        features['sender_content_mismatch'] = 1
-                        break
-                if features['sender_content_mismatch'] == 1:
-                    break
-        
-        # Deteksi impersonation (pengirim mengaku sebagai perusahaan lain)
-        impersonation_keywords = [
-            'security team', 'support team', 'customer service', 'billing department',
-            'account department', 'verification team', 'fraud department'
-        ]
-        features['sender_impersonation'] = 0
-        for keyword in impersonation_keywords:
-            if keyword in text_content.lower() and sender_domain not in legitimate_domains:
-                features['sender_impersonation'] = 1
-                break
+MODEL_REGISTRY = os.environ.get('MODEL_REGISTRY', '')
+MODEL_WATCH_INTERVAL = float(os.environ.get('MODEL_WATCH_INTERVAL', 5))
+MODEL_SMOKE_SET = os.environ.get('MODEL_SMOKE_SET', '')
+MODEL_SMOKE_MIN_ACCURACY = os.environ.get('MODEL_SMOKE_MIN_ACCURACY', '')
+FEATURE_SHARD_SIZE = int(os.environ.get('FEATURE_SHARD_SIZE', 64))
+# Token untuk POST /admin/reload (header X-Admin-Token); kosong berarti endpoint dimatikan
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN', '')
+# Penjelasan prediksi: 'rules' (default, aturan generate_explanation), atau lewat
+# explanations.py 'shap' (kontribusi tree SHAP eksak) / 'approx' (kontribusi per jalur,
+# jauh lebih murah) yang menambah `top_features`. EXPLAIN_TOP_K: jumlah fitur per email
+EXPLANATION_ENGINE = os.environ.get('EXPLANATION_ENGINE', 'rules')
+EXPLAIN_TOP_K = int(os.environ.get('EXPLAIN_TOP_K', 5))
+# Indeks reputasi domain (direktori hasil `python domain_reputation.py build`), opsional.
+# Dibuka sekali sebagai memory map dan dipakai bersama semua versi model dan worker
+DOMAIN_REPUTATION_INDEX = os.environ.get('DOMAIN_REPUTATION_INDEX', '')
+domain_reputation = DomainReputation(DOMAIN_REPUTATION_INDEX) if DOMAIN_REPUTATION_INDEX else None
+
+model_registry = ModelRegistry(MODEL_REGISTRY) if MODEL_REGISTRY else None
+smoke_emails, smoke_labels = load_smoke_set(MODEL_SMOKE_SET) if MODEL_SMOKE_SET else (None, None)
+
+def load_model_version(version):
+    """Muat + validasi satu versi dari registry, atau direktori model tunggal jika tanpa registry."""
+    if model_registry is not None:
+        version = version or model_registry.current()
+    if model_registry is not None and version:
+        path = model_registry.version_dir(version)
+    elif version:
+        raise ModelValidationError("Versi hanya bisa dipilih jika MODEL_REGISTRY diset")
     else:
-        features['sender_content_mismatch'] = 0
-        features['sender_impersonation'] = 0
-
-    return features
-
-def extract_email_security_features(text):
-    features = {}
-
-    # Deteksi klaim keamanan berlebihan
-    security_claims = [
-        '100% secure', 'completely safe', 'guaranteed secure',
-        'bank-level security', 'military-grade encryption',
-        'end-to-end encrypted', 'ssl secured', 'https secured'
-    ]
-    features['excessive_security_claims'] = sum(1 for claim in security_claims if claim in text.lower())
-
-    # Deteksi permintaan verifikasi yang mencurigakan
-    verification_requests = [
-        'verify your account', 'verify your identity', 'verify now',
-        'confirm your account', 'confirm your identity', 'confirm now',
-        'validate your account', 'validate your identity'
-    ]
-    features['suspicious_verification_request'] = sum(1 for request in verification_requests if request in text.lower())
-
-    # Deteksi permintaan informasi sensitif
-    sensitive_info_requests = [
-        'provide your password', 'enter your pin', 'input your cvv',
-        'send your card number', 'share your ssn', 'disclose your account details'
-    ]
-    features['sensitive_info_request'] = sum(1 for request in sensitive_info_requests if request in text.lower())
-
-    # Deteksi ancaman akun
-    account_threats = [
-        'account will be suspended', 'account will be closed',
-        'account will be terminated', 'account will be blocked',
-        'your account is at risk', 'your account has been compromised'
-    ]
-    features['account_threat_count'] = sum(1 for threat in account_threats if threat in text.lower())
-
-    return features
+        path, version = model_dir, 'local'
+    return load_model_state(
+        path, version, scan_limits, shard_size=FEATURE_SHARD_SIZE, timed=METRICS_ENABLED,
+        smoke_emails=smoke_emails, smoke_labels=smoke_labels,
+        min_accuracy=float(MODEL_SMOKE_MIN_ACCURACY) if MODEL_SMOKE_MIN_ACCURACY else None,
+        explain_method=None if EXPLANATION_ENGINE == 'rules' else EXPLANATION_ENGINE, explain_top_k=EXPLAIN_TOP_K,
+        reputation=domain_reputation
+    )
+
+model_holder = ModelHolder(load_model_version, model_registry, MODEL_WATCH_INTERVAL)
+model_holder.start()
+
+# Kalimat pembuka dan rekomendasi per status, dipakai penjelasan berbasis aturan dan berbasis kontribusi
+EXPLANATION_RECOMMENDATIONS = {
+    "phishing": "\n⚠️ **Rekomendasi:** JANGAN klik link apapun, jangan berikan informasi pribadi, dan hapus email ini segera.",
+    "safe": "\n✓ **Rekomendasi:** Email ini tampak aman, namun tetap waspada terhadap link yang tidak dikenal.",
+    "suspicious": "\n⚠️ **Rekomendasi:** Berhati-hati! Verifikasi pengirim sebelum mengklik link atau memberikan informasi. Jika ragu, hubungi perusahaan langsung melalui saluran resmi.",
+}
+
+def explanation_header(prediction_status, prob_phishing, prob_safe):
+    if prediction_status == "phishing":
+        return [f"🚨 Email ini terdeteksi sebagai **Phishing** dengan tingkat kepercayaan {prob_phishing*100:.0f}%.",
+                "\n**Indikator Bahaya yang Terdeteksi:**"]
+    if prediction_status == "safe":
+        return [f"✅ Email ini terdeteksi sebagai **Aman** dengan tingkat kepercayaan {prob_safe*100:.0f}%.",
+                "\n**Indikator Keamanan:**"]
+    return [f"⚡ Email ini tergolong **Mencurigakan** dengan tingkat kecurigaan {prob_phishing*100:.0f}%.",
+            "\n**Faktor yang Membuat Email Ini Mencurigakan:**"]
 
 # <--- PERBAIKAN 2: GANTI SELURUH FUNGSI generate_explanation ---
 def generate_explanation(features, prediction_status, prob_phishing, prob_safe):
@@ -554,8 +106,7 @@ def generate_explanation(features, prediction_status, prob_phishing, prob_safe):
     
     if prediction_status == "phishing":
         # --- ZONA MERAH: PASTI PHISHING ---
-        explanation.append(f"🚨 Email ini terdeteksi sebagai **Phishing** dengan tingkat kepercayaan {prob_phishing*100:.0f}%.")
-        explanation.append("\n**Indikator Bahaya yang Terdeteksi:**")
+        explanation.extend(explanation_header('phishing', prob_phishing, prob_safe))
         
         indicators_found = []
         
@@ -605,12 +156,11 @@ def generate_explanation(features, prediction_status, prob_phishing, prob_safe):
             explanation.append("• Pola keseluruhan email ini sangat mirip dengan modus phishing yang telah dikenal")
             explanation.append("• Kombinasi struktur, kata-kata, dan metadata menunjukkan karakteristik phishing")
         
-        explanation.append("\n⚠️ **Rekomendasi:** JANGAN klik link apapun, jangan berikan informasi pribadi, dan hapus email ini segera.")
+        explanation.append(EXPLANATION_RECOMMENDATIONS['phishing'])
 
     elif prediction_status == "safe":
         # --- ZONA HIJAU: PASTI AMAN ---
-        explanation.append(f"✅ Email ini terdeteksi sebagai **Aman** dengan tingkat kepercayaan {prob_safe*100:.0f}%.")
-        explanation.append("\n**Indikator Keamanan:**")
+        explanation.extend(explanation_header('safe', prob_phishing, prob_safe))
         
         safety_indicators = []
         
@@ -643,12 +193,11 @@ def generate_explanation(features, prediction_status, prob_phishing, prob_safe):
             explanation.append("• Email tidak menunjukkan karakteristik phishing yang umum")
             explanation.append("• Struktur dan konten email terlihat normal dan legitim")
         
-        explanation.append("\n✓ **Rekomendasi:** Email ini tampak aman, namun tetap waspada terhadap link yang tidak dikenal.")
+        explanation.append(EXPLANATION_RECOMMENDATIONS['safe'])
 
     else:  # "suspicious"
         # --- ZONA ABU-ABU: MENCURIGAKAN ---
-        explanation.append(f"⚡ Email ini tergolong **Mencurigakan** dengan tingkat kecurigaan {prob_phishing*100:.0f}%.")
-        explanation.append("\n**Faktor yang Membuat Email Ini Mencurigakan:**")
+        explanation.extend(explanation_header('suspicious', prob_phishing, prob_safe))
         
         suspicious_factors = []
         
@@ -699,10 +248,540 @@ def generate_explanation(features, prediction_status, prob_phishing, prob_safe):
             explanation.append("• Kombinasi beberapa faktor kecil menciptakan profil mencurigakan secara keseluruhan")
             explanation.append(f"• Sistem mendeteksi {prob_phishing*100:.0f}% kesamaan dengan pola phishing, namun tidak cukup tinggi untuk dikategorikan sebagai phishing pasti")
         
-        explanation.append("\n⚠️ **Rekomendasi:** Berhati-hati! Verifikasi pengirim sebelum mengklik link atau memberikan informasi. Jika ragu, hubungi perusahaan langsung melalui saluran resmi.")
+        explanation.append(EXPLANATION_RECOMMENDATIONS['suspicious'])
     
     return explanation
 
+def generate_contribution_explanation(indicators, prediction_status, prob_phishing, prob_safe):
+    """
+    Penjelasan dari kontribusi model (ContributionExplainer): pembuka dan rekomendasi
+    sama dengan generate_explanation, indikatornya fitur yang paling mendorong verdict.
+    """
+    explanation = explanation_header(prediction_status, prob_phishing, prob_safe)
+    if indicators:
+        explanation.extend(f"• {indicator}" for indicator in indicators)
+    else:
+        explanation.append("• Tidak ada satu fitur yang dominan; verdict berasal dari kombinasi banyak faktor kecil")
+    explanation.append(EXPLANATION_RECOMMENDATIONS[prediction_status])
+    return explanation
+
+
+# Define thresholds for classification
+PHISHING_THRESHOLD_HIGH = 0.75  # ≥75% = Phishing
+SAFE_THRESHOLD = 0.40           # <40% = Safe
+# 40%-74% = Suspicious
+
+# Batas jumlah email per request /predict_batch
+MAX_BATCH_SIZE = int(os.environ.get('MAX_BATCH_SIZE', 1000))
+
+# Header request untuk menyertakan blok `timings` di response JSON
+DEBUG_TIMINGS_HEADER = 'X-Debug-Timings'
+
+metrics_registry = MetricsRegistry()
+REQUEST_LATENCY = metrics_registry.histogram(
+    'phishing_request_duration_seconds', 'Latensi request per endpoint', ['endpoint'])
+STAGE_LATENCY = metrics_registry.histogram(
+    'phishing_stage_duration_seconds', 'Latensi per tahap pipeline (dijumlah per request atau micro-batch)',
+    ['stage'])
+INPUT_SIZE = metrics_registry.histogram(
+    'phishing_input_chars', 'Ukuran email yang diskor (karakter)', buckets=SIZE_BUCKETS)
+PREDICTIONS = metrics_registry.counter(
+    'phishing_predictions_total', 'Jumlah hasil prediksi per prediction_status', ['status'])
+REQUEST_ERRORS = metrics_registry.counter(
+    'phishing_request_errors_total', 'Jumlah error per endpoint dan jenis', ['endpoint', 'kind'])
+TRUNCATED_INPUTS = metrics_registry.counter(
+    'phishing_truncated_inputs_total', 'Jumlah email yang dipangkas sebelum dipindai (SCAN_MAX_CHARS)')
+
+def featurize_shard(email_contents):
+    """Featurize satu shard email dengan model aktif (serial atau di worker ParallelFeaturizer)."""
+    return model_holder.current.featurizer.featurize_batch(email_contents, timed=METRICS_ENABLED)
+
+def classify_probability(prob_phishing):
+    # Determine prediction status
+    if prob_phishing >= PHISHING_THRESHOLD_HIGH:
+        return "phishing"
+    elif prob_phishing < SAFE_THRESHOLD:
+        return "safe"
+    return "suspicious"
+
+def build_prediction_result(all_features, extracted_sender, extracted_date, prob_safe, prob_phishing,
+                            contributions=None, explain=True):
+    """
+    `contributions` (indikator, top_features) dari ContributionExplainer; None memakai
+    generate_explanation. explain=False menghilangkan `explanation` dari response.
+    """
+    prediction_status = classify_probability(prob_phishing)
+
+    # Generate explanation
+    if not explain:
+        explanation = None
+    elif contributions is None:
+        explanation = generate_explanation(
+            features=all_features,
+            prediction_status=prediction_status,
+            prob_phishing=prob_phishing,
+            prob_safe=prob_safe
+        )
+    else:
+        explanation = generate_contribution_explanation(contributions[0], prediction_status, prob_phishing, prob_safe)
+
+    result = {
+        'prediction_status': prediction_status,
+        'phishing_probability': round(prob_phishing, 4),
+        'safe_probability': round(prob_safe, 4),
+        'explanation': explanation,
+        'extracted_sender': extracted_sender,
+        'extracted_date': extracted_date,
+        'truncated': bool(all_features.get('input_truncated', 0)),
+        'thresholds': {
+            'phishing_threshold': PHISHING_THRESHOLD_HIGH,
+            'safe_threshold': SAFE_THRESHOLD
+        },
+        'feature_summary': {
+            'suspicious_keywords': all_features.get('suspicious_keyword_count', 0),
+            'urgency_words': all_features.get('urgency_word_count', 0),
+            'urls': all_features.get('url_count', 0),
+            'exclamations': all_features.get('exclamation_count', 0)
+        }
+    }
+    if 'sender_reputation' in all_features:
+        result['feature_summary']['sender_reputation'] = all_features['sender_reputation']
+    if explanation is None:
+        del result['explanation']
+    elif contributions is not None:
+        result['top_features'] = contributions[1]
+    return result
+
+def without_explanation(result):
+    return {key: value for key, value in result.items() if key not in ('explanation', 'top_features')}
+
+def build_cascade_result(decision):
+    """
+    Response untuk email yang diputuskan tier cascade (tanpa model). Probabilitas
+    bernilai nominal (0 atau 1); `tier` dan `tier_reason` menjelaskan asalnya.
+    """
+    features = decision.features
+    if decision.status == "phishing":
+        prob_phishing = 1.0
+        explanation = [
+            "🚨 Email ini ditandai sebagai **Phishing** oleh daftar blokir organisasi.",
+            f"\n**Alasan:** {decision.reason}.",
+            EXPLANATION_RECOMMENDATIONS['phishing'],
+        ]
+    else:
+        prob_phishing = 0.0
+        explanation = [
+            "✅ Email ini dinilai **Aman** oleh pemeriksaan cepat tanpa model.",
+            f"\n**Alasan:** {decision.reason}.",
+            EXPLANATION_RECOMMENDATIONS['safe'],
+        ]
+
+    return {
+        'prediction_status': decision.status,
+        'phishing_probability': prob_phishing,
+        'safe_probability': 1.0 - prob_phishing,
+        'explanation': explanation,
+        'extracted_sender': decision.sender,
+        'extracted_date': decision.date,
+        'truncated': decision.truncated,
+        'thresholds': {
+            'phishing_threshold': PHISHING_THRESHOLD_HIGH,
+            'safe_threshold': SAFE_THRESHOLD
+        },
+        'feature_summary': {
+            'suspicious_keywords': features.get('suspicious_keyword_count', 0),
+            'urgency_words': features.get('urgency_word_count', 0),
+            'urls': features.get('url_count', 0),
+            'exclamations': features.get('exclamation_count', 0)
+        },
+        'tier': decision.tier,
+        'tier_reason': decision.reason
+    }
+
+def score_emails(email_contents, timer=NULL_TIMER, state=None, explain=True):
+    """
+    Skor N email dengan satu transform TF-IDF dan satu panggilan predict_proba
+    (plus satu pred_contribs jika penjelasan berbasis kontribusi diminta).
+    `state` adalah versi model yang dipegang request; None memakai versi aktif.
+    """
+    if state is None:
+        with model_holder.acquire() as state:
+            return score_emails(email_contents, timer, state, explain)
+    if not email_contents:
+        return []
+
+    batches = state.featurize(email_contents, timed=METRICS_ENABLED)
+    timer.restart()
+    X_combined, batch = combine_batches(batches)
+    timer.mark('hstack')
+    if batch.timings:
+        timer.merge(batch.timings)
+
+    # Get prediction probabilities
+    probabilities = state.engine.predict_proba(X_combined)
+    timer.mark('predict_proba')
+
+    contributions = [None] * len(email_contents)
+    if explain and state.explainer is not None:
+        statuses = [classify_probability(float(p)) for p in probabilities[:, 1]]
+        contributions = state.explainer.explain(X_combined, statuses)
+        timer.mark('pred_contribs')
+
+    results = []
+    for (extracted_date, extracted_sender, extras), numeric_row, row, contribution in zip(
+            batch.meta, batch.numeric, probabilities, contributions):
+        results.append(build_prediction_result(
+            state.featurizer.features_view(numeric_row, extras), extracted_sender, extracted_date,
+            prob_safe=float(row[0]), prob_phishing=float(row[1]), contributions=contribution, explain=explain
+        ))
+    timer.mark('generate_explanation')
+    return results
+
+# Cache hasil prediksi untuk email yang identik (PREDICTION_CACHE_SIZE=0 mematikan cache)
+prediction_cache = PredictionCache(
+    max_entries=int(os.environ.get('PREDICTION_CACHE_SIZE', 10000)),
+    ttl_seconds=float(os.environ.get('PREDICTION_CACHE_TTL', 3600))
+)
+
+# Cascade bertingkat sebelum model (lihat cascade.py): CASCADE_TIERS="lists,rules"
+# (kosong = mati, default). CASCADE_ALLOWLIST / CASCADE_BLOCKLIST: file domain, satu per baris
+CASCADE_TIERS = [tier.strip() for tier in os.environ.get('CASCADE_TIERS', '').split(',') if tier.strip()]
+cascade = Cascade(
+    CASCADE_TIERS,
+    allowlist=load_domain_list(os.environ['CASCADE_ALLOWLIST']) if os.environ.get('CASCADE_ALLOWLIST') else frozenset(),
+    blocklist=load_domain_list(os.environ['CASCADE_BLOCKLIST']) if os.environ.get('CASCADE_BLOCKLIST') else frozenset(),
+    limits=scan_limits,
+    reputation=domain_reputation
+)
+CASCADE_DECISIONS = metrics_registry.counter(
+    'phishing_cascade_decisions_total', 'Keputusan scoring per tier cascade dan status', ['tier', 'status'])
+
+# Indeks kampanye near-duplicate (lihat campaign_index.py): varian email yang sudah
+# diskor memakai ulang verdict-nya. CAMPAIGN_INDEX_SIZE=0 (default) mematikan indeks;
+# CAMPAIGN_CONFIRM=0 mematikan konfirmasi host URL/domain pengirim + Jaccard shingle
+campaign_index = CampaignIndex(
+    max_entries=int(os.environ.get('CAMPAIGN_INDEX_SIZE', 0)),
+    ttl_seconds=float(os.environ.get('CAMPAIGN_INDEX_TTL', 3600)),
+    threshold=float(os.environ.get('CAMPAIGN_SIMILARITY', 0.8)),
+    confirm=os.environ.get('CAMPAIGN_CONFIRM', '1') != '0'
+)
+# Verdict dengan probabilitas phishing sedekat ini ke salah satu threshold tidak dipakai
+# ulang: varian kecil (nama, nominal, tanggal) bisa menggesernya ke status lain
+CAMPAIGN_MARGIN = float(os.environ.get('CAMPAIGN_MARGIN', 0.1))
+
+def current_model_version():
+    return model_holder.current.cache_version
+
+def on_model_swap(state):
+    # Versi model berganti -> semua hasil cache lama tidak berlaku lagi
+    prediction_cache.ensure_model_version(state.cache_version)
+    campaign_index.ensure_model_version(state.cache_version)
+
+model_holder.on_swap = on_model_swap
+prediction_cache.ensure_model_version(current_model_version())
+campaign_index.ensure_model_version(current_model_version())
+
+def apply_cascade(email_contents, keys, positions, results, explain=True):
+    """
+    Tier murah cascade untuk email di `positions`; keputusannya langsung diisi ke
+    `results` dan cache. Kembalikan posisi yang tetap harus diskor model.
+    """
+    pending = []
+    for i in positions:
+        decision = cascade.decide(email_contents[i])
+        if decision is None:
+            pending.append(i)
+            continue
+        results[i] = build_cascade_result(decision)
+        if not explain:
+            results[i] = without_explanation(results[i])
+        prediction_cache.put(keys[i], results[i])
+        CASCADE_DECISIONS.inc(decision.tier, decision.status)
+    return pending
+
+def match_campaigns(email_contents, keys, positions, results, state, explain=True):
+    """
+    Cari kampanye untuk email di `positions`; verdict yang terkonfirmasi langsung
+    diisi ke `results` dan cache (pengirim, tanggal dan truncated tetap milik email itu sendiri).
+    Verdict yang disimpan tanpa penjelasan tidak dipakai ulang untuk request yang memintanya.
+    Kembalikan (posisi yang tetap harus diskor, {posisi: (sketch, match)}).
+    """
+    pending = []
+    sketches = {}
+    for i in positions:
+        email_content, words, extracted_date, extracted_sender, truncated = state.featurizer.clean_words(
+            email_contents[i])
+        sketch = campaign_index.sketch(words, email_content, extracted_sender)
+        match = campaign_index.lookup(sketch, state.cache_version)
+        if match is not None and match.confirmed and (not explain or 'explanation' in match.result):
+            results[i] = dict(
+                match.result if explain else without_explanation(match.result), extracted_sender=extracted_sender, extracted_date=extracted_date,
+                truncated=truncated,
+                campaign={'id': match.campaign_id, 'similarity': match.similarity, 'reused': True}
+            )
+            if cascade.enabled:
+                # Verdict asal dari model; yang dicatat adalah pemakaian ulangnya
+                results[i].update(tier='campaign', tier_reason=f"varian kampanye {match.campaign_id}")
+                CASCADE_DECISIONS.inc('campaign', results[i]['prediction_status'])
+            prediction_cache.put(keys[i], results[i])
+        else:
+            pending.append(i)
+            sketches[i] = (sketch, match)
+    return pending, sketches
+
+def index_campaign(result, sketch, match, state):
+    # Email baru diskor: simpan verdict-nya; match tanpa konfirmasi tetap satu kampanye
+    prob_phishing = result['phishing_probability']
+    reusable = min(abs(prob_phishing - PHISHING_THRESHOLD_HIGH), abs(prob_phishing - SAFE_THRESHOLD)) >= CAMPAIGN_MARGIN
+    campaign_id = campaign_index.add(sketch, result, state.cache_version,
+                                     match.campaign_id if match is not None else None, reusable)
+    similarity = match.similarity if match is not None else None
+    return dict(result, campaign={'id': campaign_id, 'similarity': similarity, 'reused': False})
+
+def score_emails_cached(email_contents, timer=NULL_TIMER, scorer=score_emails, explain=True):
+    """
+    score_emails (atau `scorer`) dengan cache per email; hanya email yang belum
+    ada di cache, tidak diputuskan tier cascade dan (jika indeks kampanye aktif)
+    bukan varian kampanye yang sudah diskor yang diskor model. Satu versi model dipegang dari awal sampai akhir
+    request, sehingga hot-swap di tengah request tidak mencampur versi.
+    explain=False melewati penjelasan (dan pred_contribs); hasilnya di-cache terpisah.
+    """
+    with model_holder.acquire() as state:
+        cache_version = state.cache_version if explain else f"{state.cache_version}|noexplain"
+        keys = [content_key(email_content, cache_version) for email_content in email_contents]
+        results = [prediction_cache.get(key) for key in keys]
+        timer.mark('cache_lookup')
+
+        missing = [i for i, result in enumerate(results) if result is None]
+        if missing and cascade.enabled:
+            missing = apply_cascade(email_contents, keys, missing, results, explain)
+            timer.mark('cascade')
+        sketches = None
+        if missing and campaign_index.enabled:
+            missing, sketches = match_campaigns(email_contents, keys, missing, results, state, explain)
+            timer.mark('campaign_lookup')
+        if missing:
+            scored = scorer([email_contents[i] for i in missing], timer, state, explain)
+            for i, result in zip(missing, scored):
+                if sketches is not None:
+                    result = index_campaign(result, *sketches[i], state)
+                if cascade.enabled:
+                    result = dict(result, tier='model', tier_reason=None)
+                    CASCADE_DECISIONS.inc('model', result['prediction_status'])
+                prediction_cache.put(keys[i], result)
+                results[i] = result
+        return results
+
+# Micro-batching /predict: request tunggal yang bersamaan diskor sebagai satu batch.
+# MICRO_BATCH_WAIT_MS=0 (default) mematikan penjadwal.
+MICRO_BATCH_WAIT_MS = float(os.environ.get('MICRO_BATCH_WAIT_MS', 0))
+MICRO_BATCH_SIZE = int(os.environ.get('MICRO_BATCH_SIZE', 64))
+MICRO_BATCH_QUEUE = int(os.environ.get('MICRO_BATCH_QUEUE', 1024))
+# Batas waktu satu request di antrian + scoring (detik) sebelum dijawab 503
+MICRO_BATCH_TIMEOUT = float(os.environ.get('MICRO_BATCH_TIMEOUT', 10))
+
+MICRO_BATCH_SIZES = metrics_registry.histogram(
+    'phishing_microbatch_size', 'Jumlah email per micro-batch', buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256))
+MICRO_BATCH_QUEUE_WAIT = metrics_registry.histogram(
+    'phishing_microbatch_queue_wait_seconds', 'Waktu tunggu email di antrian micro-batch')
+
+def observe_micro_batch(batch_size, queue_waits):
+    if METRICS_ENABLED:
+        MICRO_BATCH_SIZES.observe(batch_size)
+        for wait in queue_waits:
+            MICRO_BATCH_QUEUE_WAIT.observe(wait)
+
+def score_micro_batch(items):
+    """
+    Skor satu micro-batch ((state, email, explain)) di thread penjadwal; email
+    dikelompokkan per versi model yang dipegang request-nya dan flag explain.
+    Durasi tahap dicatat per batch.
+    """
+    timer = StageTimer() if METRICS_ENABLED else NULL_TIMER
+    results = []
+    start = 0
+    while start < len(items):
+        state, _, explain = items[start]
+        end = start + 1
+        while end < len(items) and items[end][0] is state and items[end][2] == explain:
+            end += 1
+        results.extend(score_emails([email_content for _, email_content, _ in items[start:end]], timer, state,
+                                    explain))
+        start = end
+    if METRICS_ENABLED:
+        for stage, seconds in timer.totals.items():
+            STAGE_LATENCY.observe(seconds, stage)
+    return results
+
+micro_batcher = MicroBatcher(
+    score_micro_batch,
+    max_batch=MICRO_BATCH_SIZE,
+    max_wait=MICRO_BATCH_WAIT_MS / 1000,
+    max_queue=MICRO_BATCH_QUEUE,
+    on_batch=observe_micro_batch
+) if MICRO_BATCH_WAIT_MS > 0 else None
+
+def score_emails_micro_batched(email_contents, timer=NULL_TIMER, state=None, explain=True):
+    if state is None:
+        with model_holder.acquire() as state:
+            return score_emails_micro_batched(email_contents, timer, state, explain)
+    results = micro_batcher.map([(state, email_content, explain) for email_content in email_contents],
+                                timeout=MICRO_BATCH_TIMEOUT)
+    timer.mark('microbatch')
+    return results
+
+def cache_metrics():
+    stats = prediction_cache.stats()
+    return [
+        ('phishing_cache_hits_total', 'counter', 'Cache prediksi: hit', stats['hits']),
+        ('phishing_cache_misses_total', 'counter', 'Cache prediksi: miss', stats['misses']),
+        ('phishing_cache_entries', 'gauge', 'Cache prediksi: jumlah entri', stats['entries']),
+    ]
+
+metrics_registry.add_collector(cache_metrics)
+
+def campaign_metrics():
+    if not campaign_index.enabled:
+        return []
+    stats = campaign_index.stats()
+    return [
+        ('phishing_campaign_lookups_total', 'counter', 'Indeks kampanye: lookup', stats['lookups']),
+        ('phishing_campaign_reused_total', 'counter', 'Indeks kampanye: verdict dipakai ulang', stats['reused']),
+        ('phishing_campaign_confirm_rejected_total', 'counter',
+         'Indeks kampanye: kandidat mirip yang gagal konfirmasi', stats['confirm_rejected']),
+        ('phishing_campaign_entries', 'gauge', 'Indeks kampanye: jumlah entri', stats['entries']),
+        ('phishing_campaigns', 'gauge', 'Indeks kampanye: jumlah kampanye', stats['campaigns']),
+    ]
+
+metrics_registry.add_collector(campaign_metrics)
+
+def micro_batch_metrics():
+    if micro_batcher is None:
+        return []
+    stats = micro_batcher.stats()
+    return [
+        ('phishing_microbatch_queue_depth', 'gauge', 'Micro-batch: email di antrian', stats['queue_depth']),
+        ('phishing_microbatch_rejected_total', 'counter', 'Micro-batch: ditolak karena antrian penuh',
+         stats['rejected']),
+        ('phishing_microbatch_expired_total', 'counter', 'Micro-batch: melewati timeout sebelum diskor',
+         stats['expired']),
+    ]
+
+metrics_registry.add_collector(micro_batch_metrics)
+
+def model_metrics():
+    stats = model_holder.stats()
+    return [
+        ('phishing_model_swaps_total', 'counter', 'Model: hot-swap yang berhasil', stats['swaps']),
+        ('phishing_model_swap_failures_total', 'counter',
+         'Model: versi yang gagal dimuat/validasi (versi lama tetap aktif)', stats['failures']),
+        ('phishing_model_loaded_timestamp_seconds', 'gauge', 'Model aktif: waktu dimuat (unix)', stats['loaded_at']),
+        ('phishing_model_draining', 'gauge', 'Versi model lama yang masih menunggu request selesai',
+         len(stats['draining'])),
+    ]
+
+metrics_registry.add_collector(model_metrics)
+
+def email_error(email_content):
+    """Pesan error untuk email yang tidak bisa diskor, atau None."""
+    if not isinstance(email_content, str) or not email_content:
+        return 'Email content is required'
+    if len(email_content) > MAX_EMAIL_CHARS:
+        return f'Email exceeds the limit of {MAX_EMAIL_CHARS} characters'
+    return None
+
+def score_batch(emails, timer=NULL_TIMER, explain=True):
+    """
+    Skor list email /predict_batch; email kosong/tidak valid/terlalu besar diberi
+    error per item, sisanya tetap diskor. Kembalikan (results, email valid, hasil email valid).
+    """
+    results = [email_error(email_content) for email_content in emails]
+    valid_positions = [i for i, error in enumerate(results) if error is None]
+    valid_emails = [emails[i] for i in valid_positions]
+    scored = score_emails_cached(valid_emails, timer, explain=explain)
+
+    results = [{'error': error} for error in results]
+    for position, result in zip(valid_positions, scored):
+        results[position] = result
+    return results, valid_emails, scored
+
+def health_payload():
+    model_metadata = model_holder.current.model_metadata
+    return {
+        'status': 'healthy',
+        'model_type': model_metadata['model_type'],
+        'version': model_metadata['version'],
+        'creation_date': model_metadata['creation_date'],
+        'model_version': model_holder.current.version,
+        'model': model_holder.stats(),
+        'cache': prediction_cache.stats(),
+        'cascade': {'tiers': list(cascade.tiers), 'allowlist': len(cascade.allowlist),
+                    'blocklist': len(cascade.blocklist)} if cascade.enabled else None,
+        'campaigns': campaign_index.stats() if campaign_index.enabled else None,
+        'explanation_engine': EXPLANATION_ENGINE,
+        'domain_reputation': domain_reputation.stats() if domain_reputation is not None else None,
+        'micro_batch': micro_batcher.stats() if micro_batcher is not None else None
+    }
+
+def reload_model(version, token):
+    """
+    Muat, validasi lalu tukar model (POST /admin/reload). Dengan registry,
+    versi yang lolos juga ditulis ke CURRENT agar worker lain ikut lewat watcher.
+    Kembalikan (status HTTP, payload).
+    """
+    if not ADMIN_TOKEN:
+        return 404, {'error': 'Not found'}
+    if token != ADMIN_TOKEN:
+        return 403, {'error': 'Invalid admin token'}
+    if version is not None and not isinstance(version, str):
+        return 400, {'error': '"version" must be a string'}
+    if version is not None:
+        if model_registry is None:
+            return 400, {'error': 'Versi hanya bisa dipilih jika MODEL_REGISTRY diset'}
+        try:
+            model_registry.version_dir(version)
+        except ValueError as e:
+            return 400, {'error': str(e)}
+    previous = model_holder.current.version
+    try:
+        state = model_holder.reload(version, activate=version is not None)
+    except (ModelValidationError, ValueError) as e:
+        return 422, {'error': 'Model baru gagal validasi, versi lama tetap aktif', 'details': str(e),
+                     'version': previous}
+    return 200, {'status': 'swapped', 'version': state.version, 'previous_version': previous,
+                 'model': model_holder.stats()}
+
+def request_timer():
+    # Timer hanya dibuat jika metrik aktif atau klien meminta blok timings
+    if METRICS_ENABLED or request.headers.get(DEBUG_TIMINGS_HEADER):
+        return StageTimer()
+    return NULL_TIMER
+
+def observe_request(endpoint, started, timer, email_contents, results):
+    """Catat latensi request, latensi per tahap, ukuran input dan prediction_status."""
+    if not METRICS_ENABLED:
+        return
+    REQUEST_LATENCY.observe(time.perf_counter() - started, endpoint)
+    for stage, seconds in timer.totals.items():
+        STAGE_LATENCY.observe(seconds, stage)
+    for email_content in email_contents:
+        INPUT_SIZE.observe(len(email_content))
+    for result in results:
+        PREDICTIONS.inc(result['prediction_status'])
+        if result['truncated']:
+            TRUNCATED_INPUTS.inc()
+
+def timings_block(started, timer):
+    if not request.headers.get(DEBUG_TIMINGS_HEADER):
+        return None
+    return timings_payload(started, timer)
+
+def timings_payload(started, timer):
+    return {
+        'total_ms': round((time.perf_counter() - started) * 1000, 3),
+        'stages_ms': {stage: round(seconds * 1000, 3) for stage, seconds in (timer.totals or {}).items()}
+    }
+
 
 @app.route('/')
 def index():
@@ -710,108 +789,48 @@ def index():
 
 @app.route('/predict', methods=['POST'])
 def predict():
+    started = time.perf_counter()
     try:
         # Get email content from request
         data = request.json
         email_content = data.get('email_content', '')
+        # "explain": false -> tanpa `explanation`/`top_features` (lebih cepat)
+        explain = data.get('explain', True) is not False
         
         if not email_content:
+            REQUEST_ERRORS.inc('predict', 'bad_request')
             return jsonify({'error': 'Email content is required'}), 400
-        
-        # Preprocess the email
-        cleaned_text, extracted_date, extracted_sender = enhanced_preprocess_combined_text(email_content)
-        
-        # Extract features
-        phishing_features = extract_phishing_features(email_content)
-        url_features = extract_url_features(email_content)
-        brand_features = extract_brand_features(email_content)
-        sender_features = extract_sender_features(extracted_sender)
-        extension_features = extract_file_extension_features(email_content)
-        advanced_sender = advanced_sender_analysis(extracted_sender, email_content)
-        security_features = extract_email_security_features(email_content)
-        
-        # Combine all features
-        all_features = {**phishing_features, **url_features, **brand_features, 
-                       **sender_features, **extension_features, **advanced_sender, 
-                       **security_features}
-        
-        # Add text length feature
-        all_features['text_length'] = len(cleaned_text.split())
-        all_features['has_attachment'] = 1 if 'attached file' in email_content.lower() else 0
-        
-        # Handle date features
-        try:
-            parsed_date = pd.to_datetime(extracted_date, format='%a %b %d %Y', errors='coerce')
-            all_features['is_weekend'] = int(parsed_date.dayofweek >= 5) if not pd.isna(parsed_date) else 0
-            all_features['hour_sent'] = int(parsed_date.hour) if not pd.isna(parsed_date) else 12
-        except:
-            all_features['is_weekend'] = 0
-            all_features['hour_sent'] = 12
-        
-        # Create dataframe with the features
-        df_features = pd.DataFrame([all_features])
-        
-        # Select only the numeric features used in training
-        X_numeric = df_features[numeric_features].fillna(0)
-        
-        # Convert to sparse matrix
-        X_numeric_sparse = csr_matrix(X_numeric.values)
-        
-        # Transform text using TF-IDF
-        X_tfidf = tfidf.transform([cleaned_text])
-        
-        # Combine TF-IDF and numeric features
-        X_combined = hstack([X_tfidf, X_numeric_sparse])
-        
-        # Get prediction probabilities
-        probabilities = model.predict_proba(X_combined)[0]
-        prob_safe = float(probabilities[0])
-        prob_phishing = float(probabilities[1])
-
-        # Define thresholds for classification
-        PHISHING_THRESHOLD_HIGH = 0.75  # ≥75% = Phishing
-        SAFE_THRESHOLD = 0.40           # <40% = Safe
-        # 40%-74% = Suspicious
-
-        # Determine prediction status
-        if prob_phishing >= PHISHING_THRESHOLD_HIGH:
-            prediction_status = "phishing"
-        elif prob_phishing < SAFE_THRESHOLD:
-            prediction_status = "safe"
-        else:
-            prediction_status = "suspicious"
 
-        # Generate explanation
-        explanation = generate_explanation(
-            features=all_features,
-            prediction_status=prediction_status,
-            prob_phishing=prob_phishing,
-            prob_safe=prob_safe
-        )
+        if len(email_content) > MAX_EMAIL_CHARS:
+            REQUEST_ERRORS.inc('predict', 'too_large')
+            return jsonify({'error': email_error(email_content)}), 413
         
-        # Return results
-        result = {
-            'prediction_status': prediction_status,
-            'phishing_probability': round(prob_phishing, 4),
-            'safe_probability': round(prob_safe, 4),
-            'explanation': explanation,
-            'extracted_sender': extracted_sender,
-            'extracted_date': extracted_date,
-            'thresholds': {
-                'phishing_threshold': PHISHING_THRESHOLD_HIGH,
-                'safe_threshold': SAFE_THRESHOLD
-            },
-            'feature_summary': {
-                'suspicious_keywords': all_features.get('suspicious_keyword_count', 0),
-                'urgency_words': all_features.get('urgency_word_count', 0),
-                'urls': all_features.get('url_count', 0),
-                'exclamations': all_features.get('exclamation_count', 0)
-            }
-        }
+        timer = request_timer()
+        scorer = score_emails_micro_batched if micro_batcher is not None else score_emails
+        result = score_emails_cached([email_content], timer, scorer, explain)[0]
+        observe_request('predict', started, timer, [email_content], [result])
+
+        timings = timings_block(started, timer)
+        if timings is not None:
+            result = dict(result, timings=timings)
         
         return jsonify(result)
     
+    except RequestEntityTooLarge:
+        REQUEST_ERRORS.inc('predict', 'too_large')
+        return jsonify({'error': f'Request body exceeds the limit of {MAX_REQUEST_BYTES} bytes'}), 413
+
+    except QueueFullError:
+        # Backpressure: antrian micro-batch penuh
+        REQUEST_ERRORS.inc('predict', 'overloaded')
+        return jsonify({'error': 'Server sedang sibuk, silakan coba lagi'}), 503, {'Retry-After': '1'}
+
+    except TimeoutError:
+        REQUEST_ERRORS.inc('predict', 'timeout')
+        return jsonify({'error': 'Waktu pemrosesan habis, silakan coba lagi'}), 503, {'Retry-After': '1'}
+
     except Exception as e:
+        REQUEST_ERRORS.inc('predict', 'internal')
         import traceback
         print(f"Error during prediction: {e}")
         print(traceback.format_exc())
@@ -820,14 +839,68 @@ def predict():
             'details': str(e)
         }), 500
 
+@app.route('/predict_batch', methods=['POST'])
+def predict_batch():
+    started = time.perf_counter()
+    try:
+        # Body: {"emails": ["isi email 1", "isi email 2", ...], "explain": true}
+        data = request.json
+        emails = data.get('emails') if isinstance(data, dict) else None
+        explain = data.get('explain', True) is not False if isinstance(data, dict) else True
+
+        if not isinstance(emails, list) or not emails:
+            REQUEST_ERRORS.inc('predict_batch', 'bad_request')
+            return jsonify({'error': 'A non-empty "emails" list is required'}), 400
+
+        if len(emails) > MAX_BATCH_SIZE:
+            REQUEST_ERRORS.inc('predict_batch', 'batch_too_large')
+            return jsonify({'error': f'Batch size exceeds the limit of {MAX_BATCH_SIZE} emails'}), 400
+
+        timer = request_timer()
+        results, valid_emails, scored = score_batch(emails, timer, explain)
+        if len(valid_emails) < len(emails):
+            REQUEST_ERRORS.inc('predict_batch', 'invalid_item', amount=len(emails) - len(valid_emails))
+        observe_request('predict_batch', started, timer, valid_emails, scored)
+
+        response = {'count': len(results), 'results': results}
+        timings = timings_block(started, timer)
+        if timings is not None:
+            response['timings'] = timings
+        return jsonify(response)
+
+    except RequestEntityTooLarge:
+        REQUEST_ERRORS.inc('predict_batch', 'too_large')
+        return jsonify({'error': f'Request body exceeds the limit of {MAX_REQUEST_BYTES} bytes'}), 413
+
+    except Exception as e:
+        REQUEST_ERRORS.inc('predict_batch', 'internal')
+        import traceback
+        print(f"Error during batch prediction: {e}")
+        print(traceback.format_exc())
+        return jsonify({
+            'error': 'Terjadi kesalahan saat memproses batch email',
+            'details': str(e)
+        }), 500
+
+@app.route('/admin/reload', methods=['POST'])
+def admin_reload():
+    # Body opsional: {"version": "<versi registry>"}; tanpa versi, CURRENT dimuat ulang
+    data = request.get_json(silent=True)
+    version = data.get('version') if isinstance(data, dict) else None
+    status, payload = reload_model(version, request.headers.get('X-Admin-Token', ''))
+    return jsonify(payload), status
+
 @app.route('/health', methods=['GET'])
 def health_check():
-    return jsonify({
-        'status': 'healthy',
-        'model_type': model_metadata['model_type'],
-        'version': model_metadata['version'],
-        'creation_date': model_metadata['creation_date']
-    })
+    return jsonify(health_payload())
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    # Format teks Prometheus (exposition format 0.0.4)
+    return app.response_class(
+        metrics_registry.render(),
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
 
 if __name__ == '__main__':
     app.run()
\ No newline at end of file
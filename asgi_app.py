@@ -0,0 +1,402 @@
+"""
+Entry point ASGI (asyncio) untuk layanan deteksi phishing.
+
+Route sama dengan app.py: POST /predict, POST /predict_batch, GET /health,
+GET /metrics dan POST /admin/reload, dengan body JSON yang sama. Event loop hanya menangani I/O;
+featurization dan inferensi (CPU-bound) dijalankan di executor terbatas,
+sehingga satu email raksasa tidak menahan request lain di antrian socket.
+
+Konfigurasi (env):
+    ASGI_EXECUTOR          'thread' (default) atau 'process'
+    ASGI_WORKERS           ukuran pool executor (default: jumlah CPU)
+    ASGI_MAX_CONCURRENCY   request scoring yang boleh berjalan/antri di executor;
+                           di atas batas ini langsung dijawab 503 (default 64)
+    ASGI_REQUEST_TIMEOUT   batas waktu scoring per request dalam detik (default 10)
+    ASGI_MAX_BODY_BYTES    ukuran body maksimum (default MAX_REQUEST_BYTES), di atasnya 413
+    ASGI_SHUTDOWN_TIMEOUT  waktu tunggu request yang masih berjalan saat shutdown
+
+Dengan executor 'process', cache prediksi, micro-batcher dan model aktif
+berada di tiap worker, bukan di proses utama: /admin/reload hanya menukar
+model proses utama, worker mengikuti CURRENT di registry lewat watcher
+(MODEL_REGISTRY + MODEL_WATCH_INTERVAL).
+
+Jalankan:
+    python asgi_app.py --host 0.0.0.0 --port 8000
+    uvicorn asgi_app:application --port 8000
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import app
+from featurizer import NULL_TIMER, StageTimer
+from micro_batcher import QueueFullError
+
+EXECUTOR_KIND = os.environ.get('ASGI_EXECUTOR', 'thread')
+EXECUTOR_WORKERS = int(os.environ.get('ASGI_WORKERS', 0)) or os.cpu_count() or 1
+MAX_CONCURRENCY = int(os.environ.get('ASGI_MAX_CONCURRENCY', 64))
+REQUEST_TIMEOUT = float(os.environ.get('ASGI_REQUEST_TIMEOUT', 10))
+MAX_BODY_BYTES = int(os.environ.get('ASGI_MAX_BODY_BYTES', app.MAX_REQUEST_BYTES))
+SHUTDOWN_TIMEOUT = float(os.environ.get('ASGI_SHUTDOWN_TIMEOUT', 30))
+
+JSON_CONTENT_TYPE = b'application/json'
+METRICS_CONTENT_TYPE = b'text/plain; version=0.0.4; charset=utf-8'
+
+
+# === SCORING DI EXECUTOR ===
+# Fungsi level modul agar bisa di-pickle untuk ProcessPoolExecutor; durasi
+# tahap dikembalikan sebagai dict karena timer tidak bisa melintasi proses.
+def _score_single(email_content, timed, explain=True):
+    timer = StageTimer() if timed else NULL_TIMER
+    scorer = app.score_emails_micro_batched if app.micro_batcher is not None else app.score_emails
+    result = app.score_emails_cached([email_content], timer, scorer, explain)[0]
+    return result, timer.totals
+
+
+def _score_batch(emails, timed, explain=True):
+    timer = StageTimer() if timed else NULL_TIMER
+    results, valid_emails, scored = app.score_batch(emails, timer, explain)
+    return results, len(valid_emails), scored, timer.totals
+
+
+def _warm_up(_):
+    return os.getpid()
+
+
+class ScoringExecutor:
+    """
+    Executor terbatas untuk scoring plus batas konkurensi dan timeout per request.
+
+    Slot konkurensi baru dilepas saat pekerjaan di executor benar-benar selesai
+    (bukan saat timeout), sehingga request yang timeout tetap terhitung dan
+    antrian executor tidak bisa tumbuh tanpa batas.
+    """
+
+    def __init__(self, kind=EXECUTOR_KIND, workers=EXECUTOR_WORKERS, max_concurrency=MAX_CONCURRENCY,
+                 timeout=REQUEST_TIMEOUT):
+        if kind not in ('thread', 'process'):
+            raise ValueError(f"ASGI_EXECUTOR tidak dikenal: {kind} (pilihan: thread, process)")
+        self.kind = kind
+        self.workers = workers
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.in_flight = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.closing = False
+        self._idle = None
+        self._executor = None
+
+    def start(self):
+        if self.kind == 'process':
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            # Jalankan semua worker lebih dulu agar request pertama tidak menanggung startup
+            list(self._executor.map(_warm_up, range(self.workers)))
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='asgi-score')
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    def _release(self, _future):
+        self.in_flight -= 1
+        if self.in_flight == 0:
+            self._idle.set()
+
+    async def run(self, func, *args):
+        """Jalankan func(*args) di executor; QueueFullError jika penuh, TimeoutError jika lewat batas."""
+        if self.closing or self.in_flight >= self.max_concurrency:
+            self.rejected += 1
+            raise QueueFullError(f"Batas konkurensi tercapai ({self.max_concurrency} request)")
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._executor, func, *args)
+        self.in_flight += 1
+        self._idle.clear()
+        future.add_done_callback(self._release)
+        try:
+            # shield: timeout tidak membatalkan future sehingga slot tetap terpakai sampai selesai
+            return await asyncio.wait_for(asyncio.shield(future), self.timeout)
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            raise TimeoutError("Melewati batas waktu scoring")
+
+    async def shutdown(self, timeout=SHUTDOWN_TIMEOUT):
+        """Tolak request baru, tunggu yang masih berjalan, lalu matikan pool."""
+        self.closing = True
+        if self._idle is not None:
+            try:
+                await asyncio.wait_for(self._idle.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        if self._executor is not None:
+            await asyncio.get_running_loop().run_in_executor(
+                None, lambda: self._executor.shutdown(wait=True, cancel_futures=True))
+            self._executor = None
+
+    def stats(self):
+        return {
+            'kind': self.kind,
+            'workers': self.workers,
+            'max_concurrency': self.max_concurrency,
+            'timeout_seconds': self.timeout,
+            'in_flight': self.in_flight,
+            'rejected': self.rejected,
+            'timed_out': self.timed_out
+        }
+
+
+scoring_executor = ScoringExecutor()
+
+
+def asgi_metrics():
+    stats = scoring_executor.stats()
+    return [
+        ('phishing_asgi_in_flight', 'gauge', 'ASGI: request scoring yang sedang berjalan/antri', stats['in_flight']),
+        ('phishing_asgi_rejected_total', 'counter', 'ASGI: ditolak karena batas konkurensi', stats['rejected']),
+        ('phishing_asgi_timeouts_total', 'counter', 'ASGI: melewati ASGI_REQUEST_TIMEOUT', stats['timed_out']),
+    ]
+
+
+app.metrics_registry.add_collector(asgi_metrics)
+
+
+# === HTTP ===
+class HTTPError(Exception):
+    def __init__(self, status, payload, headers=()):
+        super().__init__(payload.get('error'))
+        self.status = status
+        self.payload = payload
+        self.headers = list(headers)
+
+
+def encode_json(payload):
+    # Serializer JSON Flask (mode ringkas, seperti jsonify tanpa debug) agar body identik dengan app.py
+    return (app.app.json.dumps(payload, separators=(',', ':')) + '\n').encode('utf-8')
+
+
+async def send_response(send, status, body, content_type=JSON_CONTENT_TYPE, headers=()):
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [
+            (b'content-type', content_type),
+            (b'content-length', str(len(body)).encode('ascii')),
+            (b'access-control-allow-origin', b'*'),
+            *headers,
+        ]
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def read_body(receive):
+    chunks = []
+    size = 0
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            raise ConnectionError("Klien memutus koneksi")
+        chunk = message.get('body', b'')
+        size += len(chunk)
+        if size > MAX_BODY_BYTES:
+            raise HTTPError(413, {'error': f'Request body exceeds the limit of {MAX_BODY_BYTES} bytes'})
+        chunks.append(chunk)
+        if not message.get('more_body', False):
+            return b''.join(chunks)
+
+
+async def read_json(receive):
+    body = await read_body(receive)
+    try:
+        return json.loads(body)
+    except ValueError:
+        raise HTTPError(400, {'error': 'Request body must be valid JSON'})
+
+
+def wants_timings(scope):
+    header = app.DEBUG_TIMINGS_HEADER.lower().encode('latin-1')
+    return any(name == header and value for name, value in scope['headers'])
+
+
+def stage_timer(totals):
+    timer = StageTimer()
+    if totals:
+        timer.merge(totals)
+    return timer
+
+
+async def handle_predict(scope, receive):
+    started = time.perf_counter()
+    data = await read_json(receive)
+    email_content = data.get('email_content', '') if isinstance(data, dict) else ''
+    explain = data.get('explain', True) is not False if isinstance(data, dict) else True
+    if not email_content:
+        app.REQUEST_ERRORS.inc('predict', 'bad_request')
+        raise HTTPError(400, {'error': 'Email content is required'})
+
+    if len(email_content) > app.MAX_EMAIL_CHARS:
+        app.REQUEST_ERRORS.inc('predict', 'too_large')
+        raise HTTPError(413, {'error': app.email_error(email_content)})
+
+    timed = app.METRICS_ENABLED or wants_timings(scope)
+    result, totals = await scoring_executor.run(_score_single, email_content, timed, explain)
+    timer = stage_timer(totals)
+    app.observe_request('predict', started, timer, [email_content], [result])
+
+    if wants_timings(scope):
+        result = dict(result, timings=app.timings_payload(started, timer))
+    return result
+
+
+async def handle_predict_batch(scope, receive):
+    started = time.perf_counter()
+    data = await read_json(receive)
+    emails = data.get('emails') if isinstance(data, dict) else None
+    explain = data.get('explain', True) is not False if isinstance(data, dict) else True
+
+    if not isinstance(emails, list) or not emails:
+        app.REQUEST_ERRORS.inc('predict_batch', 'bad_request')
+        raise HTTPError(400, {'error': 'A non-empty "emails" list is required'})
+
+    if len(emails) > app.MAX_BATCH_SIZE:
+        app.REQUEST_ERRORS.inc('predict_batch', 'batch_too_large')
+        raise HTTPError(400, {'error': f'Batch size exceeds the limit of {app.MAX_BATCH_SIZE} emails'})
+
+    timed = app.METRICS_ENABLED or wants_timings(scope)
+    results, valid_count, scored, totals = await scoring_executor.run(_score_batch, emails, timed, explain)
+    if valid_count < len(emails):
+        app.REQUEST_ERRORS.inc('predict_batch', 'invalid_item', amount=len(emails) - valid_count)
+    timer = stage_timer(totals)
+    valid_emails = [email_content for email_content in emails if app.email_error(email_content) is None]
+    app.observe_request('predict_batch', started, timer, valid_emails, scored)
+
+    response = {'count': len(results), 'results': results}
+    if wants_timings(scope):
+        response['timings'] = app.timings_payload(started, timer)
+    return response
+
+
+async def handle_admin_reload(scope, receive):
+    # Memuat model baru lambat (detik): di executor default, bukan di executor scoring
+    data = json.loads(await read_body(receive) or b'null')
+    version = data.get('version') if isinstance(data, dict) else None
+    header = b'x-admin-token'
+    token = next((value.decode('latin-1') for name, value in scope['headers'] if name == header), '')
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, app.reload_model, version, token)
+
+
+async def handle_health(scope, receive):
+    return dict(app.health_payload(), server='asgi', executor=scoring_executor.stats())
+
+
+SCORING_ROUTES = {
+    '/predict': ('predict', handle_predict),
+    '/predict_batch': ('predict_batch', handle_predict_batch),
+}
+
+
+async def handle_http(scope, receive, send):
+    path, method = scope['path'], scope['method']
+
+    if method == 'OPTIONS':
+        # Preflight CORS (setara flask_cors di app.py)
+        return await send_response(send, 200, b'', headers=[
+            (b'access-control-allow-methods', b'GET, POST, OPTIONS'),
+            (b'access-control-allow-headers', b'*'),
+        ])
+
+    if path == '/health' and method == 'GET':
+        return await send_response(send, 200, encode_json(await handle_health(scope, receive)))
+
+    if path == '/metrics' and method == 'GET':
+        return await send_response(send, 200, app.metrics_registry.render().encode('utf-8'), METRICS_CONTENT_TYPE)
+
+    if path == '/admin/reload' and method == 'POST':
+        try:
+            status, payload = await handle_admin_reload(scope, receive)
+        except HTTPError as e:
+            status, payload = e.status, e.payload
+        except ValueError:
+            status, payload = 400, {'error': 'Request body must be valid JSON'}
+        except ConnectionError:
+            return
+        return await send_response(send, status, encode_json(payload))
+
+    if path not in SCORING_ROUTES:
+        return await send_response(send, 404, encode_json({'error': 'Not found'}))
+    if method != 'POST':
+        return await send_response(send, 405, encode_json({'error': 'Method not allowed'}),
+                                   headers=[(b'allow', b'POST, OPTIONS')])
+
+    endpoint, handler = SCORING_ROUTES[path]
+    try:
+        payload = await handler(scope, receive)
+        await send_response(send, 200, encode_json(payload))
+
+    except HTTPError as e:
+        await send_response(send, e.status, encode_json(e.payload), headers=e.headers)
+
+    except QueueFullError:
+        # Backpressure: batas konkurensi executor atau antrian micro-batch penuh
+        app.REQUEST_ERRORS.inc(endpoint, 'overloaded')
+        await send_response(send, 503, encode_json({'error': 'Server sedang sibuk, silakan coba lagi'}),
+                            headers=[(b'retry-after', b'1')])
+
+    except TimeoutError:
+        app.REQUEST_ERRORS.inc(endpoint, 'timeout')
+        await send_response(send, 503, encode_json({'error': 'Waktu pemrosesan habis, silakan coba lagi'}),
+                            headers=[(b'retry-after', b'1')])
+
+    except ConnectionError:
+        app.REQUEST_ERRORS.inc(endpoint, 'disconnected')
+
+    except Exception as e:
+        app.REQUEST_ERRORS.inc(endpoint, 'internal')
+        import traceback
+        print(f"Error during {endpoint}: {e}")
+        print(traceback.format_exc())
+        await send_response(send, 500, encode_json({
+            'error': 'Terjadi kesalahan saat memproses email',
+            'details': str(e)
+        }))
+
+
+async def handle_lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            try:
+                scoring_executor.start()
+            except Exception as e:
+                await send({'type': 'lifespan.startup.failed', 'message': str(e)})
+                return
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await scoring_executor.shutdown()
+            if app.micro_batcher is not None:
+                app.micro_batcher.close()
+            app.model_holder.close()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        await handle_lifespan(receive, send)
+    elif scope['type'] == 'http':
+        await handle_http(scope, receive, send)
+
+
+if __name__ == '__main__':
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description='Layanan deteksi phishing (ASGI)')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--log-level', default='warning')
+    args = parser.parse_args()
+
+    uvicorn.run(application, host=args.host, port=args.port, log_level=args.log_level, lifespan='on',
+                timeout_graceful_shutdown=SHUTDOWN_TIMEOUT)
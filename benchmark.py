@@ -0,0 +1,1210 @@
+"""
+Benchmark untuk jalur ekstraksi fitur dan prediksi.
+
+Contoh:
+    python benchmark.py keywords --sizes 10000 100000 1000000
+    python benchmark.py batch --batch-sizes 1 32 256
+    python benchmark.py scaling --workers 1 2 4 8
+    python benchmark.py pipeline --output bench.json --baseline bench_lama.json
+    python benchmark.py coldstart --repeat 5
+    python benchmark.py inference --batch-sizes 1 32 256 --threads 1
+    python benchmark.py tfidf --categories short large --batch-size 256
+    python benchmark.py microbatch --concurrency 1 8 32 --wait-ms 2 5
+    python benchmark.py servers --concurrency 1 8 32 --huge-every 50
+    python benchmark.py fuzz --sizes 10000 1000000 20000000 --max-ms 1000
+    python benchmark.py campaign --campaigns 20 --variants 50 --unique 300
+    python benchmark.py explain --batch-sizes 1 32 256
+    python benchmark.py reputation --entries 10000000
+    python benchmark.py prefork --workers 1 4 16
+"""
+import argparse
+import base64
+import gc
+import http.client
+import json
+import os
+import platform
+import random
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+import numpy as np
+from scipy.sparse import csr_matrix, hstack
+
+import app
+import featurizer
+from campaign_index import CampaignIndex
+from explanations import EXPLAIN_METHODS, ContributionExplainer
+from featurizer.reputation import FLAG_BAD, FLAG_GOOD, FLAG_NEW, DomainReputation, build_reputation_index
+from inference import BoosterEngine, CompiledTreeEngine
+from micro_batcher import MicroBatcher
+from parallel_features import ParallelFeaturizer
+
+
+# === GENERATOR EMAIL SINTETIS ===
+NEWSLETTER_BLOCK = (
+    '<table class="row"><tr><td><div style="font-family:Arial">'
+    '<h2>Weekly update from the team</h2>'
+    '<p>Hello there, here is what happened this week. Read more at '
+    'https://news.example.com/articles/{i}?utm_source=newsletter</p>'
+    '<img src="https://cdn.example.com/img/{i}.png" alt="banner">'
+    '<a href="https://example.com/unsubscribe?id={i}">Unsubscribe</a>'
+    '</div></td></tr></table>\n'
+)
+
+
+def generate_html_newsletter(target_chars, seed=0):
+    rng = random.Random(seed)
+    parts = ['<html><body>']
+    size = len(parts[0])
+    i = 0
+    while size < target_chars:
+        block = NEWSLETTER_BLOCK.format(i=rng.randint(0, 10 ** 6))
+        parts.append(block)
+        size += len(block)
+        i += 1
+    parts.append('</body></html>')
+    return ''.join(parts)
+
+
+PHISHING_TEMPLATES = [
+    "URGENT: Your {brand} account has been suspended! Verify your account immediately at "
+    "http://{ip}/login or it will be closed within 24 hours. Dear Customer, click here to confirm.",
+    "Dear user, we detected unusual sign-in activity. Please confirm your identity and provide your "
+    "password at https://{brand}-secure-update.tk/verify?id={n}. Failure will result in a penalty fee!!!",
+    "Congratulations! You win a FREE prize. Claim your reward now: http://bit.ly/{n} "
+    "Only 2 left, last chance! Send your card number and cvv to claim.",
+]
+BENIGN_TEMPLATES = [
+    "Hi team, attached are the meeting notes from {day}. Let me know if anything is missing. "
+    "We will review the quarterly plan next week. Thanks, {name}",
+    "Hello {name}, thanks for your order #{n}. Your package will arrive on {day}. "
+    "You can track the shipment from your account page.",
+    "Reminder: the project sync moved to {day} afternoon. Agenda: roadmap, hiring, budget. "
+    "Please update the shared document before the call.",
+]
+HEADER_TEMPLATE = "From: {name}@{domain} {date}\n"
+
+
+def generate_email(rng, phishing):
+    template = rng.choice(PHISHING_TEMPLATES if phishing else BENIGN_TEMPLATES)
+    body = template.format(
+        brand=rng.choice(['paypal', 'amazon', 'microsoft', 'apple']),
+        ip='.'.join(str(rng.randint(1, 254)) for _ in range(4)),
+        n=rng.randint(1000, 999999),
+        day=rng.choice(['Monday', 'Tuesday', 'Friday']),
+        name=rng.choice(['alice', 'bob', 'citra', 'dimas']),
+    )
+    header = HEADER_TEMPLATE.format(
+        name=rng.choice(['support', 'noreply', 'alice', 'bob']),
+        domain=rng.choice(['paypal.com', 'gmail.com', 'secure-login.tk', 'company.co.id']),
+        date=rng.choice(['Mon Jan 12 2024', 'Sat Mar 2 2024', 'Wed Oct 9 2024']),
+    )
+    return header + body
+
+
+def generate_corpus(n, seed=0):
+    rng = random.Random(seed)
+    return [generate_email(rng, phishing=rng.random() < 0.4) for _ in range(n)]
+
+
+def time_call(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def generate_category_corpus(category, n, seed=0):
+    """Korpus per kategori ukuran: short (~300 char), medium (~3 KB), large (~60 KB), html (~20 KB)."""
+    rng = random.Random(seed)
+    emails = []
+    for i in range(n):
+        phishing = rng.random() < 0.4
+        if category == 'short':
+            emails.append(generate_email(rng, phishing))
+        elif category == 'medium':
+            emails.append(generate_email(rng, phishing) + '\n' + ' '.join(
+                generate_email(rng, rng.random() < 0.4) for _ in range(12)))
+        elif category == 'large':
+            emails.append(generate_email(rng, phishing) + '\n' + ' '.join(
+                generate_email(rng, rng.random() < 0.4) for _ in range(250)))
+        elif category == 'html':
+            emails.append(generate_email(rng, phishing) + '\n' + generate_html_newsletter(20000, seed=seed + i))
+        else:
+            raise ValueError(f"Unknown category: {category}")
+    return emails
+
+
+# === BENCHMARK: KEYWORD ENGINE ===
+def extract_keyword_features(text, scan):
+    featurizer.extract_phishing_features(text, scan)
+    featurizer.extract_brand_features(text, scan)
+    featurizer.extract_file_extension_features(text, scan)
+    featurizer.advanced_sender_analysis('news@example.com', text, scan)
+    featurizer.extract_email_security_features(text, scan)
+
+
+def bench_keywords(args):
+    engine = featurizer.keyword_engine
+    print(f"{'chars':>10} {'naive (ms)':>12} {'engine (ms)':>12} {'speedup':>8}")
+    for size in args.sizes:
+        text = generate_html_newsletter(size)
+
+        # Pastikan kedua jalur menghasilkan fitur yang identik
+        naive_scan = engine.scan_naive(text)
+        fast_scan = engine.scan(text)
+        assert naive_scan.found == fast_scan.found
+
+        naive = time_call(lambda: extract_keyword_features(text, engine.scan_naive(text)), args.repeat)
+        fast = time_call(lambda: extract_keyword_features(text, engine.scan(text)), args.repeat)
+        print(f"{len(text):>10} {naive * 1000:>12.2f} {fast * 1000:>12.2f} {naive / fast:>7.1f}x")
+
+
+# === BENCHMARK: BATCH ENDPOINT ===
+def bench_batch(args):
+    client = app.app.test_client()
+    # Cache prediksi dimatikan agar yang diukur adalah scoring sebenarnya
+    app.prediction_cache.max_entries = 0
+    print(f"{'batch':>6} {'single (emails/s)':>18} {'batch (emails/s)':>17} {'speedup':>8}")
+    for batch_size in args.batch_sizes:
+        emails = generate_corpus(batch_size, seed=batch_size)
+
+        def single_calls():
+            for email_content in emails:
+                response = client.post('/predict', json={'email_content': email_content})
+                assert response.status_code == 200
+
+        def batch_call():
+            response = client.post('/predict_batch', json={'emails': emails})
+            assert response.status_code == 200
+
+        single = time_call(single_calls, args.repeat)
+        batch = time_call(batch_call, args.repeat)
+        print(f"{batch_size:>6} {batch_size / single:>18.1f} {batch_size / batch:>17.1f} {single / batch:>7.1f}x")
+
+
+# === BENCHMARK: PARALLEL FEATURIZATION ===
+def bench_scaling(args):
+    emails = generate_corpus(args.emails, seed=7)
+    emails += [generate_html_newsletter(20000, seed=i) for i in range(args.emails // 50)]
+    serial_X, serial_batch = featurizer.combine_batches(
+        ParallelFeaturizer(app.featurize_shard, 1, args.shard_size).map(emails))
+
+    print(f"{len(emails)} emails, shard size {args.shard_size}, {os.cpu_count()} cores")
+    print(f"{'workers':>7} {'seconds':>8} {'emails/s':>9} {'speedup':>8}")
+    baseline = None
+    for workers in args.workers:
+        with ParallelFeaturizer(app.featurize_shard, workers, args.shard_size) as pool:
+            pool.warm_up()
+            start = time.perf_counter()
+            batches = pool.map(emails)
+            elapsed = time.perf_counter() - start
+
+        # Hasil paralel harus identik dengan jalur serial
+        X_combined, batch = featurizer.combine_batches(batches)
+        assert (X_combined != serial_X).nnz == 0
+        assert np.array_equal(batch.numeric, serial_batch.numeric) and batch.meta == serial_batch.meta
+
+        baseline = baseline or elapsed
+        print(f"{workers:>7} {elapsed:>8.2f} {len(emails) / elapsed:>9.1f} {baseline / elapsed:>7.1f}x")
+
+
+# === BENCHMARK: TAHAPAN PIPELINE /predict ===
+PIPELINE_CATEGORIES = ['short', 'medium', 'large', 'html']
+EXTRACTOR_STAGES = [
+    'extract_phishing_features', 'extract_url_features', 'extract_brand_features',
+    'extract_sender_features', 'extract_file_extension_features',
+    'advanced_sender_analysis', 'extract_email_security_features',
+]
+
+
+def staged_predict(email_content, timings):
+    """
+    Jalankan pipeline /predict untuk satu email tahap demi tahap (urutan sama
+    dengan Featurizer.featurize_into dan app.score_emails) dan catat durasi
+    tiap tahap ke `timings` (dict nama tahap -> list detik).
+    """
+    clock = time.perf_counter
+    state = app.model_holder.current
+    layout = state.featurizer.layout
+    row = layout.empty_row()
+    features = featurizer.FeatureRow(layout, row)
+
+    def record(stage, start):
+        timings.setdefault(stage, []).append(clock() - start)
+
+    start = clock()
+    cleaned_text, extracted_date, extracted_sender = featurizer.enhanced_preprocess_combined_text(email_content)
+    record('preprocess', start)
+
+    start = clock()
+    scan = featurizer.keyword_engine.scan(email_content)
+    record('keyword_scan', start)
+
+    calls = {
+        'extract_phishing_features': lambda: featurizer.extract_phishing_features(email_content, scan, features),
+        'extract_url_features': lambda: featurizer.extract_url_features(email_content, features),
+        'extract_brand_features': lambda: featurizer.extract_brand_features(email_content, scan, features),
+        'extract_sender_features': lambda: featurizer.extract_sender_features(extracted_sender, features),
+        'extract_file_extension_features': lambda: featurizer.extract_file_extension_features(
+            email_content, scan, features),
+        'advanced_sender_analysis': lambda: featurizer.advanced_sender_analysis(
+            extracted_sender, email_content, scan, features),
+        'extract_email_security_features': lambda: featurizer.extract_email_security_features(
+            email_content, scan, features),
+    }
+    for stage in EXTRACTOR_STAGES:
+        start = clock()
+        calls[stage]()
+        record(stage, start)
+
+    # Pengganti "DataFrame assembly" lama: fitur turunan ditulis ke baris float32
+    start = clock()
+    features['text_length'] = len(cleaned_text.split())
+    features['has_attachment'] = 1 if scan.contains('attached file') else 0
+    featurizer.add_date_features(extracted_date, features)
+    record('assembly', start)
+
+    start = clock()
+    X_tfidf = state.tfidf.transform([cleaned_text])
+    record('tfidf_transform', start)
+
+    start = clock()
+    X_combined = hstack([X_tfidf, csr_matrix(row.reshape(1, -1))]).tocsr()
+    record('hstack', start)
+
+    start = clock()
+    probabilities = state.engine.predict_proba(X_combined)
+    record('predict_proba', start)
+
+    prob_safe, prob_phishing = float(probabilities[0][0]), float(probabilities[0][1])
+    start = clock()
+    app.generate_explanation(features, app.classify_probability(prob_phishing), prob_phishing, prob_safe)
+    record('generate_explanation', start)
+
+    return row, X_combined
+
+
+def summarize(samples):
+    samples = np.asarray(samples) * 1000
+    return {
+        'n': int(len(samples)),
+        'mean_ms': round(float(samples.mean()), 4),
+        'p50_ms': round(float(np.percentile(samples, 50)), 4),
+        'p95_ms': round(float(np.percentile(samples, 95)), 4),
+        'p99_ms': round(float(np.percentile(samples, 99)), 4),
+        'throughput_per_s': round(float(len(samples) / (samples.sum() / 1000)), 2) if samples.sum() else None,
+    }
+
+
+def compare_with_baseline(results, baseline, tolerance, min_delta_ms):
+    """Tandai tahap yang p50/p95-nya naik lebih dari `tolerance` (dan lebih dari min_delta_ms)."""
+    regressions = []
+    for category, stages in results.items():
+        for stage, current in stages.items():
+            previous = baseline.get(category, {}).get(stage)
+            if previous is None:
+                continue
+            for metric in ('p50_ms', 'p95_ms'):
+                old, new = previous[metric], current[metric]
+                if new - old > min_delta_ms and new > old * (1 + tolerance):
+                    regressions.append(f"{category}/{stage} {metric}: {old:.3f} -> {new:.3f} ms "
+                                       f"(+{(new / old - 1) * 100 if old else float('inf'):.0f}%)")
+    return regressions
+
+
+def bench_pipeline(args):
+    client = app.app.test_client()
+    # Cache prediksi dimatikan agar yang diukur adalah scoring sebenarnya
+    app.prediction_cache.max_entries = 0
+
+    results = {}
+    for category in args.categories:
+        emails = generate_category_corpus(category, args.emails, seed=args.seed)
+        timings = {}
+
+        # Pemanasan (regex, tabel, booster) di luar pengukuran
+        for email_content in emails[:3]:
+            staged_predict(email_content, {})
+            client.post('/predict', json={'email_content': email_content})
+
+        for _ in range(args.repeat):
+            for email_content in emails:
+                row, X_combined = staged_predict(email_content, timings)
+
+                start = time.perf_counter()
+                response = client.post('/predict', json={'email_content': email_content})
+                timings.setdefault('http_predict', []).append(time.perf_counter() - start)
+                assert response.status_code == 200
+
+        # Jalur bertahap harus sama persis dengan Featurizer yang dipakai app
+        reference, _, _ = app.model_holder.current.featurizer.featurize(emails[0])
+        assert np.array_equal(staged_predict(emails[0], {})[0], reference)
+
+        timings['featurize_total'] = [
+            sum(timings[stage][i] for stage in ['preprocess', 'keyword_scan', *EXTRACTOR_STAGES, 'assembly'])
+            for i in range(len(timings['preprocess']))
+        ]
+        results[category] = {stage: summarize(samples) for stage, samples in timings.items()}
+        avg_chars = sum(len(e) for e in emails) / len(emails)
+
+        print(f"\n[{category}] {len(emails)} emails x {args.repeat}, rata-rata {avg_chars:.0f} char")
+        print(f"{'stage':<34} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'per s':>10}")
+        for stage, summary in results[category].items():
+            print(f"{stage:<34} {summary['p50_ms']:>9.3f} {summary['p95_ms']:>9.3f} "
+                  f"{summary['p99_ms']:>9.3f} {summary['throughput_per_s'] or 0:>10.1f}")
+
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'emails_per_category': args.emails,
+            'repeat': args.repeat,
+            'seed': args.seed,
+            'model_version': app.current_model_version(),
+        },
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nHasil disimpan ke {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+        regressions = compare_with_baseline(results, baseline, args.tolerance, args.min_delta_ms)
+        print(f"\nDibandingkan dengan {args.baseline}: "
+              f"{'tidak ada regresi' if not regressions else f'{len(regressions)} regresi'}")
+        for regression in regressions:
+            print(f"    - {regression}")
+        if regressions:
+            raise SystemExit(1)
+
+
+# === BENCHMARK: COLD START ===
+COLDSTART_CHILD = """
+import json, sys, time
+import app
+client = app.app.test_client()
+response = client.post('/predict', json={'email_content': 'From: support@paypal.com Verify your account now'})
+assert response.status_code == 200, response.get_data(as_text=True)
+print(json.dumps({'ready_at': time.time(), 'model_source': app.model_holder.current.source}))
+"""
+
+
+def bench_coldstart(args):
+    env = dict(os.environ)
+    if args.model_bundle is not None:
+        # String kosong memaksa jalur lama (lima file joblib)
+        env['MODEL_BUNDLE'] = args.model_bundle
+
+    timings = []
+    for _ in range(args.repeat):
+        started = time.time()
+        output = subprocess.run([sys.executable, '-c', COLDSTART_CHILD], env=env, check=True,
+                                capture_output=True, text=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        timings.append(result['ready_at'] - started)
+
+    print(f"model source: {result['model_source']}")
+    print(f"proses start -> /predict pertama sukses: min {min(timings):.3f} s, "
+          f"median {float(np.median(timings)):.3f} s ({args.repeat} kali)")
+
+
+# === BENCHMARK: ENGINE INFERENSI ===
+def inference_engines(threads):
+    """Engine yang dibandingkan: nama -> fungsi predict_proba(X)."""
+    model = app.model_holder.current.model
+    return {
+        'wrapper': model.predict_proba,
+        'booster': BoosterEngine(model, nthread=threads).predict_proba,
+        'compiled': CompiledTreeEngine.from_model(model).predict_proba,
+    }
+
+
+def bench_inference(args):
+    emails = generate_corpus(max(args.batch_sizes), seed=11)
+    state = app.model_holder.current
+    X_all, _ = featurizer.combine_batches([state.featurizer.featurize_batch(emails)])
+    engines = inference_engines(args.threads)
+    names = list(engines)
+
+    print(f"threads: {args.threads or 'bawaan XGBoost'}; latensi median per panggilan (ms)")
+    print(f"{'batch':>6} " + ' '.join(f"{name:>10}" for name in names) + f" {'speedup':>8}")
+    for batch_size in args.batch_sizes:
+        X = X_all[:batch_size]
+        expected = state.model.predict_proba(X)
+        medians = []
+        for name in names:
+            predict_proba = engines[name]
+            assert np.abs(predict_proba(X) - expected).max() <= 1e-6
+            samples = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                predict_proba(X)
+                samples.append(time.perf_counter() - start)
+            medians.append(float(np.median(samples)) * 1000)
+        print(f"{batch_size:>6} " + ' '.join(f"{m:>10.3f}" for m in medians) + f" {medians[0] / min(medians):>7.1f}x")
+
+
+# === BENCHMARK: TF-IDF LANGSUNG VS SKLEARN ===
+TFIDF_CATEGORIES = ['short', 'medium', 'large', 'html']
+
+
+def peak_allocation(func):
+    """Puncak alokasi Python (byte) selama satu panggilan func()."""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def bench_tfidf(args):
+    tfidf = app.model_holder.current.tfidf
+    vectorizer = app.model_holder.current.featurizer.vectorizer
+    print("latensi median per email (ms), puncak alokasi satu batch (KB)")
+    print(f"{'kategori':>8} {'single sk':>10} {'direct':>8} {'speedup':>8} "
+          f"{'batch sk':>9} {'direct':>8} {'speedup':>8} {'mem sk':>8} {'direct':>8}")
+    for category in args.categories:
+        emails = generate_category_corpus(category, args.batch_size, seed=5)
+        cleaned_texts = [featurizer.enhanced_preprocess_combined_text(e)[0] for e in emails]
+        assert (vectorizer.transform(cleaned_texts) != tfidf.transform(cleaned_texts)).nnz == 0
+
+        row = [category]
+        for transform in (tfidf.transform, vectorizer.transform):
+            samples = []
+            for _ in range(args.repeat):
+                for text in cleaned_texts[:args.singles]:
+                    start = time.perf_counter()
+                    transform([text])
+                    samples.append(time.perf_counter() - start)
+            row.append(float(np.median(samples)) * 1000)
+        row.append(row[1] / row[2])
+        for transform in (tfidf.transform, vectorizer.transform):
+            row.append(time_call(lambda: transform(cleaned_texts), args.repeat) / len(cleaned_texts) * 1000)
+        row.append(row[4] / row[5])
+        for transform in (tfidf.transform, vectorizer.transform):
+            row.append(peak_allocation(lambda: transform(cleaned_texts)) / 1024)
+        print(f"{row[0]:>8} {row[1]:>10.3f} {row[2]:>8.3f} {row[3]:>7.1f}x "
+              f"{row[4]:>9.3f} {row[5]:>8.3f} {row[6]:>7.1f}x {row[7]:>8.0f} {row[8]:>8.0f}")
+
+
+# === BENCHMARK: MICRO-BATCHING DI BAWAH BEBAN KONKUREN ===
+def run_concurrent_load(emails, concurrency, path='/predict'):
+    """`concurrency` thread klien mengirim semua email bergiliran; kembalikan (detik, latensi, status)."""
+    latencies = []
+    statuses = []
+    lock = threading.Lock()
+    positions = iter(range(len(emails)))
+
+    def worker():
+        client = app.app.test_client()
+        local_latencies, local_statuses = [], []
+        while True:
+            with lock:
+                i = next(positions, None)
+            if i is None:
+                break
+            start = time.perf_counter()
+            response = client.post(path, json={'email_content': emails[i]})
+            local_latencies.append(time.perf_counter() - start)
+            local_statuses.append(response.status_code)
+        with lock:
+            latencies.extend(local_latencies)
+            statuses.extend(local_statuses)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start, latencies, statuses
+
+
+def bench_microbatch(args):
+    # Cache prediksi dimatikan agar yang diukur adalah scoring sebenarnya
+    app.prediction_cache.max_entries = 0
+    emails = generate_corpus(args.requests, seed=5)
+    modes = [('direct', None)] + [(f'micro {wait:g}ms', wait) for wait in args.wait_ms]
+
+    print(f"{args.requests} request /predict per konfigurasi, max batch {args.max_batch}")
+    print(f"{'concurrency':>11} {'mode':>12} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+          f"{'avg batch':>9} {'503':>5}")
+    for concurrency in args.concurrency:
+        for name, wait_ms in modes:
+            app.micro_batcher = None if wait_ms is None else MicroBatcher(
+                app.score_micro_batch, max_batch=args.max_batch, max_wait=wait_ms / 1000,
+                max_queue=args.max_queue, on_batch=app.observe_micro_batch)
+            run_concurrent_load(emails[:20], concurrency)
+            elapsed, latencies, statuses = run_concurrent_load(emails, concurrency)
+            batch_size = app.micro_batcher.stats()['avg_batch_size'] if app.micro_batcher else 1
+            if app.micro_batcher is not None:
+                app.micro_batcher.close()
+            latencies = np.array(latencies) * 1000
+            print(f"{concurrency:>11} {name:>12} {len(latencies) / elapsed:>8.1f} "
+                  f"{np.percentile(latencies, 50):>8.2f} {np.percentile(latencies, 95):>8.2f} "
+                  f"{np.percentile(latencies, 99):>8.2f} {batch_size:>9} {statuses.count(503):>5}")
+    app.micro_batcher = None
+
+
+# === BENCHMARK: FLASK VS ASGI DI BELAKANG SOCKET HTTP ===
+FLASK_SERVER = "import sys, app; app.app.run(port=int(sys.argv[1]))"
+
+# nama -> (argumen proses server, env tambahan)
+SERVER_MODES = {
+    'flask': (['-c', FLASK_SERVER], {}),
+    'asgi-thread': (['asgi_app.py', '--port'], {'ASGI_EXECUTOR': 'thread'}),
+    'asgi-process': (['asgi_app.py', '--port'], {'ASGI_EXECUTOR': 'process'}),
+    'prefork': (['prefork.py', '--port'], {}),
+}
+
+
+def start_server(mode, port, env_overrides):
+    args, env_extra = SERVER_MODES[mode]
+    env = dict(os.environ, PREDICTION_CACHE_SIZE='0')
+    env.update(env_extra)
+    env.update(env_overrides)
+    process = subprocess.Popen([sys.executable, *args, str(port)], env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            connection.request('GET', '/health')
+            if connection.getresponse().status == 200:
+                return process
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f"Server {mode} tidak siap dalam 60 detik")
+
+
+def stop_server(process):
+    process.send_signal(signal.SIGINT)
+    try:
+        process.wait(30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+def run_http_load(port, bodies, concurrency, timeout=60):
+    """`concurrency` klien HTTP (koneksi baru per request) mengirim `bodies` bergiliran."""
+    results = [None] * len(bodies)
+    positions = iter(range(len(bodies)))
+    lock = threading.Lock()
+
+    def worker():
+        while True:
+            with lock:
+                i = next(positions, None)
+            if i is None:
+                break
+            start = time.perf_counter()
+            try:
+                connection = http.client.HTTPConnection('127.0.0.1', port, timeout=timeout)
+                connection.request('POST', '/predict', bodies[i], {'Content-Type': 'application/json'})
+                response = connection.getresponse()
+                response.read()
+                status = response.status
+                connection.close()
+            except OSError:
+                status = 0
+            results[i] = (time.perf_counter() - start, status)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start, results
+
+
+def bench_servers(args):
+    emails = generate_corpus(args.requests, seed=9)
+    huge = set()
+    if args.huge_every:
+        huge_email = generate_html_newsletter(args.huge_chars, seed=1)
+        for i in range(args.huge_every - 1, len(emails), args.huge_every):
+            emails[i] = huge_email + f' #{i}'
+            huge.add(i)
+    bodies = [json.dumps({'email_content': email_content}) for email_content in emails]
+    env_overrides = {'ASGI_WORKERS': str(args.workers)} if args.workers else {}
+
+    print(f"{args.requests} request /predict per konfigurasi, cache mati"
+          + (f", 1 dari {args.huge_every} email {args.huge_chars} karakter" if huge else ''))
+    print(f"latensi di bawah hanya untuk email biasa; CPU: {os.cpu_count()}")
+    print(f"{'mode':>13} {'concurrency':>11} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+          f"{'max ms':>8} {'503':>5} {'gagal':>5}")
+    for offset, mode in enumerate(args.modes):
+        port = args.port + offset
+        process = start_server(mode, port, env_overrides)
+        try:
+            run_http_load(port, bodies[:20], 4)
+            for concurrency in args.concurrency:
+                elapsed, results = run_http_load(port, bodies, concurrency)
+                statuses = [status for _, status in results]
+                latencies = np.array([latency for i, (latency, status) in enumerate(results)
+                                      if i not in huge and status == 200]) * 1000
+                print(f"{mode:>13} {concurrency:>11} {len(results) / elapsed:>8.1f} "
+                      f"{np.percentile(latencies, 50):>8.2f} {np.percentile(latencies, 95):>8.2f} "
+                      f"{np.percentile(latencies, 99):>8.2f} {latencies.max():>8.2f} "
+                      f"{statuses.count(503):>5} {sum(status not in (200, 503) for status in statuses):>5}")
+        finally:
+            stop_server(process)
+
+
+# === BENCHMARK: INPUT PATOLOGIS (FUZZ) ===
+def fuzz_word_run(n, rng):
+    return 'From: a@b.com ' + 'a' * n
+
+
+def fuzz_dotted(n, rng):
+    return 'a.' * (n // 2)
+
+
+def fuzz_at_storm(n, rng):
+    return 'a-' * (n // 4) + 'x@' * (n // 4)
+
+
+def fuzz_exclamations(n, rng):
+    return ''.join(rng.choice('!!!a. \n') for _ in range(min(n, 100000))) * max(1, n // 100000)
+
+
+def fuzz_url_run(n, rng):
+    return 'Click here http://' + 'a%2F' * (n // 4)
+
+
+def fuzz_base64_inline(n, rng):
+    return 'See the attached file: data:application/pdf;base64,' + base64.b64encode(rng.randbytes(n * 3 // 4)).decode()
+
+
+def fuzz_mime_attachment(n, rng):
+    encoded = base64.encodebytes(rng.randbytes(n * 3 // 4)).decode().replace('\n', '\r\n')
+    return ('From: billing@paypa1.com\r\nSubject: Invoice\r\nContent-Type: multipart/mixed; boundary="b"\r\n\r\n'
+            '--b\r\nContent-Type: text/plain\r\n\r\nURGENT: verify your account now http://192.168.0.1/login\r\n'
+            '--b\r\nContent-Type: application/zip; name="invoice.pdf.exe"\r\n'
+            'Content-Disposition: attachment\r\nContent-Transfer-Encoding: base64\r\n\r\n' + encoded + '--b--\r\n')
+
+
+def fuzz_plain_words(n, rng):
+    words = ['verify', 'account', 'urgent', 'paypal', 'click', 'here', 'the', 'now!', 'http://x.co/a', 'team.']
+    return ' '.join(rng.choice(words) for _ in range(n // 6))
+
+
+def fuzz_html(n, rng):
+    return generate_html_newsletter(n, seed=rng.randint(0, 1000))
+
+
+FUZZ_GENERATORS = {
+    'word_run': fuzz_word_run,
+    'dotted': fuzz_dotted,
+    'at_storm': fuzz_at_storm,
+    'exclamations': fuzz_exclamations,
+    'url_run': fuzz_url_run,
+    'base64_inline': fuzz_base64_inline,
+    'mime_attachment': fuzz_mime_attachment,
+    'plain_words': fuzz_plain_words,
+    'html': fuzz_html,
+}
+
+
+def bench_fuzz(args):
+    rng = random.Random(args.seed)
+    limits = app.model_holder.current.featurizer.limits
+    print(f"scan: max {limits.max_chars} karakter (head {limits.head_chars} + tail {limits.tail_chars}), "
+          f"blob base64 >= {limits.blob_min_chars}; batas uji {args.max_ms:g} ms per email")
+    print(f"{'generator':>16} " + ' '.join(f"{size:>11}" for size in args.sizes) + "  (ms, maks dari --repeat)")
+
+    worst = 0.0
+    for name in args.generators:
+        row = []
+        for size in args.sizes:
+            email_content = FUZZ_GENERATORS[name](size, rng)
+            samples = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                result = app.score_emails([email_content])[0]
+                samples.append((time.perf_counter() - start) * 1000)
+            worst = max(worst, max(samples))
+            row.append(f"{max(samples):>10.1f}" + ('*' if result['truncated'] else ' '))
+        print(f"{name:>16} " + ' '.join(row))
+
+    print(f"* = truncated; latensi terburuk {worst:.1f} ms")
+    if worst > args.max_ms:
+        print(f"GAGAL: melewati batas {args.max_ms:g} ms")
+        sys.exit(1)
+
+
+# === BENCHMARK: INDEKS KAMPANYE NEAR-DUPLICATE ===
+CAMPAIGN_TEMPLATES = [
+    "From: security@{host} {date}\nDear {name}, we noticed unusual activity on your {brand} account. "
+    "To keep your account safe please verify your billing information within 24 hours by visiting "
+    "https://{host}/verify/{n} . If you do not verify, your account will be limited and pending payments "
+    "of ${amount} will be held. Thank you for being a valued customer. {brand} Security Team",
+    "From: billing@{host} {date}\nHello {name}, invoice #{n} for ${amount} is overdue. Your {brand} "
+    "subscription will be cancelled today unless you update your payment details at "
+    "http://{host}/pay?ref={n}&user={name} . Ignore this message and your files will be deleted. "
+    "Do not reply to this email, contact our billing department through the link above.",
+    "From: noreply@{host} {date}\nHi {name}, your {brand} order #{n} has shipped and will arrive on "
+    "{day}. The total charged to your card was ${amount}. Track your package at "
+    "https://{host}/track/{n} . Thank you for shopping with us, we hope to see you again soon. "
+    "Questions? Visit our help center or reply to this message.",
+    "From: hr@{host} {date}\nDear {name}, please review the updated employee handbook and confirm "
+    "your direct deposit details before {day}. Payroll run {n} will use the information on file. "
+    "Sign in with your corporate password at http://{host}/portal/{n} to acknowledge. "
+    "Failure to confirm may delay your salary of ${amount}.",
+]
+# Footer bersama seperti email massal sungguhan (alamat, hak cipta, unsubscribe)
+CAMPAIGN_FOOTER = (
+    "\n--\nThis is an automated message, please do not reply directly. You are receiving this email "
+    "because you have an account with us. To manage your notification preferences or unsubscribe, "
+    "visit the settings page in your account. Our privacy policy explains how we collect and use your "
+    "information. Copyright 2024 All rights reserved. Registered office: 1 Market Street, Suite 400."
+)
+CAMPAIGN_NAMES = ['alice', 'bob', 'citra', 'dimas', 'eko', 'fitri', 'gita', 'hana', 'irfan', 'joko']
+
+
+def generate_campaign_corpus(campaigns, variants, unique, rotate_hosts, seed=0):
+    """
+    Email kampanye (varian satu templat: nama, ID, nominal, tanggal berbeda) dicampur email unik.
+    Kembalikan list (email, id kampanye atau None), diacak.
+    """
+    rng = random.Random(seed)
+    corpus = []
+    for campaign in range(campaigns):
+        template = CAMPAIGN_TEMPLATES[campaign % len(CAMPAIGN_TEMPLATES)]
+        brand = rng.choice(['PayPal', 'Amazon', 'Microsoft', 'Netflix', 'Bank BCA'])
+        host = f"{brand.lower().replace(' ', '')}-{rng.randint(10, 99)}.{rng.choice(['tk', 'com', 'co.id'])}"
+        # Kalimat pembeda per kampanye: templat yang sama tidak otomatis satu kampanye
+        marker = ' '.join(rng.choice(CAMPAIGN_NAMES + ['urgent', 'notice', 'service', 'update', 'member'])
+                          for _ in range(6))
+        for _ in range(variants):
+            variant_host = f"cdn{rng.randint(1, 999)}-{host}" if rng.random() < rotate_hosts else host
+            corpus.append((template.format(
+                host=variant_host, brand=brand, name=rng.choice(CAMPAIGN_NAMES), n=rng.randint(1000, 999999),
+                amount=f"{rng.randint(5, 900)}.{rng.randint(0, 99):02d}",
+                day=rng.choice(['Monday', 'Tuesday', 'Friday']),
+                date=rng.choice(['Mon Jan 12 2024', 'Sat Mar 2 2024', 'Wed Oct 9 2024']),
+            ) + ' ' + marker + CAMPAIGN_FOOTER, campaign))
+    # Email unik: templat pendek generik + kalimat acak, sehingga tidak saling near-duplicate
+    for _ in range(unique):
+        filler = ' '.join(''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(rng.randint(4, 9)))
+                          for _ in range(30))
+        corpus.append((generate_email(rng, phishing=rng.random() < 0.4) + ' ' + filler, None))
+    rng.shuffle(corpus)
+    return corpus
+
+
+def score_one_by_one(emails):
+    """Skor email satu per satu (seperti /predict berurutan); kembalikan (hasil, latensi detik)."""
+    results, latencies = [], []
+    for email_content in emails:
+        start = time.perf_counter()
+        results.append(app.score_emails_cached([email_content])[0])
+        latencies.append(time.perf_counter() - start)
+    return results, np.array(latencies)
+
+
+def bench_campaign(args):
+    # Cache exact dimatikan: yang diukur hanya pemakaian ulang verdict lewat indeks kampanye
+    app.prediction_cache.max_entries = 0
+    corpus = generate_campaign_corpus(args.campaigns, args.variants, args.unique, args.rotate_hosts, args.seed)
+    emails = [email_content for email_content, _ in corpus]
+    labels = [label for _, label in corpus]
+    print(f"{len(emails)} email: {args.campaigns} kampanye x {args.variants} varian + {args.unique} unik, "
+          f"{args.rotate_hosts:.0%} varian dengan host berbeda")
+
+    app.campaign_index = CampaignIndex(max_entries=0)
+    score_one_by_one(emails[:20])
+    baseline, baseline_latencies = score_one_by_one(emails)
+
+    print(f"{'mode':>16} {'detik':>7} {'email/s':>8} {'p50 ms':>7} {'p95 ms':>7} {'reuse':>6} "
+          f"{'hit ms':>7} {'miss ms':>7} {'beda status':>11} {'maks dprob':>10} {'kampanye':>8}")
+    print(f"{'tanpa indeks':>16} {baseline_latencies.sum():>7.2f} {len(emails) / baseline_latencies.sum():>8.1f} "
+          f"{np.percentile(baseline_latencies, 50) * 1000:>7.2f} {np.percentile(baseline_latencies, 95) * 1000:>7.2f}")
+
+    for confirm in (True, False):
+        app.campaign_index = CampaignIndex(max_entries=args.index_size, threshold=args.similarity, confirm=confirm)
+        app.campaign_index.ensure_model_version(app.current_model_version())
+        results, latencies = score_one_by_one(emails)
+
+        reused = np.array([result['campaign']['reused'] for result in results])
+        status_changed = sum(result['prediction_status'] != base['prediction_status']
+                             for result, base, hit in zip(results, baseline, reused) if hit)
+        max_delta = max((abs(result['phishing_probability'] - base['phishing_probability'])
+                         for result, base, hit in zip(results, baseline, reused) if hit), default=0.0)
+        hit_ms = np.median(latencies[reused]) * 1000 if reused.any() else float('nan')
+        miss_ms = np.median(latencies[~reused]) * 1000
+        # Kampanye yang terbentuk: ID berbeda per kampanye sintetis (1 = utuh) dan email unik yang ikut kampanye
+        ids_per_campaign = [len({result['campaign']['id'] for result, label in zip(results, labels) if label == c})
+                            for c in range(args.campaigns)]
+        name = 'indeks+konfirmasi' if confirm else 'indeks'
+        print(f"{name:>16} {latencies.sum():>7.2f} {len(emails) / latencies.sum():>8.1f} "
+              f"{np.percentile(latencies, 50) * 1000:>7.2f} {np.percentile(latencies, 95) * 1000:>7.2f} "
+              f"{reused.mean():>6.1%} {hit_ms:>7.2f} {miss_ms:>7.2f} {status_changed:>11} {max_delta:>10.4f} "
+              f"{np.mean(ids_per_campaign):>8.2f}")
+        false_reuse = sum(hit for hit, label in zip(reused, labels) if label is None)
+        stats = app.campaign_index.stats()
+        print(f"{'':>16} hemat {baseline_latencies.sum() - latencies.sum():.2f} s; verdict dipakai ulang untuk "
+              f"{false_reuse} email unik; {stats['confirm_rejected']} kandidat ditolak konfirmasi, "
+              f"{stats['not_reusable']} verdict dekat threshold; "
+              f"{stats['entries']} entri, {stats['campaigns']} kampanye di indeks")
+    print("kampanye = rata-rata jumlah ID kampanye per kampanye sintetis (1.00 = tidak terpecah)")
+
+
+# === BENCHMARK: PENJELASAN BERBASIS KONTRIBUSI ===
+def bench_explain(args):
+    emails = generate_corpus(max(args.batch_sizes), seed=13)
+    state = app.model_holder.current
+    original = state.explainer
+    # mode -> (explainer, explain): 'tanpa' = explain=false, 'rules' = generate_explanation
+    modes = {'tanpa': (None, False), 'rules': (None, True)}
+    for method in EXPLAIN_METHODS:
+        modes[method] = (ContributionExplainer(state.model, state.tfidf, state.numeric_features, method,
+                                               args.top_k), True)
+
+    X, _ = featurizer.combine_batches([state.featurizer.featurize_batch(emails[:64])])
+    prob_phishing = state.engine.predict_phishing(X)
+    for method in EXPLAIN_METHODS:
+        margins = modes[method][0].contributions(X).sum(axis=1, dtype=np.float64)
+        error = np.abs(1 / (1 + np.exp(-margins)) - prob_phishing).max()
+        print(f"{method}: selisih maks sigmoid(jumlah kontribusi) vs probabilitas = {error:.2e}")
+
+    print(f"latensi median score_emails per batch (ms), per email dalam kurung; top_k={args.top_k}")
+    print(f"{'batch':>6} " + ' '.join(f"{name:>18}" for name in modes))
+    try:
+        for batch_size in args.batch_sizes:
+            batch = emails[:batch_size]
+            cells = []
+            for explainer, explain in modes.values():
+                state.explainer = explainer
+                app.score_emails(batch, state=state, explain=explain)
+                samples = []
+                for _ in range(args.repeat):
+                    start = time.perf_counter()
+                    app.score_emails(batch, state=state, explain=explain)
+                    samples.append(time.perf_counter() - start)
+                median = float(np.median(samples)) * 1000
+                cells.append(f"{median:>9.2f} ({median / batch_size:>6.3f})")
+            print(f"{batch_size:>6} " + ' '.join(f"{cell:>18}" for cell in cells))
+    finally:
+        state.explainer = original
+
+
+# === BENCHMARK: INDEKS REPUTASI DOMAIN ===
+REPUTATION_TLDS = ['com', 'net', 'org', 'co.id', 'tk', 'xyz', 'info', 'io']
+
+
+def synthetic_domain(i):
+    return f"d{i:x}-site.{REPUTATION_TLDS[i % len(REPUTATION_TLDS)]}"
+
+
+def synthetic_reputation_entries(n):
+    # Sepertiga baik, sepertiga buruk, sisanya baru dengan tanggal registrasi
+    for i in range(n):
+        flag = (FLAG_GOOD, FLAG_BAD, FLAG_NEW)[i % 3]
+        yield synthetic_domain(i), flag, 19000 + i % 1000 if flag == FLAG_NEW else -1
+
+
+def rss_kb():
+    """RSS proses ini (kB) dari /proc; None di luar Linux."""
+    try:
+        with open('/proc/self/status', encoding='ascii') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except OSError:
+        return None
+
+
+def bench_reputation(args):
+    path = args.index or tempfile.mkdtemp(prefix='reputasi-')
+    try:
+        if not args.index:
+            start = time.perf_counter()
+            build_reputation_index(synthetic_reputation_entries(args.entries), path)
+            print(f"build {args.entries} entri: {time.perf_counter() - start:.1f} s")
+        size = sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+        before = rss_kb()
+        start = time.perf_counter()
+        index = DomainReputation(path)
+        opened = time.perf_counter() - start
+        after_open = rss_kb()
+        print(f"{len(index)} entri, {size / 1e6:.1f} MB di disk; buka {opened * 1000:.2f} ms, "
+              f"RSS +{(after_open - before) / 1024:.1f} MB setelah buka")
+
+        rng = random.Random(args.seed)
+        n = len(index)
+        queries = {
+            'hit': [synthetic_domain(rng.randrange(n)) for _ in range(args.lookups)],
+            'subdomain': [f"mail.login.{synthetic_domain(rng.randrange(n))}" for _ in range(args.lookups)],
+            'miss': [f"tidak-ada-{i}.example" for i in range(args.lookups)],
+        }
+        print(f"{'query':>10} {'p50 us':>8} {'p99 us':>8} {'lookup/s':>10} {'cocok':>6}")
+        for name, domains in queries.items():
+            latencies = []
+            found = 0
+            for domain in domains:
+                start = time.perf_counter()
+                info = index.lookup(domain)
+                latencies.append(time.perf_counter() - start)
+                found += info is not None
+            latencies = np.array(latencies) * 1e6
+            print(f"{name:>10} {np.percentile(latencies, 50):>8.2f} {np.percentile(latencies, 99):>8.2f} "
+                  f"{len(domains) / latencies.sum() * 1e6:>10.0f} {found / len(domains):>6.0%}")
+        print(f"RSS +{(rss_kb() - before) / 1024:.1f} MB setelah {3 * args.lookups} lookup "
+              f"(halaman memory map, dipakai bersama antar proses)")
+
+        # Pembanding: set Python berisi domain yang sama, disalin di heap setiap worker
+        sample = min(n, args.set_sample)
+        tracemalloc.start()
+        domains = {synthetic_domain(i) for i in range(sample)}
+        heap = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        print(f"set Python {sample} domain: {heap / 1e6:.1f} MB heap per proses "
+              f"(~{heap / sample * n / 1e6:.0f} MB untuk {n} entri)")
+        del domains
+    finally:
+        if not args.index and not args.keep:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+# === BENCHMARK: MEMORI PRE-FORK VS PROSES INDEPENDEN ===
+def smaps_rollup(pid):
+    """Ringkasan memori satu proses (kB) dari /proc/<pid>/smaps_rollup (Linux)."""
+    usage = {}
+    with open(f'/proc/{pid}/smaps_rollup', encoding='ascii') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == 'kB':
+                usage[parts[0].rstrip(':')] = int(parts[1])
+    return usage
+
+
+def child_pids(pid):
+    with open(f'/proc/{pid}/task/{pid}/children', encoding='ascii') as f:
+        return [int(child) for child in f.read().split()]
+
+
+# nama -> (mode SERVER_MODES, env tambahan); 'independen' = N proses yang masing-masing memuat model sendiri.
+# Cache prediksi tetap aktif seperti di produksi
+PREFORK_MODES = {
+    'independen': ('flask', {'PREDICTION_CACHE_SIZE': '10000'}),
+    'prefork': ('prefork', {'PREDICTION_CACHE_SIZE': '10000'}),
+}
+
+
+def memory_row(workers, name, usage, worker_pids):
+    def per_worker(key):
+        return sum(usage[pid][key] for pid in worker_pids) / len(worker_pids) / 1024
+
+    private = sum(usage[pid]['Private_Clean'] + usage[pid]['Private_Dirty']
+                  for pid in worker_pids) / len(worker_pids) / 1024
+    total_rss = sum(u['Rss'] for u in usage.values()) / 1024
+    total_pss = sum(u['Pss'] for u in usage.values()) / 1024
+    return (f"{workers:>6} {name:>12} {per_worker('Rss'):>7.1f} {per_worker('Pss'):>7.1f} {private:>7.1f} "
+            f"{total_rss:>10.1f} {total_pss:>10.1f}")
+
+
+def fork_scorers(workers, emails, freeze):
+    """
+    Fork `workers` anak dari proses ini (model sudah dimuat); setiap anak
+    menskor `emails` lalu menjalankan koleksi GC penuh, seperti yang terjadi
+    sesekali di worker yang berjalan lama. Kembalikan memori per pid.
+    """
+    app.score_emails(emails[:3])
+    gc.collect()
+    if freeze:
+        gc.freeze()
+    ready, done = os.pipe()
+    pids = []
+    try:
+        for _ in range(workers):
+            pid = os.fork()
+            if pid == 0:
+                for email_content in emails:
+                    app.score_emails([email_content])
+                gc.collect()
+                os.write(done, b'.')
+                time.sleep(600)
+                os._exit(0)
+            pids.append(pid)
+        for _ in pids:
+            os.read(ready, 1)
+        return {pid: smaps_rollup(pid) for pid in [os.getpid()] + pids}, pids
+    finally:
+        for pid in pids:
+            os.kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+        os.close(ready)
+        os.close(done)
+        gc.unfreeze()
+
+
+def bench_prefork(args):
+    print(f"HTTP: {args.requests} request /predict per worker; MB per worker (rata-rata) dan total semua proses")
+    header = f"{'worker':>6} {'mode':>12} {'RSS':>7} {'PSS':>7} {'privat':>7} {'total RSS':>10} {'total PSS':>10}"
+    print(header)
+    for workers in args.workers:
+        emails = generate_corpus(args.requests * workers, seed=17)
+        bodies = [json.dumps({'email_content': email_content}) for email_content in emails]
+        for name in args.modes:
+            mode, env = PREFORK_MODES[name]
+            if mode == 'prefork':
+                processes = [start_server(mode, args.port, dict(env, PREFORK_WORKERS=str(workers)))]
+                run_http_load(args.port, bodies, workers)
+                worker_pids = child_pids(processes[0].pid)
+                measured = [processes[0].pid] + worker_pids
+            else:
+                processes = [start_server(mode, args.port + i, env) for i in range(workers)]
+                for i in range(workers):
+                    run_http_load(args.port + i, bodies[i::workers], 1)
+                worker_pids = measured = [process.pid for process in processes]
+            usage = {pid: smaps_rollup(pid) for pid in measured}
+            for process in processes:
+                stop_server(process)
+            print(memory_row(workers, name, usage, worker_pids))
+    print("PSS membagi halaman bersama rata ke proses yang memakainya; total PSS = memori fisik sebenarnya. "
+          "Total prefork termasuk master.")
+
+    # Koleksi GC penuh jarang terjadi dalam benchmark singkat, jadi dipicu langsung di anak hasil fork
+    app.prediction_cache.max_entries = 0
+    emails = generate_corpus(args.gc_emails, seed=19)
+    print(f"\nfork dari proses ini, {args.gc_emails} email per anak lalu gc.collect() penuh")
+    print(header)
+    for workers in args.workers:
+        for freeze in (False, True):
+            usage, pids = fork_scorers(workers, emails, freeze)
+            print(memory_row(workers, 'freeze' if freeze else 'tanpa freeze', usage, pids))
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark pipeline deteksi phishing')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    keywords = subparsers.add_parser('keywords', help='Mesin kata kunci vs pemindaian per kata kunci')
+    keywords.add_argument('--sizes', type=int, nargs='+', default=[2000, 50000, 500000, 2000000])
+    keywords.add_argument('--repeat', type=int, default=5)
+    keywords.set_defaults(func=bench_keywords)
+
+    batch = subparsers.add_parser('batch', help='N kali /predict vs satu /predict_batch')
+    batch.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 32, 256])
+    batch.add_argument('--repeat', type=int, default=3)
+    batch.set_defaults(func=bench_batch)
+
+    scaling = subparsers.add_parser('scaling', help='Featurization paralel dengan 1..N worker')
+    scaling.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    scaling.add_argument('--emails', type=int, default=2000)
+    scaling.add_argument('--shard-size', type=int, default=64)
+    scaling.set_defaults(func=bench_scaling)
+
+    pipeline = subparsers.add_parser('pipeline', help='Latensi per tahap /predict (p50/p95/p99) ke JSON')
+    pipeline.add_argument('--categories', nargs='+', choices=PIPELINE_CATEGORIES, default=PIPELINE_CATEGORIES)
+    pipeline.add_argument('--emails', type=int, default=100, help='jumlah email per kategori')
+    pipeline.add_argument('--repeat', type=int, default=1)
+    pipeline.add_argument('--seed', type=int, default=0)
+    pipeline.add_argument('--output', help='simpan hasil JSON ke file ini')
+    pipeline.add_argument('--baseline', help='hasil JSON sebelumnya untuk deteksi regresi')
+    pipeline.add_argument('--tolerance', type=float, default=0.2, help='kenaikan relatif yang dianggap regresi')
+    pipeline.add_argument('--min-delta-ms', type=float, default=0.05, help='abaikan kenaikan absolut di bawah ini')
+    pipeline.set_defaults(func=bench_pipeline)
+
+    coldstart = subparsers.add_parser('coldstart', help='Waktu dari start proses sampai /predict pertama')
+    coldstart.add_argument('--repeat', type=int, default=5)
+    coldstart.add_argument('--model-bundle', help='path bundle; string kosong untuk memuat file joblib lama')
+    coldstart.set_defaults(func=bench_coldstart)
+
+    inference = subparsers.add_parser('inference', help='XGBClassifier.predict_proba vs engine inferensi')
+    inference.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 8, 64, 512])
+    inference.add_argument('--repeat', type=int, default=200)
+    inference.add_argument('--threads', type=int, help='INFERENCE_THREADS untuk engine booster')
+    inference.set_defaults(func=bench_inference)
+
+    tfidf = subparsers.add_parser('tfidf', help='tfidf.transform sklearn vs TF-IDF langsung (latensi, memori)')
+    tfidf.add_argument('--categories', nargs='+', choices=TFIDF_CATEGORIES, default=TFIDF_CATEGORIES)
+    tfidf.add_argument('--batch-size', type=int, default=256)
+    tfidf.add_argument('--singles', type=int, default=100, help='email per kategori untuk latensi satu dokumen')
+    tfidf.add_argument('--repeat', type=int, default=5)
+    tfidf.set_defaults(func=bench_tfidf)
+
+    microbatch = subparsers.add_parser('microbatch', help='/predict langsung vs micro-batching, klien konkuren')
+    microbatch.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32])
+    microbatch.add_argument('--wait-ms', type=float, nargs='+', default=[2, 5])
+    microbatch.add_argument('--max-batch', type=int, default=64)
+    microbatch.add_argument('--max-queue', type=int, default=1024)
+    microbatch.add_argument('--requests', type=int, default=1000)
+    microbatch.set_defaults(func=bench_microbatch)
+
+    servers = subparsers.add_parser('servers', help='Flask (app.run) vs asgi_app lewat HTTP, klien konkuren')
+    servers.add_argument('--modes', nargs='+', choices=list(SERVER_MODES), default=list(SERVER_MODES))
+    servers.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32])
+    servers.add_argument('--requests', type=int, default=1000)
+    servers.add_argument('--huge-every', type=int, default=0, help='setiap email ke-N diganti email besar')
+    servers.add_argument('--huge-chars', type=int, default=1000000)
+    servers.add_argument('--workers', type=int, help='ASGI_WORKERS untuk mode asgi')
+    servers.add_argument('--port', type=int, default=8700)
+    servers.set_defaults(func=bench_servers)
+
+    fuzz = subparsers.add_parser('fuzz', help='Latensi terburuk /predict untuk input patologis')
+    fuzz.add_argument('--generators', nargs='+', choices=list(FUZZ_GENERATORS), default=list(FUZZ_GENERATORS))
+    fuzz.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000, 20000000])
+    fuzz.add_argument('--repeat', type=int, default=3)
+    fuzz.add_argument('--max-ms', type=float, default=1000, help='gagal (exit 1) jika ada email yang lebih lambat')
+    fuzz.add_argument('--seed', type=int, default=0)
+    fuzz.set_defaults(func=bench_fuzz)
+
+    campaign = subparsers.add_parser('campaign', help='Hit rate dan latensi indeks kampanye near-duplicate')
+    campaign.add_argument('--campaigns', type=int, default=20)
+    campaign.add_argument('--variants', type=int, default=50, help='varian per kampanye')
+    campaign.add_argument('--unique', type=int, default=300, help='email non-kampanye')
+    campaign.add_argument('--rotate-hosts', type=float, default=0.1, help='fraksi varian dengan host URL lain')
+    campaign.add_argument('--similarity', type=float, default=0.8)
+    campaign.add_argument('--index-size', type=int, default=10000)
+    campaign.add_argument('--seed', type=int, default=0)
+    campaign.set_defaults(func=bench_campaign)
+
+    explain = subparsers.add_parser('explain', help='Latensi penjelasan: tanpa, aturan, pred_contribs approx/shap')
+    explain.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 8, 64, 256])
+    explain.add_argument('--repeat', type=int, default=20)
+    explain.add_argument('--top-k', type=int, default=5)
+    explain.set_defaults(func=bench_explain)
+
+    reputation = subparsers.add_parser('reputation', help='Build dan lookup indeks reputasi domain (memory map)')
+    reputation.add_argument('--entries', type=int, default=10000000, help='jumlah domain sintetis')
+    reputation.add_argument('--index', help='pakai indeks yang sudah ada, tanpa build')
+    reputation.add_argument('--lookups', type=int, default=100000, help='lookup per jenis query')
+    reputation.add_argument('--set-sample', type=int, default=1000000, help='domain untuk pembanding set Python')
+    reputation.add_argument('--keep', action='store_true', help='jangan hapus indeks sintetis')
+    reputation.add_argument('--seed', type=int, default=0)
+    reputation.set_defaults(func=bench_reputation)
+
+    prefork = subparsers.add_parser('prefork', help='RSS/PSS per worker: proses independen vs prefork.py')
+    prefork.add_argument('--workers', type=int, nargs='+', default=[1, 4, 16])
+    prefork.add_argument('--modes', nargs='+', choices=list(PREFORK_MODES), default=list(PREFORK_MODES))
+    prefork.add_argument('--requests', type=int, default=200, help='request HTTP per worker sebelum diukur')
+    prefork.add_argument('--gc-emails', type=int, default=200, help='email per anak untuk pengukuran gc.freeze')
+    prefork.add_argument('--port', type=int, default=8800)
+    prefork.set_defaults(func=bench_prefork)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
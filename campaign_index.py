@@ -0,0 +1,314 @@
+"""
+Indeks kampanye near-duplicate (MinHash + LSH) untuk memakai ulang verdict.
+
+Gelombang phishing datang sebagai ribuan varian yang hanya berbeda nama
+penerima, ID tracking atau URL, sehingga cache exact (prediction_cache)
+selalu miss. Indeks ini menyimpan signature MinHash dari shingle kata
+cleaned_text (hasil preprocess_words, sama dengan
+enhanced_preprocess_combined_text) untuk email yang sudah diskor:
+
+- Shingle adalah `shingle_size` kata berurutan, di-hash CRC32. Kata yang
+  mengandung angka (ID tracking, nominal, nomor pesanan) dinormalisasi menjadi
+  '#' lebih dulu, sehingga varian hanya berbeda di nama penerima. Signature
+  berisi `num_perm` nilai minimum dari hash multiply-shift 64-bit.
+- LSH membagi signature menjadi `bands` band; email yang berbagi satu band
+  menjadi kandidat, lalu kemiripan diestimasi dari fraksi nilai signature
+  yang sama. Kandidat terbaik dengan kemiripan >= `threshold` adalah anggota
+  kampanye yang sama.
+- Konfirmasi opsional (murah, tanpa model): Jaccard shingle dihitung ulang
+  dari sketch bottom-k (eksak untuk email dengan kurang dari
+  `confirm_shingles` shingle unik) dan host URL serta domain pengirim harus sama. Salinan teks
+  email resmi dengan link yang ditukar tidak mewarisi verdict "safe".
+  Pemanggil juga bisa menandai verdict sebagai tidak boleh dipakai ulang
+  (`reusable=False` di add, mis. probabilitas dekat threshold): email itu
+  tetap menjadi anggota kampanye, tetapi variannya diskor ulang.
+- Memori dibatasi `max_entries`; entri tertua dibuang lebih dulu (FIFO, juga
+  urutan kedaluwarsa karena TTL sama untuk semua entri) dan entri yang lebih
+  tua dari `ttl_seconds` tidak dipakai lagi.
+"""
+import hashlib
+import heapq
+import re
+import threading
+import time
+import zlib
+from collections import Counter, OrderedDict
+
+import numpy as np
+
+from featurizer.extractors import URL_PATTERN
+
+_SHIFT32 = np.uint64(32)
+_DIGIT = re.compile(r'\d')
+# Jumlah shingle per potongan saat menghitung minimum (membatasi array sementara S x num_perm)
+_CHUNK = 2048
+
+
+def campaign_fingerprint(email_content, extracted_sender):
+    """(domain pengirim, host URL) untuk konfirmasi; varian kampanye berbagi link yang sama."""
+    hosts = set()
+    for url in URL_PATTERN.findall(email_content):
+        host = url.split('://', 1)[1]
+        for separator in '/?#:':
+            host = host.split(separator, 1)[0]
+        hosts.add(host.lower())
+    domain = extracted_sender.rsplit('@', 1)[-1].lower() if extracted_sender else ''
+    return domain, frozenset(hosts)
+
+
+class CampaignEntry:
+    __slots__ = ('entry_id', 'campaign_id', 'signature', 'sketch', 'fingerprint', 'result',
+                 'reusable', 'expires_at', 'reuses')
+
+    def __init__(self, entry_id, campaign_id, signature, sketch, fingerprint, result, reusable, expires_at):
+        self.entry_id = entry_id
+        self.campaign_id = campaign_id
+        self.signature = signature
+        self.sketch = sketch
+        self.fingerprint = fingerprint
+        self.result = result
+        self.reusable = reusable
+        self.expires_at = expires_at
+        self.reuses = 0
+
+
+class CampaignMatch:
+    """Hasil lookup: kampanye terdekat dan apakah verdict-nya boleh dipakai ulang."""
+
+    __slots__ = ('campaign_id', 'similarity', 'result', 'confirmed')
+
+    def __init__(self, campaign_id, similarity, result, confirmed):
+        self.campaign_id = campaign_id
+        self.similarity = similarity
+        self.result = result
+        self.confirmed = confirmed
+
+
+class CampaignSketch:
+    """Signature MinHash + sketch bottom-k satu email (dihitung sekali, dipakai lookup dan add)."""
+
+    __slots__ = ('signature', 'sketch', 'fingerprint')
+
+    def __init__(self, signature, sketch, fingerprint):
+        self.signature = signature
+        self.sketch = sketch
+        self.fingerprint = fingerprint
+
+
+class CampaignIndex:
+    """Indeks LSH in-process dengan batas ukuran dan TTL; max_entries=0 mematikan indeks."""
+
+    def __init__(self, max_entries=10000, ttl_seconds=3600, threshold=0.8, num_perm=128, bands=16,
+                 shingle_size=2, confirm=True, confirm_shingles=512, seed=1, clock=time.monotonic):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) harus habis dibagi bands ({bands})")
+        if not 0 < threshold <= 1:
+            raise ValueError(f"threshold harus di (0, 1], bukan {threshold}")
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.confirm = confirm
+        self.confirm_shingles = confirm_shingles
+        self._clock = clock
+
+        rng = np.random.default_rng(seed)
+        # Multiply-shift: (a * x + b) mod 2^64 >> 32, a ganjil
+        self._a = rng.integers(1, 2 ** 63, num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2 ** 63, num_perm, dtype=np.uint64)
+
+        self._entries = OrderedDict()
+        self._buckets = [{} for _ in range(bands)]
+        self._campaign_sizes = Counter()
+        self._lock = threading.Lock()
+        self._next_id = 0
+        self._model_version = None
+        self.lookups = 0
+        self.matches = 0
+        self.reused = 0
+        self.rejected = 0
+        self.not_reusable = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0
+
+    def ensure_model_version(self, model_version):
+        # Model berganti -> verdict lama tidak berlaku lagi
+        with self._lock:
+            if self._model_version is not None and self._model_version != model_version:
+                self._clear()
+                self.invalidations += 1
+            self._model_version = model_version
+
+    def shingles(self, words):
+        """Hash CRC32 unik (uint32, terurut) dari shingle kata; teks pendek menjadi satu shingle."""
+        k = self.shingle_size
+        if not words:
+            return np.empty(0, dtype=np.uint32)
+        words = ['#' if _DIGIT.search(word) else word for word in words]
+        if len(words) <= k:
+            grams = (' '.join(words),)
+        else:
+            grams = (' '.join(words[i:i + k]) for i in range(len(words) - k + 1))
+        hashes = np.fromiter((zlib.crc32(gram.encode('utf-8', 'surrogatepass')) for gram in grams),
+                             dtype=np.uint32)
+        return np.unique(hashes)
+
+    def sketch(self, words, email_content='', extracted_sender=''):
+        """CampaignSketch untuk `words` (kata cleaned_text), atau None untuk teks kosong."""
+        shingles = self.shingles(words)
+        if not len(shingles):
+            return None
+        signature = np.full(self.num_perm, 0xFFFFFFFF, dtype=np.uint64)
+        for start in range(0, len(shingles), _CHUNK):
+            x = shingles[start:start + _CHUNK].astype(np.uint64)[:, None]
+            hashed = (x * self._a + self._b) >> _SHIFT32
+            np.minimum(signature, hashed.min(axis=0), out=signature)
+        fingerprint = campaign_fingerprint(email_content, extracted_sender) if self.confirm else None
+        return CampaignSketch(signature.astype(np.uint32), shingles[:self.confirm_shingles], fingerprint)
+
+    def _band_keys(self, signature):
+        rows = self.rows
+        return [signature[band * rows:(band + 1) * rows].tobytes() for band in range(self.bands)]
+
+    def _sketch_similarity(self, a, b):
+        union = np.union1d(a, b)
+        if len(a) < self.confirm_shingles and len(b) < self.confirm_shingles:
+            # Kedua sketch berisi semua shingle email: Jaccard eksak
+            return (len(a) + len(b) - len(union)) / len(union)
+        # Bottom-k: k hash terkecil gabungan, fraksi yang ada di kedua sketch
+        bottom = union[:self.confirm_shingles]
+        return float(np.mean(np.isin(bottom, a, assume_unique=True) & np.isin(bottom, b, assume_unique=True)))
+
+    def _expire(self, now):
+        while self._entries:
+            entry = next(iter(self._entries.values()))
+            if entry.expires_at > now:
+                break
+            self._remove(entry)
+            self.expirations += 1
+
+    def _remove(self, entry):
+        del self._entries[entry.entry_id]
+        for bucket, key in zip(self._buckets, self._band_keys(entry.signature)):
+            members = bucket.get(key)
+            if members is not None:
+                members.discard(entry.entry_id)
+                if not members:
+                    del bucket[key]
+        self._campaign_sizes[entry.campaign_id] -= 1
+        if self._campaign_sizes[entry.campaign_id] <= 0:
+            del self._campaign_sizes[entry.campaign_id]
+
+    def _clear(self):
+        self._entries.clear()
+        for bucket in self._buckets:
+            bucket.clear()
+        self._campaign_sizes.clear()
+
+    def lookup(self, sketch, model_version):
+        """CampaignMatch kandidat terbaik dengan kemiripan >= threshold, atau None."""
+        if not self.enabled or sketch is None:
+            return None
+
+        with self._lock:
+            # Request yang masih memegang versi model lama tidak memakai verdict versi baru
+            if model_version != self._model_version:
+                return None
+            self.lookups += 1
+            self._expire(self._clock())
+            candidates = set()
+            for bucket, key in zip(self._buckets, self._band_keys(sketch.signature)):
+                members = bucket.get(key)
+                if members:
+                    candidates.update(members)
+            if not candidates:
+                return None
+
+            best, best_similarity = None, 0.0
+            for entry_id in candidates:
+                entry = self._entries[entry_id]
+                similarity = float(np.count_nonzero(entry.signature == sketch.signature)) / self.num_perm
+                if similarity > best_similarity:
+                    best, best_similarity = entry, similarity
+            if best_similarity < self.threshold:
+                return None
+
+            self.matches += 1
+            if not best.reusable:
+                self.not_reusable += 1
+                return CampaignMatch(best.campaign_id, round(best_similarity, 4), None, False)
+            confirmed = not self.confirm or (
+                best.fingerprint == sketch.fingerprint
+                and self._sketch_similarity(best.sketch, sketch.sketch) >= self.threshold
+            )
+            if not confirmed:
+                self.rejected += 1
+                return CampaignMatch(best.campaign_id, round(best_similarity, 4), None, False)
+            best.reuses += 1
+            self.reused += 1
+            return CampaignMatch(best.campaign_id, round(best_similarity, 4), dict(best.result), True)
+
+    def add(self, sketch, result, model_version, campaign_id=None, reusable=True):
+        """
+        Simpan verdict email yang baru diskor; kembalikan ID kampanyenya.
+        `campaign_id` dari lookup yang tidak terkonfirmasi menggabungkan email ke kampanye itu.
+        """
+        if not self.enabled or sketch is None:
+            return campaign_id
+
+        if campaign_id is None:
+            campaign_id = 'cmp-' + hashlib.blake2b(sketch.signature.tobytes(), digest_size=5).hexdigest()
+        with self._lock:
+            if model_version != self._model_version:
+                return campaign_id
+            now = self._clock()
+            self._expire(now)
+            entry_id = self._next_id
+            self._next_id += 1
+            entry = CampaignEntry(entry_id, campaign_id, sketch.signature, sketch.sketch, sketch.fingerprint,
+                                  dict(result), reusable, now + self.ttl_seconds)
+            self._entries[entry_id] = entry
+            for bucket, key in zip(self._buckets, self._band_keys(sketch.signature)):
+                bucket.setdefault(key, set()).add(entry_id)
+            self._campaign_sizes[campaign_id] += 1
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries.values())))
+                self.evictions += 1
+            return campaign_id
+
+    def clear(self):
+        with self._lock:
+            self._clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'threshold': self.threshold,
+                'num_perm': self.num_perm,
+                'bands': self.bands,
+                'confirm': self.confirm,
+                'campaigns': len(self._campaign_sizes),
+                'largest_campaigns': heapq.nlargest(5, self._campaign_sizes.items(), key=lambda item: item[1]),
+                'lookups': self.lookups,
+                'matches': self.matches,
+                'reused': self.reused,
+                'confirm_rejected': self.rejected,
+                'not_reusable': self.not_reusable,
+                'reuse_rate': round(self.reused / self.lookups, 4) if self.lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+                'model_version': self._model_version
+            }
@@ -0,0 +1,233 @@
+"""
+Scoring bertingkat: keputusan murah sebelum model penuh (TF-IDF + XGBoost).
+
+- Tier `lists`: blocklist (domain pengirim atau host URL mana pun) -> phishing;
+  allowlist (domain pengirim dan semua host URL) -> safe. Subdomain ikut
+  cocok: 'mail.perusahaan.co.id' cocok dengan 'perusahaan.co.id'. Domain
+  yang dikenal buruk di indeks reputasi (opsional, featurizer.reputation)
+  diperlakukan seperti blocklist.
+- Tier `rules`: pemeriksaan murah pada subset fitur (satu pemindaian kata
+  kunci, regex URL, domain pengirim). Email dari domain resmi
+  (legitimate_domains di extract_sender_features) atau allowlist tanpa link,
+  tanpa lampiran dan tanpa kata kunci phishing/ancaman/data pribadi -> safe.
+- Email lain (ambigu) diteruskan ke model penuh (tier `model`).
+
+Pengirim diambil dari teks email seperti fitur model (bisa dipalsukan), jadi
+allowlist sebaiknya hanya berisi domain yang email masuknya sudah
+diautentikasi (SPF/DKIM) di gateway.
+
+Mode evaluasi offline membandingkan keputusan cascade dengan model penuh:
+    python cascade.py --input valid.csv --tiers lists rules --allowlist allow.txt
+"""
+import argparse
+import time
+
+from campaign_index import campaign_fingerprint
+from featurizer import DomainReputation, ScanLimits, extract_sender_features, find_sender, keyword_engine
+from featurizer.extractors import URL_PATTERN
+from featurizer.preprocess import DATE_PATTERN
+
+TIERS = ('lists', 'rules')
+
+
+def load_domain_list(path):
+    """Satu domain per baris; '#' untuk komentar, awalan '@' / '*.' diabaikan."""
+    domains = set()
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            domain = line.split('#', 1)[0].strip().lower()
+            for prefix in ('@', '*.'):
+                if domain.startswith(prefix):
+                    domain = domain[len(prefix):]
+            if domain:
+                domains.add(domain)
+    return frozenset(domains)
+
+
+def domain_listed(domain, domains):
+    """`domain` atau salah satu domain induknya ada di `domains`."""
+    while domain:
+        if domain in domains:
+            return True
+        domain = domain.partition('.')[2]
+    return False
+
+
+class CascadeDecision:
+    """Keputusan satu tier: status, alasan dan fitur murah yang sudah dihitung."""
+
+    __slots__ = ('tier', 'status', 'reason', 'sender', 'date', 'truncated', 'features')
+
+    def __init__(self, tier, status, reason, sender, date, truncated, features):
+        self.tier = tier
+        self.status = status
+        self.reason = reason
+        self.sender = sender
+        self.date = date
+        self.truncated = truncated
+        self.features = features
+
+
+class Cascade:
+    """Tier murah sebelum model; tiers kosong mematikan cascade."""
+
+    def __init__(self, tiers=TIERS, allowlist=frozenset(), blocklist=frozenset(), limits=None, reputation=None):
+        unknown = set(tiers) - set(TIERS)
+        if unknown:
+            raise ValueError(f"Tier cascade tidak dikenal: {sorted(unknown)} (pilihan: {', '.join(TIERS)})")
+        self.tiers = tuple(tier for tier in TIERS if tier in tiers)
+        self.allowlist = allowlist
+        self.blocklist = blocklist
+        self.limits = ScanLimits() if limits is None else limits
+        self.reputation = reputation
+
+    def blocked(self, domain):
+        """Alasan jika `domain` ada di blocklist atau dikenal buruk di indeks reputasi, selain itu None."""
+        if domain_listed(domain, self.blocklist):
+            return "ada di blocklist"
+        if self.reputation is not None:
+            info = self.reputation.lookup(domain)
+            if info is not None and info.bad:
+                return f"dikenal buruk di indeks reputasi ({info.domain})"
+        return None
+
+    @property
+    def enabled(self):
+        return bool(self.tiers)
+
+    def decide(self, email_content):
+        """CascadeDecision jika salah satu tier yakin, None jika email harus diskor model."""
+        text, truncated = self.limits.apply(email_content)
+        sender_match = find_sender(text)
+        sender = sender_match.group(0) if sender_match else ''
+        date_match = DATE_PATTERN.search(text)
+        date = date_match.group(0) if date_match else ''
+        domain, hosts = campaign_fingerprint(text, sender)
+        features = {'sender_domain': domain or 'unknown', 'url_count': len(URL_PATTERN.findall(text))}
+
+        def decision(tier, status, reason):
+            return CascadeDecision(tier, status, reason, sender, date, truncated, features)
+
+        if 'lists' in self.tiers:
+            reason = self.blocked(domain) if domain else None
+            if reason:
+                return decision('lists', 'phishing', f"domain pengirim {domain} {reason}")
+            for host in sorted(hosts):
+                reason = self.blocked(host)
+                if reason:
+                    return decision('lists', 'phishing', f"link ke {host} {reason}")
+            if domain and domain_listed(domain, self.allowlist) and \
+                    all(domain_listed(host, self.allowlist) for host in hosts):
+                return decision('lists', 'safe', f"domain pengirim {domain} ada di allowlist")
+
+        if 'rules' in self.tiers and domain and features['url_count'] == 0:
+            extract_sender_features(sender, features, self.reputation)
+            if not (features['is_legitimate_domain'] or domain_listed(domain, self.allowlist)):
+                return None
+            scan = keyword_engine.scan(text)
+            features['suspicious_keyword_count'] = scan.count('phishing_keywords')
+            features['urgency_word_count'] = scan.count('urgency_words')
+            features['personal_info_request'] = 1 if scan.any('personal_info_keywords') else 0
+            features['has_threat'] = 1 if scan.any('threat_keywords') else 0
+            # Bukan EXTENSION_CATEGORIES: '.com' di sana cocok dengan setiap alamat *.com
+            features['has_attachment'] = 1 if scan.contains('attached file') or scan.any('suspicious_attachments') \
+                or scan.any('high_risk_extensions') else 0
+            if not (features['suspicious_keyword_count'] or features['personal_info_request']
+                    or features['has_threat'] or features['has_attachment']):
+                return decision('rules', 'safe', f"domain resmi {domain} tanpa link, lampiran atau kata kunci phishing")
+        return None
+
+
+# === EVALUASI OFFLINE ===
+def evaluate(emails, cascade, labels=None, progress=None):
+    """
+    Skor setiap email dengan cascade dan dengan model penuh (satu per satu, seperti /predict).
+    Kembalikan ringkasan per tier: jumlah, kesepakatan status dengan model, biaya.
+    """
+    import app
+
+    tiers = {}
+    model_seconds = 0.0
+    cascade_seconds = 0.0
+    label_hits = {'model': 0, 'cascade': 0}
+    for i, email_content in enumerate(emails):
+        start = time.perf_counter()
+        decision = cascade.decide(email_content)
+        decided = time.perf_counter() - start
+
+        start = time.perf_counter()
+        status = app.score_emails([email_content])[0]['prediction_status']
+        full = time.perf_counter() - start
+
+        model_seconds += full
+        # Jalur cascade: email yang tidak diputuskan tetap membayar model penuh
+        cascade_seconds += decided + (full if decision is None else 0.0)
+        tier = decision.tier if decision is not None else 'model'
+        stats = tiers.setdefault(tier, {'emails': 0, 'agree': 0, 'disagreements': {}})
+        stats['emails'] += 1
+        cascade_status = decision.status if decision is not None else status
+        if cascade_status == status:
+            stats['agree'] += 1
+        else:
+            # 'status cascade->status model', mis. 'safe->suspicious'
+            pair = f'{cascade_status}->{status}'
+            stats['disagreements'][pair] = stats['disagreements'].get(pair, 0) + 1
+        if labels is not None:
+            # Label biner: phishing jika status bukan 'safe'
+            actual = 'phish' in str(labels[i]).lower()
+            label_hits['model'] += int((status != 'safe') == actual)
+            label_hits['cascade'] += int((cascade_status != 'safe') == actual)
+        if progress is not None:
+            progress.update(1)
+
+    n = max(len(emails), 1)
+    summary = {
+        'emails': len(emails),
+        'tiers': {
+            tier: dict(stats, agreement=round(stats['agree'] / stats['emails'], 4))
+            for tier, stats in tiers.items()
+        },
+        'decided_rate': round(1 - tiers.get('model', {'emails': 0})['emails'] / n, 4),
+        'agreement': round(sum(stats['agree'] for stats in tiers.values()) / n, 4),
+        'model_ms_per_email': round(model_seconds / n * 1000, 3),
+        'cascade_ms_per_email': round(cascade_seconds / n * 1000, 3),
+        'saved_ms_per_email': round((model_seconds - cascade_seconds) / n * 1000, 3),
+    }
+    if labels is not None:
+        summary['label_accuracy'] = {path: round(hits / n, 4) for path, hits in label_hits.items()}
+    return summary
+
+
+def main():
+    import json
+
+    import pandas as pd
+    from tqdm import tqdm
+
+    parser = argparse.ArgumentParser(description='Evaluasi offline cascade terhadap model penuh')
+    parser.add_argument('--input', required=True, help='CSV berisi email')
+    parser.add_argument('--column', default='Email Text', help='kolom teks email')
+    parser.add_argument('--label-column', default='Email Type', help='kolom label (opsional)')
+    parser.add_argument('--tiers', nargs='+', choices=TIERS, default=list(TIERS))
+    parser.add_argument('--allowlist', help='file domain allowlist')
+    parser.add_argument('--blocklist', help='file domain blocklist')
+    parser.add_argument('--reputation', help='direktori indeks reputasi domain (domain_reputation.py build)')
+    parser.add_argument('--limit', type=int, help='hanya N baris pertama')
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.input, nrows=args.limit)
+    emails = [text if isinstance(text, str) else '' for text in df[args.column]]
+    labels = df[args.label_column].tolist() if args.label_column in df.columns else None
+    cascade = Cascade(
+        args.tiers,
+        allowlist=load_domain_list(args.allowlist) if args.allowlist else frozenset(),
+        blocklist=load_domain_list(args.blocklist) if args.blocklist else frozenset(),
+        reputation=DomainReputation(args.reputation) if args.reputation else None,
+    )
+    with tqdm(total=len(emails), desc='Evaluasi cascade', unit='email') as progress:
+        summary = evaluate(emails, cascade, labels, progress)
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,98 +1,126 @@
-import re
-import string
-import joblib
-import numpy as np
+import argparse
 import pandas as pd
 from tqdm import tqdm
-from xgboost import XGBClassifier
-from sklearn.feature_extraction.text import TfidfVectorizer
-
-
-# === Load Model Components ===
-model = joblib.load('phishing_detection_model/xgboost_phishing_model.pkl')
-tfidf_vectorizer = joblib.load('phishing_detection_model/tfidf_vectorizer.pkl')
-numeric_features = joblib.load('phishing_detection_model/numeric_features.pkl')
-target_col = joblib.load('phishing_detection_model/target_col.pkl')
-
-
-# === TEXT PREPROCESSING ===
-def enhanced_preprocess_combined_text(text: str) -> str:
-    """Clean and normalize text."""
-    if not isinstance(text, str):
-        return ""
-    text = text.lower()
-    text = re.sub(r"http\S+|www\S+", "url", text)        # Replace URLs
-    text = re.sub(r"\S+@\S+", "emailaddr", text)         # Replace emails
-    text = text.translate(str.maketrans("", "", string.punctuation))
-    text = re.sub(r"\s+", " ", text).strip()
-    return text
-
-
-# === FEATURE EXTRACTION ===
-def extract_phishing_features(text: str) -> dict:
-    """Extract numeric phishing indicators from text."""
-    if not isinstance(text, str):
-        text = ""
-
-    features = {}
-    text = text.lower()
-
-    # Keyword-based suspiciousness
-    phishing_keywords = [
-        "urgent", "verify", "password", "login", "click", "account",
-        "update", "security", "confirm", "bank", "paypal", "alert"
-    ]
-    features["suspicious_keyword_count"] = sum(1 for word in phishing_keywords if word in text)
+from featurizer import Featurizer, combine_batches, set_stop_words
+from inference import create_engine
+from model_bundle import load_model_components
+from parallel_features import ParallelFeaturizer
+
 
-    # Presence of link or email
-    features["has_link"] = 1 if re.search(r"http[s]?://", text) else 0
-    features["has_email"] = 1 if re.search(r"\S+@\S+", text) else 0
+# === Load Model Components (single bundle if built, else the joblib files) ===
+components = load_model_components('phishing_detection_model')
+model = components.model
+tfidf_vectorizer = components.tfidf
+numeric_features = components.numeric_features
+target_col = components.target_col
+if components.stop_words is not None:
+    set_stop_words(components.stop_words)
 
-    # Count digits (like account numbers or OTPs)
-    features["digit_count"] = sum(c.isdigit() for c in text)
+# One probability pass per call; INFERENCE_ENGINE / INFERENCE_THREADS pick the engine and threads
+engine = create_engine(model)
 
-    # Brand mention consistency
-    brands = ["paypal", "amazon", "bank", "google", "apple", "microsoft"]
-    mentioned_brands = [brand for brand in brands if brand in text]
-    features["sender_content_mismatch"] = 1 if len(mentioned_brands) > 1 else 0
 
-    # ✅ NEW FEATURE: has_legitimate_short_domain
-    features["has_legitimate_short_domain"] = 1 if re.search(
-        r"\b(bit\.ly|t\.co|tinyurl\.com|goo\.gl|rb\.gy)\b", text
-    ) else 0
+# === FEATURES (shared with app.py and the training notebook) ===
+featurizer = Featurizer(tfidf_vectorizer, numeric_features)
 
-    # ✅ Add fallback 0 values for any missing keys (prevents KeyError)
-    for f in numeric_features:
-        if f not in features:
-            features[f] = 0
 
-    return features
+def as_email_text(text):
+    return text if isinstance(text, str) else ""
 
 
-# === COMBINE FEATURES (TF-IDF + NUMERIC) ===
 def extract_features(email_text: str):
-    """Combine TF-IDF text features with numeric phishing features."""
-    preprocessed = enhanced_preprocess_combined_text(email_text)
-    tfidf_vector = tfidf_vectorizer.transform([preprocessed]).toarray()
-    phishing_feats = extract_phishing_features(preprocessed)
-    numeric_vector = np.array([phishing_feats[f] for f in numeric_features]).reshape(1, -1)
-    combined_features = np.hstack((tfidf_vector, numeric_vector))
-    return combined_features
+    """Combine TF-IDF text features with numeric phishing features for one email."""
+    X_combined, _ = combine_batches([featurizer.featurize_batch([as_email_text(email_text)])])
+    return X_combined
+
+
+def extract_features_batch(email_texts):
+    """Featurize a chunk (or shard) of emails as one sparse batch."""
+    return featurizer.featurize_batch([as_email_text(text) for text in email_texts])
 
 
 # === PREDICTION ===
 def predict_email_type(features, model, tfidf_vectorizer, numeric_features, target_col):
-    """Predict the email type and probability."""
-    pred_index = model.predict(features)[0]
+    """Predict the email type and probability from a single probability pass."""
+    probabilities = model.predict_proba(features)[0]
+    # argmax equals XGBClassifier.predict for binary models (class 1 only when p > 0.5)
+    pred_index = int(probabilities.argmax())
     pred_label = target_col[pred_index]
-    pred_prob = model.predict_proba(features).max()
+    pred_prob = probabilities.max()
     return pred_label, pred_prob
 
 
+def predict_email_type_batch(features, model, target_col):
+    """Predict a whole chunk with a single predict_proba call."""
+    probabilities = model.predict_proba(features)
+    pred_indexes = probabilities.argmax(axis=1)
+    pred_labels = [target_col[pred_index] for pred_index in pred_indexes]
+    return pred_labels, probabilities.max(axis=1)
+
+
+def confirm_rows(df):
+    return [
+        "Yes" if str(predicted).lower() == str(actual).lower() else "No"
+        for predicted, actual in zip(df['Predicted Type'], df['Email Type'])
+    ]
+
+
+# === STREAMING MODE ===
+def confirm_csv_streaming(input_path, output_path, chunksize, workers=1, shard_size=256):
+    """
+    Read the CSV in fixed-size chunks, predict once per chunk and append the
+    results to the output file, so peak memory depends on the chunk size only.
+    With workers > 1 each chunk is featurized in shards on a process pool.
+    """
+    total = 0
+    confirmed = 0
+    first_chunk = True
+
+    reader = pd.read_csv(input_path, chunksize=chunksize)
+    with ParallelFeaturizer(extract_features_batch, workers, shard_size) as pool, \
+            tqdm(desc="Processing emails", unit="email") as progress:
+        for chunk in reader:
+            if first_chunk and ('Email Text' not in chunk.columns or 'Email Type' not in chunk.columns):
+                raise ValueError("CSV must contain 'Email Text' and 'Email Type' columns")
+
+            features, _ = combine_batches(pool.map(chunk['Email Text'].tolist()))
+            predictions, probabilities = predict_email_type_batch(features, engine, target_col)
+
+            chunk['Predicted Type'] = predictions
+            chunk['Confidence'] = probabilities
+            chunk['Confirm'] = confirm_rows(chunk)
+
+            chunk.to_csv(output_path, mode='w' if first_chunk else 'a', header=first_chunk, index=False)
+            first_chunk = False
+
+            total += len(chunk)
+            confirmed += int((chunk['Confirm'] == "Yes").sum())
+            progress.update(len(chunk))
+
+    return total, confirmed
+
+
 # === MAIN EXECUTION ===
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Confirm email type predictions for a labelled CSV")
+    parser.add_argument('--input', default='valid.csv')
+    parser.add_argument('--output', default='valid_confirmed.csv')
+    parser.add_argument('--stream', action='store_true',
+                        help="read and score the CSV in chunks with bounded memory")
+    parser.add_argument('--chunksize', type=int, default=1000,
+                        help="rows per chunk in streaming mode")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="featurization processes in streaming mode (0 = all cores)")
+    args = parser.parse_args()
+
+    if args.stream:
+        print("🔍 Predicting email types (streaming)...")
+        total, confirmed = confirm_csv_streaming(args.input, args.output, args.chunksize, args.workers)
+        print(f"✅ Done! {total} rows processed, {confirmed} confirmed. Results saved as '{args.output}'")
+        raise SystemExit(0)
+
     # === Load the input CSV ===
-    df = pd.read_csv('valid.csv')
+    df = pd.read_csv(args.input)
 
     # Ensure required columns exist
     if 'Email Text' not in df.columns or 'Email Type' not in df.columns:
@@ -105,19 +133,16 @@ if __name__ == "__main__":
     # Predict for each email
     for text in tqdm(df['Email Text'], desc="Processing emails"):
         features = extract_features(text)
-        pred, prob = predict_email_type(features, model, tfidf_vectorizer, numeric_features, target_col)
+        pred, prob = predict_email_type(features, engine, tfidf_vectorizer, numeric_features, target_col)
         predictions.append(pred)
         probabilities.append(prob)
 
     # Add results to dataframe
     df['Predicted Type'] = predictions
     df['Confidence'] = probabilities
-    df['Confirm'] = df.apply(
-        lambda row: "Yes" if str(row['Predicted Type']).lower() == str(row['Email Type']).lower() else "No",
-        axis=1
-    )
+    df['Confirm'] = confirm_rows(df)
 
     # Save output
-    df.to_csv('valid_confirmed.csv', index=False)
-    print("✅ Done! Results saved as 'valid_confirmed.csv'")
+    df.to_csv(args.output, index=False)
+    print(f"✅ Done! Results saved as '{args.output}'")
     print(df[['Email Text', 'Email Type', 'Predicted Type', 'Confirm']].head())
@@ -0,0 +1,88 @@
+"""
+Builder dan lookup indeks reputasi domain (lihat featurizer/reputation.py).
+
+Setiap file input berupa teks (satu domain per baris, '#' untuk komentar)
+atau CSV dengan domain di kolom pertama dan tanggal registrasi opsional
+(YYYY-MM-DD) di kolom kedua; baris header 'domain,...' dilewati. Kategori
+diambil dari opsi yang dipakai; --dates hanya menambah tanggal registrasi.
+
+Contoh:
+    python domain_reputation.py build --good top-domains.txt --bad phishtank.csv \\
+        --new newly-registered.csv --free free-mail.txt --output reputasi/
+    python domain_reputation.py lookup --index reputasi/ mail.paypal.com login-paypal.tk
+
+Aktifkan di app.py dengan DOMAIN_REPUTATION_INDEX=reputasi/.
+"""
+import argparse
+import csv
+import json
+import sys
+
+from tqdm import tqdm
+
+from featurizer.reputation import FLAGS, UNKNOWN_DATE, DomainReputation, build_reputation_index, date_to_days
+
+
+def read_domain_file(path):
+    """(domain, registered_days) per baris file teks/CSV."""
+    with open(path, encoding='utf-8', newline='') as f:
+        for row in csv.reader(f):
+            if not row:
+                continue
+            domain = row[0].split('#', 1)[0].strip()
+            if not domain or domain.lower() == 'domain':
+                continue
+            yield domain, date_to_days(row[1]) if len(row) > 1 else UNKNOWN_DATE
+
+
+def iter_entries(sources):
+    """(domain, flags, registered_days) dari list (nama kategori atau None, path)."""
+    for category, path in sources:
+        flag = FLAGS[category] if category is not None else 0
+        for domain, days in tqdm(read_domain_file(path), desc=path, unit=' domain', mininterval=1):
+            yield domain, flag, days
+
+
+def cmd_build(args):
+    sources = [(category, path) for category in FLAGS for path in getattr(args, category) or []]
+    sources += [(None, path) for path in args.dates or []]
+    if not sources:
+        sys.exit("Tidak ada file input (--good/--bad/--new/--free/--dates)")
+    meta = build_reputation_index(iter_entries(sources), args.output)
+    print(json.dumps(meta, indent=2))
+
+
+def cmd_lookup(args):
+    index = DomainReputation(args.index)
+    for domain in args.domains:
+        info = index.lookup(domain)
+        if info is None:
+            print(f"{domain}: tidak ada")
+            continue
+        categories = [name for name, flag in FLAGS.items() if info.flags & flag]
+        print(f"{domain}: cocok {info.domain}, kategori {','.join(categories) or '-'}, "
+              f"umur {info.age_days() if info.age_days() is not None else '?'} hari, baru {info.new()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Indeks reputasi domain (memory-mapped)')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build = subparsers.add_parser('build', help='Buat indeks dari file teks/CSV')
+    for category in FLAGS:
+        build.add_argument(f'--{category}', action='append', metavar='FILE', help=f'domain kategori {category}')
+    build.add_argument('--dates', action='append', metavar='FILE', help='CSV domain,tanggal registrasi saja')
+    build.add_argument('--output', required=True, help='direktori indeks')
+    build.set_defaults(func=cmd_build)
+
+    lookup = subparsers.add_parser('lookup', help='Cari domain di indeks')
+    lookup.add_argument('--index', required=True)
+    lookup.add_argument('domains', nargs='+')
+    lookup.set_defaults(func=cmd_lookup)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
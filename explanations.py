@@ -0,0 +1,170 @@
+"""
+Penjelasan prediksi dari kontribusi model (XGBoost pred_contribs).
+
+Satu panggilan Booster.predict(pred_contribs=True) menghitung kontribusi
+setiap fitur ke margin (log-odds phishing) untuk seluruh batch: 'shap' =
+tree SHAP eksak, 'approx' = kontribusi per jalur (Saabas), jauh lebih murah.
+Jumlah kontribusi + bias selalu sama dengan margin model, jadi penjelasan
+selalu konsisten dengan probabilitas yang dilaporkan.
+
+Top-k kontribusi searah verdict (ke phishing untuk phishing/suspicious, ke
+aman untuk safe) dipetakan ke kalimat Indonesia: fitur numerik lewat
+NUMERIC_TEMPLATES (kalimat yang sama dengan penjelasan berbasis aturan di
+app.py), n-gram TF-IDF yang ada di email disebut langsung. N-gram yang tidak
+ada di email tidak ikut diperingkat: kontribusinya berasal dari kata khas
+korpus training (nama orang, 'enron', dll.) yang tidak bermakna bagi pengguna.
+"""
+import numpy as np
+import xgboost as xgb
+
+from inference import _iteration_range, resolve_threads
+
+EXPLAIN_METHODS = ('shap', 'approx')
+
+# nama fitur -> (kalimat jika nilai != 0, kalimat jika nilai == 0); {v} nilai, {pct} nilai x 100
+NUMERIC_TEMPLATES = {
+    'suspicious_keyword_count': (
+        "Mengandung {v:.0f} kata kunci mencurigakan (seperti 'urgent', 'verify account', 'suspended')",
+        "Tidak mengandung kata kunci phishing yang mencurigakan"),
+    'personal_info_request': (
+        "Meminta informasi pribadi sensitif (password, PIN, nomor kartu kredit)",
+        "Tidak meminta informasi pribadi sensitif"),
+    'has_threat': (
+        "Menggunakan bahasa yang mengancam (suspend, terminate, close account)",
+        "Tidak menggunakan bahasa yang mengancam"),
+    'has_suspicious_attachment': (
+        "Mengandung lampiran dengan ekstensi mencurigakan (.exe, .zip, .scr)",
+        "Tidak mengandung lampiran mencurigakan"),
+    'has_suspicious_short_domain': ("Menggunakan domain pemendek URL yang mencurigakan", None),
+    'has_typosquatting': ("Menggunakan domain mencurigakan atau mirip dengan domain resmi", None),
+    'has_ip_url': ("Menggunakan alamat IP sebagai URL (bukan domain)", None),
+    'capital_word_ratio': (
+        "Penggunaan huruf kapital tidak wajar ({pct:.0f}% kata dalam KAPITAL)",
+        "Tidak ada kata yang ditulis dengan huruf KAPITAL semua"),
+    'exclamation_count': ("Menggunakan tanda seru ({v:.0f} kali)", "Tidak menggunakan tanda seru"),
+    'excessive_exclamation': ("Penggunaan tanda seru berlebihan", None),
+    'urgency_word_count': (
+        "Mengandung kata-kata yang mendesak atau bersifat urgensi ({v:.0f} kata)",
+        "Tidak ada tekanan waktu atau urgensi yang berlebihan"),
+    'has_time_limit': ("Memberikan batasan waktu yang ketat untuk bertindak", None),
+    'has_generic_greeting': ("Menggunakan salam generik ('Dear Customer') bukan nama personal", None),
+    'brand_mention_count': ("Menyebut {v:.0f} merek perusahaan besar", "Tidak menyebut merek perusahaan besar"),
+    'has_misleading_link': ("Mengandung link dengan teks anchor yang menyesatkan", None),
+    'fear_intensity': ("Menggunakan kata-kata yang memicu rasa takut ({v:.0f} kata)", None),
+    'greed_trigger': ("Menggunakan kata-kata yang memicu keserakahan ({v:.0f} kata seperti 'free', 'win', 'prize')",
+                      None),
+    'action_request_count': (
+        "Meminta pembaca bertindak ({v:.0f} kata seperti 'click', 'verify', 'update')",
+        "Tidak ada permintaan untuk klik, verifikasi atau update"),
+    'security_claim_count': ("Mengklaim keamanan ({v:.0f} kata seperti 'secure', 'protected')", None),
+    'url_count': ("Mengandung {v:.0f} link yang perlu diverifikasi", "Tidak mengandung link"),
+    'has_url_masking': ("Menyembunyikan tujuan link dengan pemendek URL (bit.ly, tinyurl)", None),
+    'is_free_email': ("Pengirim menggunakan layanan email gratis", None),
+    'is_legitimate_domain': (
+        "Pengirim menggunakan domain resmi yang terpercaya",
+        "Pengirim tidak menggunakan domain resmi yang dikenal"),
+    'is_new_domain': ("Domain pengirim tampak baru atau memakai TLD yang sering disalahgunakan", None),
+    'text_length': ("Panjang email {v:.0f} kata", None),
+    'has_attachment': ("Menyebut adanya lampiran", None),
+    'has_suspicious_extension': ("Menyebut file dengan ekstensi berbahaya", None),
+    'sender_content_mismatch': ("Ada ketidaksesuaian antara pengirim dan konten email", None),
+    'sender_impersonation': ("Pengirim mencoba menyamar sebagai entitas resmi", "Tidak ada tanda-tanda impersonasi"),
+    'sensitive_info_request': ("Meminta Anda mengirimkan data sensitif melalui email", None),
+    'account_threat_count': ("Mengancam akan menutup/memblokir akun Anda", None),
+    'has_html_content': ("Email berisi HTML", "Email berupa teks biasa tanpa HTML"),
+}
+
+
+def numeric_message(name, value):
+    """Kalimat untuk fitur numerik; fitur tanpa templat disebut nama dan nilainya."""
+    present, absent = NUMERIC_TEMPLATES.get(name, (None, None))
+    template = present if value else absent
+    if template is None:
+        return f"Fitur {name} bernilai {value:g}"
+    return template.format(v=value, pct=value * 100)
+
+
+class ContributionExplainer:
+    """Kontribusi fitur per email (satu pred_contribs per batch) dan kalimat penjelasannya."""
+
+    def __init__(self, model, tfidf, numeric_features, method='shap', top_k=5, nthread=None):
+        if method not in EXPLAIN_METHODS:
+            raise ValueError(f"Metode penjelasan tidak dikenal: {method} (pilihan: {', '.join(EXPLAIN_METHODS)})")
+        self.booster = model.get_booster() if hasattr(model, 'get_booster') else model
+        self.missing = getattr(model, 'missing', np.nan)
+        self.iteration_range = _iteration_range(self.booster)
+        self.nthread = resolve_threads(nthread)
+        self.method = method
+        self.top_k = top_k
+        terms = np.empty(len(tfidf.vocabulary_), dtype=object)
+        for term, index in tfidf.vocabulary_.items():
+            terms[index] = term
+        self.n_terms = len(terms)
+        self.names = np.concatenate([terms, np.asarray(list(numeric_features), dtype=object)])
+
+    def contributions(self, X):
+        """Matriks (N, F + 1) float32: kontribusi tiap fitur ke margin, kolom terakhir bias."""
+        dmatrix = xgb.DMatrix(X, missing=self.missing, nthread=self.nthread or -1)
+        return self.booster.predict(
+            dmatrix,
+            pred_contribs=True,
+            approx_contribs=self.method == 'approx',
+            iteration_range=self.iteration_range,
+            validate_features=False
+        )
+
+    def explain(self, X, statuses):
+        """
+        Untuk setiap baris: (kalimat indikator searah verdict, top_features).
+        top_features adalah top-k kontribusi absolut (dua arah) untuk klien API.
+        """
+        n_rows = X.shape[0]
+        if not n_rows:
+            return []
+        contribs = self.contributions(X)[:, :-1]
+        k = min(self.top_k, contribs.shape[1])
+        X = X.tocsr()
+        # N-gram yang tidak ada di email tidak pernah masuk peringkat
+        absent = np.ones(contribs.shape, dtype=bool)
+        absent[:, self.n_terms:] = False
+        absent[X[:, :self.n_terms].nonzero()] = False
+        # Searah verdict: positif (ke phishing) kecuali untuk 'safe'
+        sign = np.where(np.asarray(statuses) == 'safe', -1.0, 1.0)[:, None]
+        directed = _top_k(np.where(absent, -np.inf, contribs * sign), k)
+        absolute = _top_k(np.where(absent, -np.inf, np.abs(contribs)), k)
+
+        rows = np.repeat(np.arange(n_rows), k)
+        directed_values = np.asarray(X[rows, directed.ravel()]).reshape(n_rows, k)
+        absolute_values = np.asarray(X[rows, absolute.ravel()]).reshape(n_rows, k)
+
+        results = []
+        for i in range(n_rows):
+            indicators = []
+            for column, value in zip(directed[i], directed_values[i]):
+                if absent[i, column] or contribs[i, column] * sign[i, 0] <= 0:
+                    break
+                name = self.names[column]
+                if column >= self.n_terms:
+                    indicators.append(numeric_message(name, float(value)))
+                else:
+                    indicators.append(f"Mengandung kata/frasa '{name}' yang sering muncul di email "
+                                      f"{'aman' if sign[i, 0] < 0 else 'phishing'}")
+            top_features = [
+                {
+                    'feature': self.names[column],
+                    'type': 'ngram' if column < self.n_terms else 'numeric',
+                    'value': round(float(value), 4),
+                    'contribution': round(float(contribs[i, column]), 4),
+                }
+                for column, value in zip(absolute[i], absolute_values[i])
+                if not absent[i, column]
+            ]
+            results.append((indicators, top_features))
+        return results
+
+
+def _top_k(scores, k):
+    """Indeks kolom k skor terbesar per baris, terurut menurun."""
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1, kind='stable')
+    return np.take_along_axis(top, order, axis=1)
@@ -0,0 +1,646 @@
+"""
+Feature store inkremental untuk retraining notebook.
+
+Sebelumnya notebook menghitung ulang semua keluarga fitur dengan
+`df['text_combined'].apply(lambda x: pd.Series(...))` setiap kali training;
+sekarang sel 2 notebook memanggil FeatureStore.update + materialize dan sel
+berikutnya membaca TrainingFeatures. Store ini menyimpan hasil setiap
+keluarga (preprocess, phishing, url, ...) per email, dengan kunci hash isi
+email (blake2b-128 dari text_combined), di `<store>/<keluarga>/<fingerprint>/`. Fingerprint keluarga dibentuk dari
+`version` di FAMILIES, source fungsi yang menghitungnya (beserta tabel kata
+kunci) dan fingerprint keluarga yang menjadi dependensinya. Retrain
+berikutnya hanya menghitung email baru dan keluarga yang kodenya berubah;
+sisanya dibaca ulang dari store. Naikkan `version` jika keluarga berubah
+lewat sesuatu yang tidak ikut di-hash (mis. data eksternal).
+
+Setiap segmen store adalah file .npy (kunci S16 terurut, nilai float32 dengan
+NaN untuk kolom yang tidak ditulis, teks sebagai blob UTF-8 + offset) yang
+dibuka dengan mmap. `materialize` menyusun matriks fitur numerik dan
+cleaned_text sesuai urutan korpus dengan semantik notebook (kolom duplikat:
+keluarga terakhir menang, lalu fillna 0 untuk has_/_count dan -1 untuk
+lainnya) ke direktori yang dibuka notebook dengan TrainingFeatures.open.
+
+Contoh (di luar notebook, mis. untuk menyiapkan store sebelum retrain):
+    python feature_store.py --input phishing_email.csv --store feature_store --output training_features --workers 0
+    # di notebook (sel 2-4):
+    #   features = TrainingFeatures.open('training_features')
+    #   X_tfidf = tfidf.fit_transform(features.cleaned_text)
+    #   X_numeric_sparse = csr_matrix(features.numeric)
+    #   y = features.labels
+"""
+import argparse
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import sys
+import time
+
+import numpy as np
+
+from featurizer import (
+    keyword_engine,
+    extract_phishing_features,
+    extract_url_features,
+    extract_brand_features,
+    extract_sender_features,
+    extract_file_extension_features,
+    advanced_sender_analysis,
+    extract_email_security_features,
+    get_stop_words,
+    parse_extracted_date,
+    preprocess_words,
+)
+from featurizer import extractors as extractors_module
+from featurizer import preprocess as preprocess_module
+from parallel_features import ParallelFeaturizer
+
+STORE_FORMAT = 1
+KEY_DTYPE = 'S16'
+TEXT_COLUMNS = ('cleaned_text', 'extracted_date', 'extracted_sender')
+
+
+def content_key(text):
+    """Kunci baris: blake2b-128 dari isi email (bukan posisi baris di CSV)."""
+    return hashlib.blake2b(text.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+
+
+# === KELUARGA FITUR ===
+class RowContext:
+    """Satu email; preprocessing dan keyword scan dihitung sekali, hanya jika dibutuhkan keluarga."""
+
+    __slots__ = ('text', '_preprocessed', '_scan')
+
+    def __init__(self, text):
+        self.text = text
+        self._preprocessed = None
+        self._scan = None
+
+    @property
+    def preprocessed(self):
+        if self._preprocessed is None:
+            self._preprocessed = preprocess_words(self.text)
+        return self._preprocessed
+
+    @property
+    def scan(self):
+        if self._scan is None:
+            self._scan = keyword_engine.scan(self.text)
+        return self._scan
+
+
+def compute_preprocess(ctx):
+    words, extracted_date, extracted_sender = ctx.preprocessed
+    return ' '.join(words), extracted_date, extracted_sender
+
+
+def compute_phishing(ctx):
+    return extract_phishing_features(ctx.text, ctx.scan)
+
+
+def compute_url(ctx):
+    return extract_url_features(ctx.text)
+
+
+def compute_brand(ctx):
+    return extract_brand_features(ctx.text, ctx.scan)
+
+
+def compute_date(ctx):
+    # Seperti sel 5 notebook: is_weekend bertipe bool (tidak ikut numeric_features), jam NaN jika tanggal tidak terbaca
+    parsed_date = parse_extracted_date(ctx.preprocessed[1])
+    return {
+        'is_weekend': parsed_date is not None and parsed_date.weekday() >= 5,
+        'hour_sent': parsed_date.hour if parsed_date is not None else None,
+    }
+
+
+def compute_sender(ctx):
+    return extract_sender_features(ctx.preprocessed[2])
+
+
+def compute_text(ctx):
+    # Sama dengan str.split().str.len() dan str.contains('attached file', case=False) di notebook
+    return {
+        'text_length': len(ctx.preprocessed[0]),
+        'has_attachment': 1 if ctx.scan.contains('attached file') else 0,
+    }
+
+
+def compute_file_extension(ctx):
+    return extract_file_extension_features(ctx.text, ctx.scan)
+
+
+def compute_advanced_sender(ctx):
+    return advanced_sender_analysis(ctx.preprocessed[2], ctx.text, ctx.scan)
+
+
+def compute_email_security(ctx):
+    return extract_email_security_features(ctx.text, ctx.scan)
+
+
+def _extractor_tables_source():
+    """Source extractors.py tanpa badan fungsi: daftar kata kunci dan tabel konstanta."""
+    source = inspect.getsource(extractors_module)
+    for _, func in inspect.getmembers(extractors_module, inspect.isfunction):
+        if func.__module__ == extractors_module.__name__:
+            source = source.replace(inspect.getsource(func), '')
+    return source
+
+
+class FeatureFamily:
+    """Satu keluarga fitur notebook: compute(RowContext) -> dict fitur, atau tuple TEXT_COLUMNS."""
+
+    def __init__(self, name, version, compute, code=(), depends=(), text=False):
+        self.name = name
+        self.version = version
+        self.compute = compute
+        # Fungsi/modul/string tambahan yang ikut menentukan hasil (di-hash ke fingerprint)
+        self.code = code
+        self.depends = depends
+        self.text = text
+
+
+# Urutan sama dengan sel 2-5 notebook: untuk kolom duplikat keluarga terakhir yang menang
+_KEYWORDS = (inspect.getmodule(type(keyword_engine)), _extractor_tables_source())
+FAMILIES = [
+    FeatureFamily('preprocess', 1, compute_preprocess, (preprocess_module, lambda: sorted(get_stop_words())),
+                  text=True),
+    FeatureFamily('phishing', 1, compute_phishing, (extract_phishing_features,) + _KEYWORDS),
+    FeatureFamily('url', 1, compute_url, (extract_url_features,) + _KEYWORDS),
+    FeatureFamily('brand', 1, compute_brand, (extract_brand_features,) + _KEYWORDS),
+    FeatureFamily('date', 1, compute_date, (parse_extracted_date,), depends=('preprocess',)),
+    FeatureFamily('sender', 1, compute_sender, (extract_sender_features,), depends=('preprocess',)),
+    FeatureFamily('text', 1, compute_text, _KEYWORDS, depends=('preprocess',)),
+    FeatureFamily('file_extension', 1, compute_file_extension, (extract_file_extension_features,) + _KEYWORDS),
+    FeatureFamily('advanced_sender', 1, compute_advanced_sender, (advanced_sender_analysis,) + _KEYWORDS,
+                  depends=('preprocess',)),
+    FeatureFamily('email_security', 1, compute_email_security, (extract_email_security_features,) + _KEYWORDS),
+]
+FAMILY_INDEX = {family.name: family for family in FAMILIES}
+
+
+def _code_text(item):
+    # str: dipakai apa adanya; modul/fungsi: source-nya; lambda: repr data yang dikembalikan (mis. stopword)
+    if isinstance(item, str):
+        return item
+    if inspect.ismodule(item) or item.__name__ != '<lambda>':
+        return inspect.getsource(item)
+    return repr(item())
+
+
+def family_fingerprints():
+    """{nama keluarga: fingerprint} untuk kode yang sedang terpasang."""
+    fingerprints = {}
+    for family in FAMILIES:
+        digest = hashlib.sha1(f'{STORE_FORMAT}:{family.name}:{family.version}'.encode())
+        for item in (family.compute,) + tuple(family.code):
+            digest.update(_code_text(item).encode('utf-8'))
+        for name in family.depends:
+            digest.update(fingerprints[name].encode())
+        fingerprints[family.name] = digest.hexdigest()[:16]
+    return fingerprints
+
+
+# === PERHITUNGAN (per shard, bisa di proses worker) ===
+def _is_numeric(value):
+    # None menjadi NaN seperti di pd.Series; str (sender_domain) tidak disimpan
+    return value is None or isinstance(value, (int, float, np.integer, np.floating))
+
+
+def _numeric_block(dicts):
+    """
+    List dict fitur -> (kolom, kolom bool, matriks float32 dengan NaN untuk
+    nilai yang tidak ada). Kolom yang semua nilainya bool dicatat karena
+    dtype bool tidak ikut select_dtypes numerik di notebook.
+    """
+    columns = {}
+    bools = {}
+    for features in dicts:
+        for name, value in features.items():
+            if _is_numeric(value):
+                columns.setdefault(name, len(columns))
+                bools[name] = bools.get(name, True) and isinstance(value, (bool, np.bool_))
+    values = np.full((len(dicts), len(columns)), np.nan, dtype=np.float32)
+    for i, features in enumerate(dicts):
+        row = values[i]
+        for name, value in features.items():
+            index = columns.get(name)
+            if index is not None and value is not None:
+                row[index] = value
+    names = list(columns)
+    return names, [name for name in names if bools[name]], values
+
+
+def compute_shard(items):
+    """
+    items: list (kunci, teks, nama keluarga yang perlu dihitung). Kembalikan
+    {keluarga: (kunci, hasil)}; hasil berupa list tuple teks untuk preprocess
+    atau (kolom, kolom bool, matriks float32) untuk keluarga numerik.
+    """
+    outputs = {}
+    for key, text, names in items:
+        ctx = RowContext(text)
+        for name in names:
+            keys, results = outputs.setdefault(name, ([], []))
+            keys.append(key)
+            results.append(FAMILY_INDEX[name].compute(ctx))
+    return {
+        name: (keys, results if FAMILY_INDEX[name].text else _numeric_block(results))
+        for name, (keys, results) in outputs.items()
+    }
+
+
+# === PENYIMPANAN ===
+def _save_npy(path, array):
+    # Tulis ke .tmp lalu rename: segmen yang terputus tidak pernah terlihat setengah jadi
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        np.save(f, array)
+    os.replace(tmp_path, path)
+
+
+def _save_json(path, data):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def encode_texts(texts):
+    """List str -> (blob uint8, offset int64 sepanjang N+1)."""
+    encoded = [text.encode('utf-8', 'surrogatepass') for text in texts]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(data) for data in encoded], out=offsets[1:])
+    return np.frombuffer(b''.join(encoded), dtype=np.uint8), offsets
+
+
+class TextColumn:
+    """Kolom teks dari blob UTF-8 + offset (mmap); bisa di-index dan diiterasi seperti list str."""
+
+    def __init__(self, blob, offsets):
+        self.blob = blob
+        self.offsets = offsets
+
+    @classmethod
+    def open(cls, prefix):
+        return cls(np.load(prefix + '.npy', mmap_mode='r'), np.load(prefix + '-offsets.npy', mmap_mode='r'))
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return self.blob[self.offsets[i]:self.offsets[i + 1]].tobytes().decode('utf-8', 'surrogatepass')
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+
+class FamilyTable:
+    """
+    Segmen satu keluarga untuk satu fingerprint.
+
+    Segmen `seg-NNNNN` berisi keys.npy (kunci terurut) dan values.npy +
+    json kolom (numerik) atau blob/offset per kolom teks (preprocess).
+    keys.npy ditulis paling akhir, jadi segmen tanpa keys.npy diabaikan.
+    """
+
+    def __init__(self, root, family, fingerprint):
+        self.family = family
+        self.fingerprint = fingerprint
+        self.path = os.path.join(root, family.name, fingerprint)
+        self.segments = []
+        if os.path.isdir(self.path):
+            for filename in sorted(os.listdir(self.path)):
+                if filename.endswith('-keys.npy'):
+                    self.segments.append(self._open_segment(filename[:-len('-keys.npy')]))
+        self._build_index()
+
+    def _open_segment(self, name):
+        prefix = os.path.join(self.path, name)
+        segment = {'name': name, 'keys': np.load(prefix + '-keys.npy', mmap_mode='r')}
+        if self.family.text:
+            segment['texts'] = {column: TextColumn.open(f'{prefix}-{column}') for column in TEXT_COLUMNS}
+        else:
+            with open(prefix + '.json', encoding='utf-8') as f:
+                segment.update(json.load(f))
+            segment['values'] = np.load(prefix + '-values.npy', mmap_mode='r')
+        return segment
+
+    def _build_index(self):
+        keys = [segment['keys'] for segment in self.segments]
+        self._keys = np.concatenate(keys) if keys else np.empty(0, dtype=KEY_DTYPE)
+        self._segment = np.repeat(np.arange(len(keys), dtype=np.int32), [len(k) for k in keys])
+        self._row = np.concatenate([np.arange(len(k), dtype=np.int32) for k in keys]) if keys else np.empty(0, np.int32)
+        order = np.argsort(self._keys, kind='stable')
+        self._keys, self._segment, self._row = self._keys[order], self._segment[order], self._row[order]
+
+    def __len__(self):
+        return len(self._keys)
+
+    @property
+    def columns(self):
+        """Kolom numerik (gabungan semua segmen, urutan pertama muncul) dan kolom yang selalu bool."""
+        columns, not_bool = {}, set()
+        for segment in self.segments:
+            for name in segment['columns']:
+                columns.setdefault(name, None)
+            not_bool.update(set(segment['columns']) - set(segment['bool_columns']))
+        return list(columns), set(columns) - not_bool
+
+    def lookup(self, keys):
+        """(segmen, baris) untuk setiap kunci; segmen -1 jika kunci belum ada."""
+        if not len(self._keys):
+            missing = np.full(len(keys), -1, dtype=np.int32)
+            return missing, missing
+        positions = np.minimum(np.searchsorted(self._keys, keys), len(self._keys) - 1)
+        found = self._keys[positions] == keys
+        return np.where(found, self._segment[positions], -1), np.where(found, self._row[positions], -1)
+
+    def append(self, keys, result):
+        """Tulis satu segmen baru dari hasil compute_shard yang sudah digabung."""
+        os.makedirs(self.path, exist_ok=True)
+        name = f'seg-{len(self.segments):05d}'
+        prefix = os.path.join(self.path, name)
+        order = np.argsort(keys, kind='stable')
+        keys = keys[order]
+        if self.family.text:
+            for c, column in enumerate(TEXT_COLUMNS):
+                blob, offsets = encode_texts([result[i][c] for i in order])
+                _save_npy(f'{prefix}-{column}.npy', blob)
+                _save_npy(f'{prefix}-{column}-offsets.npy', offsets)
+        else:
+            columns, bool_columns, values = result
+            _save_npy(prefix + '-values.npy', values[order])
+            _save_json(prefix + '.json', {'columns': columns, 'bool_columns': bool_columns})
+        _save_npy(prefix + '-keys.npy', keys)
+        self.segments.append(self._open_segment(name))
+        self._build_index()
+
+
+def _merge_numeric(parts):
+    """Gabungkan blok (kolom, kolom bool, matriks) dari beberapa shard ke satu set kolom."""
+    columns = {}
+    bools = {}
+    for names, bool_names, _ in parts:
+        for name in names:
+            columns.setdefault(name, len(columns))
+            bools[name] = bools.get(name, True) and name in bool_names
+    n_rows = sum(len(values) for _, _, values in parts)
+    merged = np.full((n_rows, len(columns)), np.nan, dtype=np.float32)
+    start = 0
+    for names, _, values in parts:
+        merged[start:start + len(values), [columns[name] for name in names]] = values
+        start += len(values)
+    names = list(columns)
+    return names, [name for name in names if bools[name]], merged
+
+
+class FeatureStore:
+    """Store semua keluarga di satu direktori; tabel per keluarga memakai fingerprint kode saat ini."""
+
+    def __init__(self, root):
+        self.root = root
+        self.fingerprints = family_fingerprints()
+        self.tables = {family.name: FamilyTable(root, family, self.fingerprints[family.name]) for family in FAMILIES}
+
+    def update(self, texts, workers=1, shard_size=256, segment_rows=20000, progress=None):
+        """
+        Pastikan semua keluarga tersedia untuk `texts`; hanya pasangan
+        (email, keluarga) yang belum ada yang dihitung. Kembalikan kunci
+        per baris (array S16) dan statistik {keluarga: [dipakai ulang, dihitung]}.
+        """
+        stats = {family.name: [0, 0] for family in FAMILIES}
+        all_keys = []
+        with ParallelFeaturizer(compute_shard, workers, shard_size=shard_size) as pool:
+            for start in range(0, len(texts), segment_rows):
+                chunk = [text if isinstance(text, str) else '' for text in texts[start:start + segment_rows]]
+                keys = np.array([content_key(text) for text in chunk], dtype=KEY_DTYPE)
+                all_keys.append(keys)
+
+                # Satu baris per kunci unik; baris duplikat memakai hasil yang sama
+                unique_keys, first = np.unique(keys, return_index=True)
+                missing = {}
+                for family in FAMILIES:
+                    segments, _ = self.tables[family.name].lookup(unique_keys)
+                    is_missing = segments < 0
+                    stats[family.name][0] += int(np.count_nonzero(~is_missing))
+                    stats[family.name][1] += int(np.count_nonzero(is_missing))
+                    for i in np.flatnonzero(is_missing):
+                        missing.setdefault(int(first[i]), []).append(family.name)
+
+                if missing:
+                    items = [(keys[i], chunk[i], missing[i]) for i in sorted(missing)]
+                    self._store_results(pool.map(items))
+                if progress is not None:
+                    progress(len(chunk))
+        keys = np.concatenate(all_keys) if all_keys else np.empty(0, dtype=KEY_DTYPE)
+        return keys, stats
+
+    def _store_results(self, shard_outputs):
+        per_family = {}
+        for output in shard_outputs:
+            for name, (keys, result) in output.items():
+                family_keys, family_results = per_family.setdefault(name, ([], []))
+                family_keys.extend(keys)
+                family_results.append(result)
+        for name, (family_keys, family_results) in per_family.items():
+            table = self.tables[name]
+            if table.family.text:
+                result = [texts for part in family_results for texts in part]
+            else:
+                result = _merge_numeric(family_results)
+            table.append(np.array(family_keys, dtype=KEY_DTYPE), result)
+
+    def prune(self):
+        """Hapus direktori fingerprint lama (kode keluarga sudah berubah); kembalikan path yang dihapus."""
+        removed = []
+        for family in FAMILIES:
+            family_dir = os.path.join(self.root, family.name)
+            if not os.path.isdir(family_dir):
+                continue
+            for fingerprint in os.listdir(family_dir):
+                if fingerprint != self.fingerprints[family.name]:
+                    path = os.path.join(family_dir, fingerprint)
+                    shutil.rmtree(path)
+                    removed.append(path)
+        return removed
+
+    def numeric_columns(self):
+        """
+        Kolom numerik seperti notebook sesudah hapus kolom duplikat (keep='last')
+        dan select_dtypes numerik: kolom bool (mis. is_weekend) tidak ikut.
+        Kembalikan (urutan kolom, {kolom: keluarga pemilik}).
+        """
+        order, owners, bools = [], {}, {}
+        for family in FAMILIES:
+            if family.text:
+                continue
+            columns, bool_columns = self.tables[family.name].columns
+            for name in columns:
+                if name in owners:
+                    order.remove(name)
+                order.append(name)
+                owners[name] = family.name
+                bools[name] = name in bool_columns
+        return [name for name in order if not bools[name]], owners
+
+    def materialize(self, keys, out_dir, numeric_features=None, labels=None):
+        """
+        Tulis fitur untuk `keys` (urutan korpus) ke `out_dir`: numeric.npy
+        (N, F) float32, cleaned_text (blob + offset), keys.npy dan
+        numeric_features.json. Semua keluarga untuk keys harus sudah ada (update).
+        """
+        os.makedirs(out_dir, exist_ok=True)
+        columns, owners = self.numeric_columns()
+        numeric_features = columns if numeric_features is None else list(numeric_features)
+        n_rows = len(keys)
+
+        numeric_path = os.path.join(out_dir, 'numeric.npy')
+        numeric = np.lib.format.open_memmap(numeric_path + '.tmp', mode='w+', dtype=np.float32,
+                                            shape=(n_rows, len(numeric_features)))
+        numeric[:] = np.nan
+        by_family = {}
+        for index, name in enumerate(numeric_features):
+            if name in owners:
+                by_family.setdefault(owners[name], []).append((index, name))
+        for family_name, targets in by_family.items():
+            table = self.tables[family_name]
+            segments, rows = self._locate(table, keys)
+            for s, segment in enumerate(table.segments):
+                selected = np.flatnonzero(segments == s)
+                source = {name: i for i, name in enumerate(segment['columns'])}
+                pairs = [(index, source[name]) for index, name in targets if name in source]
+                if len(selected) and pairs:
+                    out_columns, segment_columns = zip(*pairs)
+                    block = np.asarray(segment['values'])[rows[selected]][:, list(segment_columns)]
+                    numeric[selected[:, None], np.array(out_columns)] = block
+
+        # fillna notebook: 0 untuk fitur biner/hitungan, -1 untuk fitur kontinu
+        for index, name in enumerate(numeric_features):
+            column = numeric[:, index]
+            column[np.isnan(column)] = 0 if name.startswith('has_') or name.endswith('_count') else -1
+        numeric.flush()
+        del numeric
+        os.replace(numeric_path + '.tmp', numeric_path)
+
+        self._write_cleaned_text(keys, os.path.join(out_dir, 'cleaned_text'))
+        _save_npy(os.path.join(out_dir, 'keys.npy'), np.asarray(keys, dtype=KEY_DTYPE))
+        if labels is not None:
+            _save_npy(os.path.join(out_dir, 'labels.npy'), np.asarray(labels))
+        _save_json(os.path.join(out_dir, 'numeric_features.json'), {
+            'format': STORE_FORMAT, 'numeric_features': numeric_features, 'fingerprints': self.fingerprints
+        })
+        return numeric_features
+
+    def _locate(self, table, keys):
+        segments, rows = table.lookup(keys)
+        if n_missing := int(np.count_nonzero(segments < 0)):
+            raise KeyError(f"{n_missing} baris belum ada di keluarga '{table.family.name}'; jalankan update dulu")
+        return segments, rows
+
+    def _write_cleaned_text(self, keys, prefix):
+        table = self.tables['preprocess']
+        segments, rows = self._locate(table, keys)
+        columns = [segment['texts']['cleaned_text'] for segment in table.segments]
+        lengths = np.zeros(len(keys), dtype=np.int64)
+        for s, column in enumerate(columns):
+            selected = np.flatnonzero(segments == s)
+            offsets = np.asarray(column.offsets)
+            lengths[selected] = offsets[rows[selected] + 1] - offsets[rows[selected]]
+        offsets = np.zeros(len(keys) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+
+        blob = np.lib.format.open_memmap(prefix + '.npy.tmp', mode='w+', dtype=np.uint8, shape=(int(offsets[-1]),))
+        for i in range(len(keys)):
+            column = columns[segments[i]]
+            start = column.offsets[rows[i]]
+            blob[offsets[i]:offsets[i + 1]] = column.blob[start:start + lengths[i]]
+        blob.flush()
+        del blob
+        os.replace(prefix + '.npy.tmp', prefix + '.npy')
+        _save_npy(prefix + '-offsets.npy', offsets)
+
+
+class TrainingFeatures:
+    """Hasil materialize yang dibuka dengan mmap untuk training."""
+
+    def __init__(self, numeric, numeric_features, cleaned_text, keys, labels=None):
+        self.numeric = numeric
+        self.numeric_features = numeric_features
+        self.cleaned_text = cleaned_text
+        self.keys = keys
+        self.labels = labels
+
+    @classmethod
+    def open(cls, out_dir):
+        with open(os.path.join(out_dir, 'numeric_features.json'), encoding='utf-8') as f:
+            meta = json.load(f)
+        labels_path = os.path.join(out_dir, 'labels.npy')
+        return cls(
+            np.load(os.path.join(out_dir, 'numeric.npy'), mmap_mode='r'),
+            meta['numeric_features'],
+            TextColumn.open(os.path.join(out_dir, 'cleaned_text')),
+            np.load(os.path.join(out_dir, 'keys.npy'), mmap_mode='r'),
+            np.load(labels_path, mmap_mode='r') if os.path.exists(labels_path) else None,
+        )
+
+    def __len__(self):
+        return len(self.keys)
+
+
+def find_target_column(columns):
+    # Sama dengan sel 1 notebook: nama label umum, jika tidak ada kolom terakhir
+    for col in columns:
+        if col.lower() in ['label', 'target', 'class', 'category']:
+            return col
+    return columns[-1]
+
+
+def build_training_features(input_path, store_dir, out_dir, text_column='text_combined', numeric_features=None,
+                            workers=1, prune=False):
+    """Baca CSV training, perbarui store lalu materialize; kembalikan statistik per keluarga."""
+    import pandas as pd
+    from tqdm import tqdm
+
+    df = pd.read_csv(input_path)
+    target_col = find_target_column(df.columns.tolist())
+    df = df.dropna(subset=[target_col])
+    texts = df[text_column].tolist()
+
+    store = FeatureStore(store_dir)
+    start = time.perf_counter()
+    with tqdm(total=len(texts), desc='Fitur', unit='email') as bar:
+        keys, stats = store.update(texts, workers=workers, progress=bar.update)
+    update_seconds = time.perf_counter() - start
+    store.materialize(keys, out_dir, numeric_features, labels=df[target_col].astype(int).to_numpy())
+    removed = store.prune() if prune else []
+    return stats, update_seconds, removed
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Feature store inkremental untuk training notebook')
+    parser.add_argument('--input', required=True, help='CSV training (mis. phishing_email.csv)')
+    parser.add_argument('--column', default='text_combined', help='kolom teks email')
+    parser.add_argument('--store', default='feature_store', help='direktori store (dipakai ulang antar retrain)')
+    parser.add_argument('--output', required=True, help='direktori hasil untuk TrainingFeatures.open')
+    parser.add_argument('--numeric-features', help='numeric_features.pkl; default semua kolom numerik seperti notebook')
+    parser.add_argument('--workers', type=int, default=1, help='proses featurization (0 = semua core)')
+    parser.add_argument('--prune', action='store_true', help='hapus fingerprint lama yang tidak dipakai lagi')
+    args = parser.parse_args()
+
+    numeric_features = None
+    if args.numeric_features:
+        import joblib
+        numeric_features = joblib.load(args.numeric_features)
+
+    stats, update_seconds, removed = build_training_features(
+        args.input, args.store, args.output, args.column, numeric_features, args.workers, args.prune)
+    for name, (reused, computed) in stats.items():
+        print(f"{name:16s} dipakai ulang {reused:8d}  dihitung {computed:8d}")
+    print(f"Update store: {update_seconds:.1f} s")
+    for path in removed:
+        print(f"Dihapus: {path}")
+    sys.exit(0)
@@ -0,0 +1,27 @@
+"""
+Ekstraksi fitur bersama untuk app.py, confirm_csv.py dan notebook training.
+"""
+from .extractors import (
+    keyword_engine,
+    extract_phishing_features,
+    extract_url_features,
+    extract_brand_features,
+    extract_sender_features,
+    extract_file_extension_features,
+    advanced_sender_analysis,
+    extract_email_security_features,
+)
+from .bounds import ScanLimits
+from .layout import FeatureLayout, FeatureRow
+from .pipeline import Featurizer, FeatureBatch, add_date_features, combine_batches, parse_extracted_date
+from .reputation import DomainReputation, build_reputation_index
+from .preprocess import (
+    enhanced_preprocess_combined_text,
+    find_sender,
+    get_stop_words,
+    preprocess_words,
+    remove_senders,
+    set_stop_words,
+)
+from .timing import NULL_TIMER, StageTimer
+from .vectorizer import TokenVectorizer
@@ -0,0 +1,57 @@
+"""
+Batas ukuran teks yang dipindai ekstraktor fitur.
+
+Email sampai `max_chars` karakter dipindai utuh, jadi fiturnya identik dengan
+training. Email yang lebih panjang dipangkas sebelum preprocessing:
+
+1. Blob base64 (isi lampiran MIME, data: URI, tempelan biner) diganti satu
+   spasi. Blob adalah run minimal `blob_min_chars` karakter alfabet base64
+   dan baris baru; teks biasa selalu dipisah spasi atau tanda baca. Untuk
+   email yang sangat besar blob hanya dicari di awal dan akhir email
+   (masing-masing PREWINDOW_FACTOR x max_chars karakter).
+2. Jika masih melebihi `max_chars`, hanya `head_chars` karakter awal dan
+   `tail_chars` karakter akhir yang dipindai (dipisah baris baru). Header,
+   salam, link utama dan ajakan bertindak ada di awal; tanda tangan, footer
+   dan link unsubscribe di akhir.
+
+Dengan begitu biaya pemangkasan maupun ekstraksi sesudahnya dibatasi oleh
+max_chars, berapa pun panjang email.
+"""
+import re
+
+BASE64_CHARS = 'A-Za-z0-9+/='
+
+
+class ScanLimits:
+    """Batas pemindaian; max_chars=None mematikan pemangkasan."""
+
+    PREWINDOW_FACTOR = 4
+
+    def __init__(self, max_chars=100000, head_chars=80000, tail_chars=20000, blob_min_chars=200):
+        if max_chars is not None and head_chars + tail_chars > max_chars:
+            raise ValueError(f"head_chars + tail_chars ({head_chars + tail_chars}) melebihi max_chars ({max_chars})")
+        self.max_chars = max_chars
+        self.head_chars = head_chars
+        self.tail_chars = tail_chars
+        self.blob_min_chars = blob_min_chars
+        # Lookbehind: blob hanya dicoba di awal run, sehingga run pendek tidak dipindai berulang kali
+        self._blob_pattern = re.compile(
+            rf'(?<![{BASE64_CHARS}\r\n])[{BASE64_CHARS}\r\n]{{{blob_min_chars},}}')
+
+    def apply(self, text):
+        """Kembalikan (teks yang dipindai, truncated)."""
+        if self.max_chars is None or len(text) <= self.max_chars:
+            return text, False
+
+        reach = self.max_chars * self.PREWINDOW_FACTOR
+        if len(text) <= 2 * reach:
+            text = self._blob_pattern.sub(' ', text)
+            if len(text) <= self.max_chars:
+                return text, True
+            head = tail = text
+        else:
+            head = self._blob_pattern.sub(' ', text[:reach])
+            tail = self._blob_pattern.sub(' ', text[len(text) - reach:])
+
+        tail = tail[len(tail) - self.tail_chars:] if self.tail_chars else ''
+        return head[:self.head_chars] + '\n' + tail, True
@@ -0,0 +1,538 @@
+"""
+Ekstraktor fitur yang sama dengan notebook training.
+
+Setiap ekstraktor menerima argumen opsional `features`: tanpa argumen ini
+hasilnya dict baru (dipakai notebook), sedangkan pipeline serving memberikan
+FeatureRow agar nilai langsung ditulis ke baris float32 yang sudah dialokasikan.
+Semua daftar kata kunci didaftarkan ke satu KeywordEngine saat import.
+"""
+import re
+
+from .keyword_engine import KeywordEngine
+
+keyword_engine = KeywordEngine()
+
+# Daftar untuk extract_phishing_features
+keyword_engine.register('phishing_keywords', [
+    'urgent', 'immediate', 'action required', 'verify your account',
+    'suspended', 'limited time', 'click here', 'update now',
+    'confirm', 'security alert', 'unusual sign-in', 'locked account',
+    'billing issue', 'payment failed', 'account locked', 'verify identity',
+    'secure your account', 'unauthorized access', 'expiring today',
+    'act now', 'limited offer', 'exclusive deal', 'confirm immediately'
+])
+keyword_engine.register('legitimate_short_domains', ['bit.ly', 't.co', 'goo.gl', 'ow.ly', 'buff.ly', 'mcaf.ee'])
+keyword_engine.register('suspicious_short_domains', [
+    'tinyurl.com', 'short.url', 'tiny.cc', 'is.gd', 'adf.ly',
+    'vzturl.com', 'cli.re', 'q.gs', 'u.to', 'yourl.io', 'po.st'
+])
+TYPOSQUAT_DOMAINS = keyword_engine.register(
+    'typosquat_domains', ['paypal.com', 'amazon.com', 'microsoft.com', 'apple.com', 'google.com']
+)
+for domain in TYPOSQUAT_DOMAINS:
+    keyword_engine.register(f'typo_variations:{domain}', [
+        domain.replace('.com', '.co'),
+        domain.replace('.com', '.org'),
+        domain.replace('a', '4'), domain.replace('i', '1'),
+        domain.replace('o', '0'), domain.replace('l', '1'),
+        domain.replace('m', 'rn'), domain.replace('n', 'rn')
+    ])
+keyword_engine.register('urgency_words', ['urgent', 'immediately', 'asap', 'hurry', 'fast', 'quick', 'now', 'today', 'soon'])
+keyword_engine.register('time_limit_keywords', ['24 hours', '48 hours', 'by tomorrow', 'today only', 'expires today'])
+keyword_engine.register('personal_info_keywords', [
+    'ssn', 'social security', 'credit card', 'bank account',
+    'password', 'pin', 'cvv', 'account number', 'card number',
+    'expiration date', 'security code', 'routing number'
+])
+keyword_engine.register('threat_keywords', ['suspend', 'terminate', 'close', 'deactivate', 'block', 'restrict', 'penalty', 'fee', 'fine'])
+keyword_engine.register('generic_greetings', ['dear customer', 'dear user', 'dear sir/madam', 'valued customer', 'account holder'])
+keyword_engine.register('personalization_placeholders', ['[name]', '[email]', '[customer]', '[user]'])
+BRANDS = keyword_engine.register('brands', ['paypal', 'amazon', 'microsoft', 'apple', 'google', 'facebook', 'instagram'])
+for brand in BRANDS:
+    keyword_engine.register(f'brand_variations:{brand}', [
+        brand + 'support', brand + 'security', brand + 'team',
+        brand + 'update', brand + 'alert', brand + 'notice'
+    ])
+keyword_engine.register('common_misspellings', [
+    'paypaI', 'appIe', 'microsft',
+    'amaz0n', 'g00gle', 'faceb00k',
+    'verifye', 'securty', 'acount'
+])
+keyword_engine.register('html_tags', ['<html', '<div', '<table', '<form', '<script', '<iframe'])
+keyword_engine.register('html_markers', ['<form', 'action=', 'javascript:', '<script', 'unsubscribe'])
+keyword_engine.register('tracking_pixels', ['tracking pixel', 'open tracking', 'read receipt'])
+MISLEADING_ANCHORS = keyword_engine.register('misleading_anchors', ['click here', 'verify now', 'update account', 'sign in'])
+keyword_engine.register('authority_impersonation', ['fbi', 'cia', 'irs', 'police', 'government', 'bank', 'court'])
+keyword_engine.register('scarcity_tactics', ['only 2 left', 'last chance', 'almost gone', 'running out'])
+keyword_engine.register('social_proof', ['trusted by millions', 'used by fortune 500', 'recommended by experts'])
+keyword_engine.register('fear_words', ['hack', 'breach', 'compromised', 'stolen', 'fraud', 'suspended'])
+keyword_engine.register('greed_words', ['free', 'win', 'prize', 'reward', 'discount', 'bonus'])
+keyword_engine.register('curiosity_words', ['see what happened', 'you won\'t believe', 'shocking discovery'])
+keyword_engine.register('action_keywords', ['click', 'verify', 'update', 'confirm', 'sign in', 'log in', 'download'])
+keyword_engine.register('security_claims', ['secure', 'encrypted', 'protected', 'safe', 'trusted'])
+keyword_engine.register('suspicious_attachments', ['.exe', '.zip', '.scr', '.bat', '.js', '.docm'])
+keyword_engine.register('suspicious_contact', [
+    'call now', 'contact immediately', 'urgent call', 'phone verification',
+    'verify by phone', 'confirm by call'
+])
+keyword_engine.register('recent_events', ['covid', 'pandemic', 'election', 'holiday', 'black friday'])
+keyword_engine.register('seasonal_references', ['christmas', 'thanksgiving', 'new year', 'summer', 'winter'])
+
+MID_SENTENCE_EXCLAMATION = re.compile(r'!(?=[^. \n])')
+
+def extract_phishing_features(text, scan=None, features=None):
+    if scan is None:
+        scan = keyword_engine.scan(text)
+    features = {} if features is None else features
+
+    # 1. Suspicious Keywords (diperluas)
+    features['suspicious_keyword_count'] = scan.count('phishing_keywords')
+
+    # 2. Realistic Suspicious Domains
+    features['has_legitimate_short_domain'] = 1 if scan.any('legitimate_short_domains') else 0
+    features['has_suspicious_short_domain'] = 1 if scan.any('suspicious_short_domains') else 0
+
+    # Deteksi typosquatting
+    features['has_typosquatting'] = 0
+
+    for domain in TYPOSQUAT_DOMAINS:
+        if scan.contains(domain):
+            if scan.any(f'typo_variations:{domain}'):
+                features['has_typosquatting'] = 1
+                break
+
+    # Deteksi IP address sebagai URL
+    ip_pattern = r'https?://\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}'
+    features['has_ip_url'] = 1 if re.search(ip_pattern, text) else 0
+
+    # 3. Advanced Capital Word Analysis
+    words = text.split()
+    if words:
+        capital_words = [word for word in words if word.isupper() and len(word) > 1]
+        features['capital_word_ratio'] = len(capital_words) / len(words)
+
+        sentences = re.split(r'[.!?]+', text)
+        all_caps_sentences = sum(1 for sentence in sentences if sentence.strip() and sentence.strip().isupper())
+        features['all_caps_sentences_ratio'] = all_caps_sentences / max(len(sentences), 1)
+
+        # Deteksi kapital tidak wajar
+        brands = ['paypal', 'amazon', 'microsoft', 'apple', 'google', 'facebook']
+        acronyms = ['ID', 'URL', 'HTML', 'PDF', 'CEO', 'CFO']
+        unusual_capitals = 0
+
+        for i, word in enumerate(words):
+            if word.isupper() and len(word) > 1:
+                if i == 0 or words[i-1].endswith(('.', '!', '?')):
+                    continue
+                if word.lower() in brands or word in acronyms:
+                    continue
+                unusual_capitals += 1
+
+        features['unusual_capital_ratio'] = unusual_capitals / len(words)
+    else:
+        features['capital_word_ratio'] = 0
+        features['all_caps_sentences_ratio'] = 0
+        features['unusual_capital_ratio'] = 0
+
+    # 4. Advanced Exclamation Analysis
+    exclamation_count = text.count('!')
+    features['exclamation_count'] = exclamation_count
+    features['exclamation_ratio'] = exclamation_count / max(len(text), 1)
+    features['excessive_exclamation'] = 1 if exclamation_count > 5 else 0
+
+    consecutive_exclamation = len(re.findall(r'!{3,}', text))
+    features['consecutive_exclamation'] = consecutive_exclamation
+
+    if exclamation_count:
+        # Tanda seru yang diikuti karakter selain '.', spasi atau baris baru (satu pass regex, bukan loop per karakter)
+        mid_sentence_exclamations = len(MID_SENTENCE_EXCLAMATION.findall(text))
+        features['mid_sentence_exclamation_ratio'] = mid_sentence_exclamations / exclamation_count
+    else:
+        features['mid_sentence_exclamation_ratio'] = 0
+
+    # 5. Urgency & Time Pressure
+    features['urgency_word_count'] = scan.count('urgency_words')
+    features['has_time_limit'] = 1 if scan.any('time_limit_keywords') else 0
+
+    # 6. Personal Information Request
+    features['personal_info_request'] = 1 if scan.any('personal_info_keywords') else 0
+
+    # 7. Threatening Language
+    features['has_threat'] = 1 if scan.any('threat_keywords') else 0
+
+    # 8. Generic & Personalization Analysis
+    features['has_generic_greeting'] = 1 if scan.any('generic_greetings') else 0
+    features['has_personalization_placeholder'] = 1 if scan.any('personalization_placeholders') else 0
+
+    # 9. Brand Mentions Analysis
+    brand_mentions = scan.hits('brands')
+    features['brand_mention_count'] = len(brand_mentions)
+
+    features['inconsistent_brand_mention'] = 0
+    if brand_mentions:
+        for brand in brand_mentions:
+            if scan.any(f'brand_variations:{brand}'):
+                features['inconsistent_brand_mention'] = 1
+                break
+
+    # 10. Spelling Errors
+    features['spelling_errors_count'] = scan.count('common_misspellings')
+
+    # 11. HTML & Technical Content
+    features['has_html_content'] = 1 if scan.any('html_tags') else 0
+
+    features['has_form_submission'] = 1 if scan.contains('<form') and scan.contains('action=') else 0
+    features['has_javascript'] = 1 if scan.contains('javascript:') or scan.contains('<script') else 0
+    features['has_tracking_pixel'] = 1 if scan.any('tracking_pixels') else 0
+    features['has_unsubscribe_link'] = 1 if scan.contains('unsubscribe') else 0
+
+    # 12. Link Analysis
+    url_pattern = r'https?://[^\s]+'
+    urls = re.findall(url_pattern, text)
+    features['url_count'] = len(urls)
+
+    features['has_misleading_link'] = 0
+
+    for anchor in MISLEADING_ANCHORS:
+        if scan.contains(anchor):
+            anchor_pos = scan.find(anchor)
+            text_after_anchor = text[anchor_pos + len(anchor):anchor_pos + len(anchor) + 100]
+            if re.search(url_pattern, text_after_anchor):
+                features['has_misleading_link'] = 1
+                break
+
+    # 13. Behavioral Analysis
+    features['multiple_redirects'] = 1 if len(urls) > 3 else 0
+    features['shortened_url_only'] = 1 if (
+        bool(re.search(r'\b(bit\.ly|t\.co|goo\.gl)\b', text)) and len(urls) == 1
+    ) else 0
+    features['image_only_text'] = 1 if (
+        len(re.findall(r'\.(jpg|jpeg|png|gif)', scan.lowered)) > 0 and len(text.split()) < 20
+    ) else 0
+
+    # 14. Social Engineering Analysis
+    features['authority_impersonation'] = 1 if scan.any('authority_impersonation') else 0
+    features['scarcity_tactic'] = 1 if scan.any('scarcity_tactics') else 0
+    features['social_proof'] = 1 if scan.any('social_proof') else 0
+
+    # 15. Psychological Triggers
+    features['fear_intensity'] = scan.count('fear_words')
+    features['greed_trigger'] = scan.count('greed_words')
+    features['curiosity_trigger'] = scan.count('curiosity_words')
+
+    # 16. Action Requests
+    features['action_request_count'] = scan.count('action_keywords')
+
+    # 17. Security Claims
+    features['security_claim_count'] = scan.count('security_claims')
+
+    # 18. Attachment Analysis
+    features['has_suspicious_attachment'] = 1 if scan.any('suspicious_attachments') else 0
+
+    # 19. Contact Information
+    features['has_suspicious_contact'] = 1 if scan.any('suspicious_contact') else 0
+
+    # 20. Contextual Analysis
+    features['mentions_recent_events'] = 1 if scan.any('recent_events') else 0
+    features['seasonal_reference'] = 1 if scan.any('seasonal_references') else 0
+
+    # 21. Sender Analysis
+    # <--- PERBAIKAN 1: BUG LOGIKA DI SINI ---
+    # Kode lama: if 'paypal' in text.lower() and 'paypal' not in text.lower():
+    # Ini akan selalu bernilai False. Seharusnya membandingkan konten dengan domain pengirim.
+    # Karena fitur ini lebih tentang analisis pengirim, dan kita sudah punya `advanced_sender_analysis`,
+    # fitur ini mungkin redundan atau butuh konteks sender_email. Untuk sekarang, kita set ke 0.
+    # Atau, jika ingin memeriksa inkonsistensi merek dalam teks saja:
+    mentioned_brands = brand_mentions
+    if len(mentioned_brands) > 1:
+        features['sender_content_mismatch'] = 1 # Jika lebih dari satu merek disebut, bisa jadi mencurigakan
+    else:
+        features['sender_content_mismatch'] = 0
+
+    return features
+
+# Setara pola notebook r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+':
+# '%' sudah termasuk rentang $-_, jadi alternatif digabung menjadi satu kelas karakter
+URL_PATTERN = re.compile(r'http[s]?://[a-zA-Z0-9$-_@.&+!*\\(),]+')
+
+def extract_url_features(text, features=None):
+    urls = URL_PATTERN.findall(text)
+
+    features = {} if features is None else features
+    features['url_count'] = len(urls)
+
+    if urls:
+        features['has_url_masking'] = 1 if any('bit.ly' in url or 'tinyurl' in url for url in urls) else 0
+        features['has_homograph'] = 1 if any(
+            re.search(r'[āàáâãäåæçćčđēėęěğįıñňöőŕřśšşťțůűųźžż]', url)
+            for url in urls
+        ) else 0
+    else:
+        features['has_url_masking'] = 0
+        features['has_homograph'] = 0
+
+    return features
+
+keyword_engine.register('brand_spoofing', [
+    'paypaI', 'arnazon', 'microsft', 'appIe', 'goggle',
+    'faceboook', 'instagrarn'
+])
+
+def extract_brand_features(text, scan=None, features=None):
+    if scan is None:
+        scan = keyword_engine.scan(text)
+    features = {} if features is None else features
+
+    for brand in BRANDS:
+        features[f'has_{brand}'] = 1 if scan.contains(brand) else 0
+
+    features['has_brand_spoofing'] = 1 if scan.any('brand_spoofing') else 0
+
+    return features
+
+def extract_sender_features(sender_email, features=None, reputation=None):
+    """
+    `reputation` opsional (featurizer.reputation.DomainReputation): daftar lokal
+    melengkapi daftar inline dan tanggal registrasi menggantikan umur simulasi.
+    Model dilatih dengan umur simulasi (30/365/3650), jadi umur sebenarnya
+    sebaiknya diikuti retraining.
+    """
+    features = {} if features is None else features
+
+    if '@' not in sender_email:
+        features['sender_domain'] = 'unknown'
+        features['is_free_email'] = 0
+        features['is_legitimate_domain'] = 0
+        features['is_new_domain'] = 0
+        features['domain_age_days'] = -1
+        if reputation is not None:
+            features['sender_reputation'] = 'unknown'
+        return features
+
+    # Ekstrak domain
+    domain = sender_email.split('@')[-1].lower().strip()
+    features['sender_domain'] = domain
+
+    # Cek apakah domain adalah email gratis
+    free_email_domains = ['gmail.com', 'yahoo.com', 'hotmail.com', 'outlook.com',
+                         'aol.com', 'icloud.com', 'protonmail.com', 'zoho.com']
+    features['is_free_email'] = 1 if domain in free_email_domains else 0
+
+    # Daftar domain resmi perusahaan besar (bisa diperluas)
+    legitimate_domains = [
+        'paypal.com', 'amazon.com', 'microsoft.com', 'apple.com', 'google.com',
+        'facebook.com', 'instagram.com', 'twitter.com', 'linkedin.com',
+        'ebay.com', 'netflix.com', 'spotify.com', 'adobe.com',
+        'dropbox.com', 'slack.com', 'zoom.us', 'salesforce.com'
+    ]
+    features['is_legitimate_domain'] = 1 if domain in legitimate_domains else 0
+
+    # Deteksi domain yang baru dibuat (kurang dari 6 bulan)
+    new_domain_indicators = [
+        '.tk', '.ml', '.ga', '.cf', '.gq',  # TLD gratis yang sering disalahgunakan
+        '-shop', '-store', '-service', '-secure',  # Kata kunci domain mencurigakan
+        'shop-', 'store-', 'service-', 'secure-'
+    ]
+    features['is_new_domain'] = 1 if (
+        any(tld in domain for tld in ['.tk', '.ml', '.ga', '.cf', '.gq']) or
+        any(indicator in domain for indicator in new_domain_indicators)
+    ) else 0
+
+    info = reputation.lookup(domain) if reputation is not None else None
+    if info is not None:
+        features['is_free_email'] |= int(info.free)
+        features['is_legitimate_domain'] |= int(info.good and not info.bad)
+        features['is_new_domain'] |= int(info.new())
+
+    # Simulasi umur domain (dalam hari)
+    age = info.age_days() if info is not None else None
+    if age is not None:
+        features['domain_age_days'] = age
+    elif features['is_new_domain']:
+        features['domain_age_days'] = 30  # Simulasi domain baru (30 hari)
+    elif features['is_legitimate_domain']:
+        features['domain_age_days'] = 3650  # Simulasi domain lama (10 tahun)
+    else:
+        features['domain_age_days'] = 365  # Simulasi domain menengah (1 tahun)
+
+    if reputation is not None:
+        features['sender_reputation'] = reputation_label(info)
+    return features
+
+def reputation_label(info):
+    """'bad' / 'good' / 'new' / 'listed' (hanya free atau tanggal) atau 'unknown' untuk DomainInfo."""
+    if info is None:
+        return 'unknown'
+    if info.bad:
+        return 'bad'
+    if info.good:
+        return 'good'
+    if info.new():
+        return 'new'
+    return 'listed'
+
+# Daftar ekstensi file yang mencurigakan
+EXTENSION_CATEGORIES = {
+    # Eksekusi
+    'executable': ['.exe', '.scr', '.bat', '.com', '.pif', '.cmd', '.msi', '.jar'],
+    # Script
+    'script': ['.js', '.vbs', '.ps1', '.py', '.pl', '.rb', '.php', '.asp', '.jsp'],
+    # Macro
+    'macro': ['.docm', '.xlsm', '.pptm', '.dotm', '.xltm', '.potm'],
+    # Arsip
+    'archive': ['.zip', '.rar', '.7z', '.tar', '.gz', '.bz2'],
+    # Sistem
+    'system': ['.dll', '.sys', '.drv', '.ocx', '.cpl', '.deb', '.rpm'],
+    # Lainnya
+    'other': ['.reg', '.inf', '.iso', '.dmg', '.app', '.apk', '.deb']
+}
+for category, extensions in EXTENSION_CATEGORIES.items():
+    keyword_engine.register(f'extensions:{category}', extensions)
+keyword_engine.register('high_risk_extensions', ['.exe', '.scr', '.bat', '.js', '.docm', '.xlsm'])
+
+def extract_file_extension_features(text, scan=None, features=None):
+    if scan is None:
+        scan = keyword_engine.scan(text)
+    features = {} if features is None else features
+
+    # Deteksi ekstensi file dalam teks
+    detected_extensions = []
+    for category in EXTENSION_CATEGORIES:
+        detected_extensions.extend(scan.hits(f'extensions:{category}'))
+
+    # Fitur dasar
+    features['has_suspicious_extension'] = 1 if detected_extensions else 0
+    features['suspicious_extension_count'] = len(detected_extensions)
+
+    # Fitur kategori
+    for category in EXTENSION_CATEGORIES:
+        features[f'has_{category}_extension'] = 1 if scan.any(f'extensions:{category}') else 0
+
+    # Fitur tingkat bahaya
+    features['has_high_risk_extension'] = 1 if scan.any('high_risk_extensions') else 0
+
+    # Deteksi multiple ekstensi (misal: file.exe.zip)
+    multiple_ext_pattern = r'\.\w+\.\w+'
+    features['has_multiple_extensions'] = 1 if re.search(multiple_ext_pattern, scan.lowered) else 0
+
+    # Deteksi ekstensi tersembunyi (misal: file.jpg.exe)
+    hidden_ext_pattern = r'\.(jpg|jpeg|png|gif|pdf|txt|doc|xls)\.(exe|scr|bat|js)'
+    features['has_hidden_extension'] = 1 if re.search(hidden_ext_pattern, scan.lowered) else 0
+
+    # Deteksi ekstensi yang disamarkan
+    disguised_ext_patterns = [
+        r'\.ex[e3]',  # exe, ex3
+        r'\.sc[r7]',  # scr, sc7
+        r'\.ba[t2]',  # bat, ba2
+        r'\.js[a-z0-9]'  # jsa, js1, js2, dll.
+    ]
+    features['has_disguised_extension'] = 1 if any(re.search(pattern, scan.lowered) for pattern in disguised_ext_patterns) else 0
+
+    return features
+
+keyword_engine.register('competitor_brands', [
+    'paypal', 'amazon', 'microsoft', 'apple', 'google',
+    'facebook', 'twitter', 'linkedin'
+])
+IMPERSONATION_KEYWORDS = keyword_engine.register('impersonation_keywords', [
+    'security team', 'support team', 'customer service', 'billing department',
+    'account department', 'verification team', 'fraud department'
+])
+
+def advanced_sender_analysis(sender_email, text_content, scan=None, features=None, reputation=None):
+    if scan is None:
+        scan = keyword_engine.scan(text_content)
+    features = {} if features is None else features
+    legitimate_domains = [
+        'paypal.com', 'amazon.com', 'microsoft.com', 'apple.com', 'google.com',
+        'facebook.com', 'instagram.com', 'twitter.com', 'linkedin.com',
+        'ebay.com', 'netflix.com', 'spotify.com', 'adobe.com',
+        'dropbox.com', 'slack.com', 'zoom.us', 'salesforce.com'
+    ]
+
+    # Deteksi ketidaksesuaian antara pengirim dan konten
+    brand_sender_mapping = {
+        'paypal.com': ['paypal', 'ebay'],
+        'amazon.com': ['amazon', 'aws'],
+        'microsoft.com': ['microsoft', 'windows', 'office', 'outlook'],
+        'apple.com': ['apple', 'icloud', 'itunes', 'iphone'],
+        'google.com': ['google', 'gmail', 'youtube', 'android'],
+        'facebook.com': ['facebook', 'instagram', 'whatsapp'],
+        'twitter.com': ['twitter', 'tweet'],
+        'linkedin.com': ['linkedin']
+    }
+
+    # Ekstrak domain pengirim
+    if '@' in sender_email:
+        sender_domain = sender_email.split('@')[-1].lower()
+
+        # Cek apakah konten menyebut merek yang tidak sesuai dengan domain
+        features['sender_content_mismatch'] = 0
+        for domain, brands in brand_sender_mapping.items():
+            if sender_domain == domain:
+                # Cek apakah ada merek pesaing yang disebut
+                for brand in scan.hits('competitor_brands'):
+                    if brand not in brands:
+                        features['sender_content_mismatch'] = 1
+                        break
+                if features['sender_content_mismatch'] == 1:
+                    break
+        
+        # Deteksi impersonation (pengirim mengaku sebagai perusahaan lain)
+        features['sender_impersonation'] = 0
+        # Domain dikenal baik di indeks reputasi (opsional) diperlakukan seperti domain resmi
+        trusted = sender_domain in legitimate_domains
+        if not trusted and reputation is not None and any(scan.contains(keyword) for keyword in IMPERSONATION_KEYWORDS):
+            info = reputation.lookup(sender_domain)
+            trusted = info is not None and info.good and not info.bad
+        for keyword in IMPERSONATION_KEYWORDS:
+            if scan.contains(keyword) and not trusted:
+                features['sender_impersonation'] = 1
+                break
+    else:
+        features['sender_content_mismatch'] = 0
+        features['sender_impersonation'] = 0
+
+    return features
+
+# Daftar untuk extract_email_security_features
+keyword_engine.register('excessive_security_claims', [
+    '100% secure', 'completely safe', 'guaranteed secure',
+    'bank-level security', 'military-grade encryption',
+    'end-to-end encrypted', 'ssl secured', 'https secured'
+])
+keyword_engine.register('verification_requests', [
+    'verify your account', 'verify your identity', 'verify now',
+    'confirm your account', 'confirm your identity', 'confirm now',
+    'validate your account', 'validate your identity'
+])
+keyword_engine.register('sensitive_info_requests', [
+    'provide your password', 'enter your pin', 'input your cvv',
+    'send your card number', 'share your ssn', 'disclose your account details'
+])
+keyword_engine.register('account_threats', [
+    'account will be suspended', 'account will be closed',
+    'account will be terminated', 'account will be blocked',
+    'your account is at risk', 'your account has been compromised'
+])
+keyword_engine.register('attachment_markers', ['attached file'])
+keyword_engine.compile()
+
+def extract_email_security_features(text, scan=None, features=None):
+    if scan is None:
+        scan = keyword_engine.scan(text)
+    features = {} if features is None else features
+
+    # Deteksi klaim keamanan berlebihan
+    features['excessive_security_claims'] = scan.count('excessive_security_claims')
+
+    # Deteksi permintaan verifikasi yang mencurigakan
+    features['suspicious_verification_request'] = scan.count('verification_requests')
+
+    # Deteksi permintaan informasi sensitif
+    features['sensitive_info_request'] = scan.count('sensitive_info_requests')
+
+    # Deteksi ancaman akun
+    features['account_threat_count'] = scan.count('account_threats')
+
+    return features
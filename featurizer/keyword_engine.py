@@ -0,0 +1,111 @@
+import re
+
+
+class KeywordScan:
+    """Hasil satu kali pemindaian teks terhadap semua daftar kata kunci."""
+
+    __slots__ = ('lowered', 'found', '_lists')
+
+    def __init__(self, lowered, found, lists):
+        self.lowered = lowered
+        self.found = found
+        self._lists = lists
+
+    def contains(self, keyword):
+        # Sama dengan `keyword in text.lower()`
+        return keyword in self.found
+
+    def hits(self, name):
+        # Urutan dan duplikat mengikuti daftar yang didaftarkan
+        return [kw for kw in self._lists[name] if kw in self.found]
+
+    def count(self, name):
+        return sum(1 for kw in self._lists[name] if kw in self.found)
+
+    def any(self, name):
+        return any(kw in self.found for kw in self._lists[name])
+
+    def find(self, keyword):
+        # Sama dengan `text.lower().find(keyword)`
+        return self.lowered.find(keyword) if keyword in self.found else -1
+
+
+class KeywordEngine:
+    """
+    Pencocok multi-pola untuk semua daftar kata kunci fitur.
+
+    Semua kata kunci dikompilasi menjadi satu trie di dalam satu regex,
+    sehingga setiap email cukup di-lowercase sekali dan dipindai satu kali
+    secara linear oleh mesin regex (C). Di setiap posisi regex mengembalikan
+    kata kunci terpanjang yang cocok; kata kunci lain yang cocok di posisi
+    yang sama pasti merupakan prefiksnya, jadi ditambahkan dari tabel prefiks.
+    """
+
+    def __init__(self):
+        self._lists = {}
+        self._pattern = None
+        self._prefixes = {}
+
+    def register(self, name, keywords):
+        if name in self._lists:
+            raise ValueError(f"Daftar kata kunci '{name}' sudah terdaftar")
+        self._lists[name] = tuple(keywords)
+        self._pattern = None
+        return self._lists[name]
+
+    def keywords(self, name):
+        return self._lists[name]
+
+    def compile(self):
+        # Kata kunci dengan huruf kapital tidak pernah cocok dengan teks
+        # yang sudah di-lowercase, jadi tidak perlu masuk ke trie
+        literals = sorted({
+            kw for keywords in self._lists.values() for kw in keywords
+            if kw and kw == kw.lower()
+        })
+
+        trie = {}
+        for literal in literals:
+            node = trie
+            for char in literal:
+                node = node.setdefault(char, {})
+            node[''] = True
+
+        self._prefixes = {
+            literal: [literal[:i] for i in range(1, len(literal) + 1) if literal[:i] in literals]
+            for literal in literals
+        }
+        # Lookahead agar kecocokan yang tumpang tindih tetap ditemukan
+        self._pattern = re.compile('(?=(' + _trie_to_regex(trie) + '))') if literals else None
+        return self
+
+    def scan(self, text):
+        if self._pattern is None and self._lists:
+            self.compile()
+
+        lowered = text.lower()
+        found = set()
+        if self._pattern is not None:
+            for longest in set(self._pattern.findall(lowered)):
+                found.update(self._prefixes[longest])
+
+        return KeywordScan(lowered, found, self._lists)
+
+    def scan_naive(self, text):
+        # Pemindaian per kata kunci seperti kode lama, untuk verifikasi dan benchmark
+        found = {
+            kw for keywords in self._lists.values() for kw in keywords
+            if kw in text.lower()
+        }
+        return KeywordScan(text.lower(), found, self._lists)
+
+
+def _trie_to_regex(node):
+    alternatives = [re.escape(char) + _trie_to_regex(child)
+                    for char, child in sorted(node.items()) if char != '']
+    if not alternatives:
+        return ''
+
+    pattern = '(?:' + '|'.join(alternatives) + ')'
+    # Quantifier greedy: cabang yang lebih panjang dicoba lebih dulu
+    return pattern + '?' if '' in node else pattern
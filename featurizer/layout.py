@@ -0,0 +1,76 @@
+import numpy as np
+
+
+class FeatureLayout:
+    """Urutan kolom fitur numerik yang tetap, diambil dari numeric_features.pkl."""
+
+    def __init__(self, names):
+        self.names = list(names)
+        self.index = {name: i for i, name in enumerate(self.names)}
+
+    def __len__(self):
+        return len(self.names)
+
+    def empty_row(self):
+        return np.zeros(len(self.names), dtype=np.float32)
+
+    def empty_matrix(self, n_rows):
+        return np.zeros((n_rows, len(self.names)), dtype=np.float32)
+
+
+def _to_python(value):
+    # Nilai float32 dikembalikan ke int/float Python agar format penjelasan tetap sama
+    value = float(value)
+    return int(value) if value.is_integer() else value
+
+
+class FeatureRow:
+    """
+    Tampilan seperti dict di atas satu baris float32.
+
+    Fitur yang ada di layout ditulis langsung ke array; fitur lain
+    (misalnya sender_domain atau is_weekend) disimpan di `extras`.
+    Nilai float yang berubah jika dibulatkan ke float32 (mis. rasio 1/5)
+    juga disimpan persis di `extras`, sehingga ambang di penjelasan
+    (capital_word_ratio > 0.2) membaca nilai yang sama seperti dict lama;
+    model tetap menerima nilai float32.
+    """
+
+    __slots__ = ('layout', 'values', 'extras')
+
+    def __init__(self, layout, values=None, extras=None):
+        self.layout = layout
+        self.values = layout.empty_row() if values is None else values
+        self.extras = {} if extras is None else extras
+
+    def __setitem__(self, name, value):
+        i = self.layout.index.get(name)
+        if i is None:
+            self.extras[name] = value
+            return
+        self.values[i] = value
+        if isinstance(value, float) and float(self.values[i]) != value:
+            self.extras[name] = value
+        elif name in self.extras:
+            # Penulisan terakhir menang: buang nilai persis yang lama
+            del self.extras[name]
+
+    def __getitem__(self, name):
+        i = self.layout.index.get(name)
+        if i is None or name in self.extras:
+            return self.extras[name]
+        return _to_python(self.values[i])
+
+    def __contains__(self, name):
+        return name in self.layout.index or name in self.extras
+
+    def get(self, name, default=None):
+        try:
+            return self[name]
+        except KeyError:
+            return default
+
+    def to_dict(self):
+        features = {name: _to_python(value) for name, value in zip(self.layout.names, self.values)}
+        features.update(self.extras)
+        return features
@@ -0,0 +1,202 @@
+from datetime import datetime
+
+import numpy as np
+from scipy.sparse import csr_matrix, hstack, vstack
+
+from .extractors import (
+    keyword_engine,
+    extract_phishing_features,
+    extract_url_features,
+    extract_brand_features,
+    extract_sender_features,
+    extract_file_extension_features,
+    advanced_sender_analysis,
+    extract_email_security_features,
+)
+from .bounds import ScanLimits
+from .layout import FeatureLayout, FeatureRow
+from .preprocess import preprocess_words
+from .timing import NULL_TIMER, StageTimer
+from .vectorizer import TokenVectorizer
+
+
+# Rentang pd.Timestamp (ns): di notebook tanggal di luar rentang ini menjadi NaT
+_MIN_DATE = datetime(1677, 9, 22)
+_MAX_DATE = datetime(2262, 4, 11)
+
+
+def parse_extracted_date(extracted_date):
+    """
+    Setara pd.to_datetime(extracted_date, format='%a %b %d %Y', errors='coerce'),
+    tanpa import pandas; None untuk NaT.
+    """
+    try:
+        parsed_date = datetime.strptime(extracted_date, '%a %b %d %Y')
+    except ValueError:
+        return None
+    if not _MIN_DATE <= parsed_date <= _MAX_DATE:
+        return None
+    return parsed_date
+
+
+def add_date_features(extracted_date, features):
+    # Handle date features
+    parsed_date = parse_extracted_date(extracted_date)
+    features['is_weekend'] = int(parsed_date.weekday() >= 5) if parsed_date is not None else 0
+    # Tanggal tidak terbaca: -1, sama dengan fillna(-1) di notebook training
+    features['hour_sent'] = parsed_date.hour if parsed_date is not None else -1
+
+
+class FeatureBatch:
+    """Hasil featurization N email: TF-IDF sparse, matriks numerik (N, F) float32 dan metadata."""
+
+    __slots__ = ('tfidf', 'numeric', 'meta', 'timings')
+
+    def __init__(self, tfidf, numeric, meta, timings=None):
+        self.tfidf = tfidf
+        self.numeric = numeric
+        # meta per email: (extracted_date, extracted_sender, extras)
+        self.meta = meta
+        # Durasi per tahap (detik, dijumlah untuk seluruh batch) atau None jika tidak diukur
+        self.timings = timings
+
+    def __len__(self):
+        return len(self.meta)
+
+
+class Featurizer:
+    """
+    Pipeline fitur bersama untuk app.py, confirm_csv.py dan benchmark.
+
+    Fitur numerik ditulis langsung ke baris float32 dengan urutan kolom dari
+    numeric_features.pkl, tanpa dict -> DataFrame -> csr_matrix per request.
+    Email yang melebihi `limits` dipangkas dulu (lihat featurizer.bounds);
+    fitur `input_truncated` (di extras) menandai email yang dipangkas.
+    TF-IDF dihitung lewat TokenVectorizer (lihat featurizer.vectorizer).
+    `stop_words` opsional (stopword bundle model); None memakai stopword global.
+    `reputation` opsional (featurizer.reputation.DomainReputation) untuk fitur pengirim.
+    """
+
+    def __init__(self, tfidf, numeric_features, limits=None, stop_words=None, reputation=None):
+        self.tfidf = tfidf
+        self.vectorizer = TokenVectorizer(tfidf)
+        self.layout = FeatureLayout(numeric_features)
+        self.limits = ScanLimits() if limits is None else limits
+        self.stop_words = frozenset(stop_words) if stop_words is not None else None
+        self.reputation = reputation
+
+    def clean_words(self, email_content):
+        """
+        Hanya pemangkasan + preprocessing, tanpa ekstraksi fitur (mis. untuk indeks kampanye).
+        Kembalikan (teks yang dipindai, words, extracted_date, extracted_sender, truncated).
+        """
+        email_content, truncated = self.limits.apply(email_content)
+        words, extracted_date, extracted_sender = preprocess_words(email_content, self.stop_words)
+        return email_content, words, extracted_date, extracted_sender, truncated
+
+    def featurize_into(self, email_content, row, timer=NULL_TIMER, headers=None):
+        """
+        Isi `row` (float32, panjang F) untuk satu email; kembalikan teks bersih dan metadata.
+
+        `headers` opsional (extracted_date, extracted_sender) dari header email
+        yang sudah di-parse; nilai kosong diganti hasil regex dari teks.
+        """
+        features = FeatureRow(self.layout, row)
+        email_content, truncated = self.limits.apply(email_content)
+        features['input_truncated'] = int(truncated)
+
+        # Preprocess the email
+        words, extracted_date, extracted_sender = preprocess_words(email_content, self.stop_words)
+        cleaned_text = ' '.join(words)
+        if headers is not None:
+            extracted_date = headers[0] or extracted_date
+            extracted_sender = headers[1] or extracted_sender
+        timer.mark('preprocess')
+
+        # Urutan sama dengan penggabungan dict sebelumnya: penulisan terakhir menang
+        scan = keyword_engine.scan(email_content)
+        timer.mark('keyword_scan')
+        extract_phishing_features(email_content, scan, features)
+        timer.mark('extract_phishing_features')
+        extract_url_features(email_content, features)
+        timer.mark('extract_url_features')
+        extract_brand_features(email_content, scan, features)
+        timer.mark('extract_brand_features')
+        extract_sender_features(extracted_sender, features, self.reputation)
+        timer.mark('extract_sender_features')
+        extract_file_extension_features(email_content, scan, features)
+        timer.mark('extract_file_extension_features')
+        advanced_sender_analysis(extracted_sender, email_content, scan, features, self.reputation)
+        timer.mark('advanced_sender_analysis')
+        extract_email_security_features(email_content, scan, features)
+        timer.mark('extract_email_security_features')
+
+        # Add text length feature
+        features['text_length'] = len(words)
+        features['has_attachment'] = 1 if scan.contains('attached file') else 0
+
+        add_date_features(extracted_date, features)
+        timer.mark('assembly')
+
+        return cleaned_text, extracted_date, extracted_sender, features.extras
+
+    def featurize(self, email_content):
+        row = self.layout.empty_row()
+        cleaned_text, extracted_date, extracted_sender, extras = self.featurize_into(email_content, row)
+        return row, cleaned_text, (extracted_date, extracted_sender, extras)
+
+    def featurize_batch(self, email_contents, timed=False, headers=None):
+        """
+        Featurize N email ke satu matriks (N, F) dan satu transform TF-IDF.
+
+        `headers` opsional: list (extracted_date, extracted_sender) per email
+        (lihat featurize_into).
+
+        Dengan timed=True durasi tiap tahap ikut dikembalikan di batch.timings,
+        juga ketika batch dihitung di worker ParallelFeaturizer.
+        """
+        timer = StageTimer() if timed else NULL_TIMER
+        numeric = self.layout.empty_matrix(len(email_contents))
+        cleaned_texts = []
+        meta = []
+        for i, email_content in enumerate(email_contents):
+            cleaned_text, extracted_date, extracted_sender, extras = self.featurize_into(
+                email_content, numeric[i], timer, headers[i] if headers is not None else None)
+            cleaned_texts.append(cleaned_text)
+            meta.append((extracted_date, extracted_sender, extras))
+
+        timer.restart()
+        X_tfidf = self.vectorizer.transform(cleaned_texts) if cleaned_texts else csr_matrix((0, len(self.tfidf.vocabulary_)))
+        timer.mark('tfidf_transform')
+        return FeatureBatch(X_tfidf, numeric, meta, timer.totals)
+
+    def features_view(self, numeric_row, extras):
+        """Akses fitur berdasarkan nama (untuk penjelasan) tanpa membangun dict."""
+        return FeatureRow(self.layout, numeric_row, extras)
+
+
+def _merge_timings(timings):
+    merged = None
+    for totals in timings:
+        if totals is not None:
+            merged = {} if merged is None else merged
+            for stage, seconds in totals.items():
+                merged[stage] = merged.get(stage, 0.0) + seconds
+    return merged
+
+
+def combine_batches(batches):
+    """Gabungkan satu atau beberapa FeatureBatch menjadi input model (CSR) dan satu FeatureBatch."""
+    if len(batches) == 1:
+        batch = batches[0]
+    else:
+        batch = FeatureBatch(
+            vstack([b.tfidf for b in batches]).tocsr(),
+            np.vstack([b.numeric for b in batches]),
+            [item for b in batches for item in b.meta],
+            _merge_timings(b.timings for b in batches)
+        )
+
+    # Nilai nol tidak disimpan di CSR, sama seperti saat training (dianggap missing oleh XGBoost)
+    X_combined = hstack([batch.tfidf, csr_matrix(batch.numeric)]).tocsr()
+    return X_combined, batch
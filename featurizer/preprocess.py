@@ -0,0 +1,135 @@
+import re
+
+# Stopword bahasa Inggris NLTK, dimuat sekali: dari bundle model (set_stop_words)
+# atau, jika tidak ada bundle, dari korpus NLTK lokal saat pertama dipakai
+_stop_words = None
+
+
+def set_stop_words(words):
+    global _stop_words
+    _stop_words = frozenset(words)
+
+
+def get_stop_words():
+    if _stop_words is None:
+        set_stop_words(load_nltk_stop_words())
+    return _stop_words
+
+
+def load_nltk_stop_words():
+    # Import nltk mahal (ikut memuat scipy.stats), jadi hanya di jalur ini
+    import nltk
+    from nltk.corpus import stopwords
+
+    try:
+        return stopwords.words('english')
+    except LookupError:
+        # Korpus belum ada di mesin ini: unduh sekali (butuh jaringan)
+        nltk.download('stopwords', quiet=True)
+        return stopwords.words('english')
+
+
+DATE_PATTERN = re.compile(r'\w{3}\s\w{3}\s\d{1,2}\s\d{4}')
+SENDER_PATTERN = re.compile(r'[\w\.-]+@[\w\.-]+\.\w+')
+ATTACHMENT_PATTERN = re.compile(r'see attached file', re.IGNORECASE)
+SPECIAL_CHARS_PATTERN = re.compile(r'[^\w\s\.\!\?]')
+# Run maksimal karakter [\w.-]; bagian lokal alamat selalu satu run yang diakhiri '@'
+_SENDER_RUN = re.compile(r'[\w.-]+')
+
+
+def _iter_senders(text, pos=0):
+    """
+    Kecocokan SENDER_PATTERN yang tidak tumpang tindih mulai `pos`, sama
+    dengan finditer tetapi linear.
+
+    re.search mencoba setiap posisi awal; di dalam run [\w.-] panjang tanpa
+    '@' setiap percobaan memindai sampai ujung run, jadi kuadratik. Kecocokan
+    paling kiri selalu dimulai di awal run (atau di `pos`) yang langsung
+    diikuti '@', jadi cukup mencoba setiap '@'. Awal run dicari mundur dari
+    '@' dengan mencocokkan _SENDER_RUN pada teks terbalik.
+    """
+    at = text.find('@', pos)
+    if at == -1:
+        return
+    reversed_text = text[::-1]
+    while at != -1:
+        # Karakter text[at - 1] ada di reversed_text[len(text) - at]
+        local = _SENDER_RUN.match(reversed_text, len(text) - at)
+        if local is not None:
+            start = max(pos, at - (local.end() - local.start()))
+            match = SENDER_PATTERN.match(text, start) if start < at else None
+            if match is not None:
+                yield match
+                pos = match.end()
+                at = text.find('@', pos)
+                continue
+        at = text.find('@', at + 1)
+
+
+def find_sender(text, pos=0):
+    """Sama dengan SENDER_PATTERN.search(text, pos), tetapi linear."""
+    return next(_iter_senders(text, pos), None)
+
+
+def remove_senders(text):
+    """Sama dengan SENDER_PATTERN.sub('', text), dengan _iter_senders."""
+    parts = []
+    last = 0
+    for match in _iter_senders(text):
+        parts.append(text[last:match.start()])
+        last = match.end()
+    if not parts:
+        return text
+    parts.append(text[last:])
+    return ''.join(parts)
+
+
+def preprocess_words(text, stop_words=None):
+    """
+    Preprocessing notebook dalam satu lintasan; kembalikan (words, extracted_date, extracted_sender).
+
+    `words` adalah kata-kata cleaned_text (' '.join(words) identik dengan
+    enhanced_preprocess_combined_text), sehingga pemanggil tidak perlu
+    memecah ulang teks. Setiap langkah yang pasti tidak mengubah teks dilewati.
+    `stop_words` (frozenset) menggantikan stopword global, mis. milik versi
+    model tertentu saat beberapa versi dimuat bersamaan.
+    """
+    # Ekstraksi tanggal; sub dilanjutkan dari kecocokan pertama (pola tanpa lookaround)
+    date_match = DATE_PATTERN.search(text)
+    extracted_date = date_match.group(0) if date_match else ""
+
+    # Ekstraksi pengirim
+    sender_match = find_sender(text)
+    extracted_sender = sender_match.group(0) if sender_match else ""
+
+    # Bersihkan teks dengan penanganan khusus untuk phishing
+    if date_match is not None:
+        clean_text = text[:date_match.start()] + DATE_PATTERN.sub('', text[date_match.end():])
+    else:
+        clean_text = text
+    clean_text = remove_senders(clean_text)
+
+    # Normalisasi karakter evasi. Notebook juga mengganti 'â€œ' dan 'â€˜', tetapi
+    # keduanya diawali 'â€' sehingga tidak pernah tersisa setelah penggantian ini
+    if 'â€' in clean_text:
+        clean_text = clean_text.replace('â€', "'")
+
+    # Hapus pola attachment. Dengan IGNORECASE huruf 'ached' hanya cocok dengan
+    # huruf ASCII-nya, jadi tanpa 'ached' di teks lowercase tidak ada kecocokan
+    if 'ached' in clean_text.lower():
+        clean_text = ATTACHMENT_PATTERN.sub('', clean_text)
+
+    # Hapus karakter khusus tapi pertahankan tanda baca penting, lalu lowercase
+    clean_text = SPECIAL_CHARS_PATTERN.sub('', clean_text).lower()
+
+    # Hapus stopwords
+    if stop_words is None:
+        stop_words = get_stop_words()
+    words = [word for word in clean_text.split() if word not in stop_words]
+
+    return words, extracted_date, extracted_sender
+
+
+def enhanced_preprocess_combined_text(text):
+    words, extracted_date, extracted_sender = preprocess_words(text)
+    return ' '.join(words), extracted_date, extracted_sender
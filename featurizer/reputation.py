@@ -0,0 +1,191 @@
+"""
+Indeks reputasi domain di disk, dibaca lewat memory map.
+
+Daftar domain (dikenal baik, dikenal buruk, baru terdaftar, email gratis)
+plus tanggal registrasi disimpan sebagai tiga array sejajar yang diurutkan
+menurut hash 64-bit domain:
+
+    keys.npy        uint64, hash blake2b-8 domain (huruf kecil), terurut
+    flags.npy       uint8, gabungan bit FLAG_*
+    registered.npy  int32, tanggal registrasi (hari sejak 1970-01-01), -1 jika tidak diketahui
+    meta.json       jumlah entri per kategori dan waktu build
+
+Lookup = satu np.searchsorted (O(log n)) untuk domain dan semua domain
+induknya; entri paling spesifik yang menang, jadi 'mail.paypal.com' memakai
+entri 'paypal.com' kecuali subdomain itu punya entri sendiri. Array dibuka
+dengan mmap_mode='r': halaman dibaca dari page cache sesuai kebutuhan dan
+dipakai bersama oleh semua worker, tanpa salinan di heap tiap proses.
+Tabrakan hash 64-bit diabaikan (peluang ~3e-6 untuk 10 juta domain).
+
+Dibuat dengan: python domain_reputation.py build --good good.txt --bad bad.csv --output reputasi/
+"""
+import hashlib
+import json
+import os
+import time
+from array import array
+from datetime import date
+
+import numpy as np
+
+FLAG_GOOD = 1
+FLAG_BAD = 2
+FLAG_NEW = 4
+FLAG_FREE = 8
+FLAGS = {'good': FLAG_GOOD, 'bad': FLAG_BAD, 'new': FLAG_NEW, 'free': FLAG_FREE}
+
+UNKNOWN_DATE = -1
+_EPOCH = date(1970, 1, 1).toordinal()
+
+# Domain yang terdaftar kurang dari ini (hari) dianggap domain baru
+NEW_DOMAIN_DAYS = 180
+
+
+def domain_hash(domain):
+    return int.from_bytes(hashlib.blake2b(domain.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def date_to_days(value):
+    """'YYYY-MM-DD' (atau awalan ISO yang lebih panjang) -> hari sejak 1970-01-01; UNKNOWN_DATE jika kosong/tidak valid."""
+    try:
+        return date.fromisoformat(value.strip()[:10]).toordinal() - _EPOCH
+    except (AttributeError, ValueError):
+        return UNKNOWN_DATE
+
+
+def normalize_domain(domain):
+    """Huruf kecil, tanpa awalan '@' / '*.' / 'www.' dan titik di ujung."""
+    domain = domain.strip().lower().rstrip('.')
+    for prefix in ('@', '*.', 'www.'):
+        if domain.startswith(prefix):
+            domain = domain[len(prefix):]
+    return domain
+
+
+class DomainInfo:
+    """Hasil lookup: entri yang cocok (domain itu sendiri atau induknya)."""
+
+    __slots__ = ('domain', 'flags', 'registered')
+
+    def __init__(self, domain, flags, registered):
+        self.domain = domain
+        self.flags = flags
+        self.registered = registered
+
+    @property
+    def good(self):
+        return bool(self.flags & FLAG_GOOD)
+
+    @property
+    def bad(self):
+        return bool(self.flags & FLAG_BAD)
+
+    @property
+    def free(self):
+        return bool(self.flags & FLAG_FREE)
+
+    def age_days(self, today=None):
+        """Umur domain dalam hari, None jika tanggal registrasi tidak diketahui."""
+        if self.registered == UNKNOWN_DATE:
+            return None
+        today = date.today().toordinal() - _EPOCH if today is None else today
+        return max(today - self.registered, 0)
+
+    def new(self, today=None):
+        if self.flags & FLAG_NEW:
+            return True
+        age = self.age_days(today)
+        return age is not None and age < NEW_DOMAIN_DAYS
+
+
+class DomainReputation:
+    """Indeks read-only di atas array memory-mapped; aman dipakai bersama antar thread dan proses."""
+
+    def __init__(self, path):
+        self.path = path
+        # np.asarray: ndarray biasa di atas buffer memory map, tanpa overhead subclass np.memmap per operasi
+        self.keys = np.asarray(np.load(os.path.join(path, 'keys.npy'), mmap_mode='r'))
+        self.flags = np.asarray(np.load(os.path.join(path, 'flags.npy'), mmap_mode='r'))
+        self.registered = np.asarray(np.load(os.path.join(path, 'registered.npy'), mmap_mode='r'))
+        with open(os.path.join(path, 'meta.json'), encoding='utf-8') as f:
+            self.meta = json.load(f)
+        if not len(self.keys) == len(self.flags) == len(self.registered):
+            raise ValueError(f"Indeks reputasi {path} rusak: panjang array tidak sama")
+
+    def __reduce__(self):
+        # Dikirim ke worker proses sebagai path; worker membuka memory map sendiri
+        return DomainReputation, (self.path,)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def lookup(self, domain):
+        """DomainInfo untuk entri paling spesifik yang cocok dengan `domain` atau induknya, atau None."""
+        domain = normalize_domain(domain)
+        candidates = []
+        while domain:
+            candidates.append(domain)
+            domain = domain.partition('.')[2]
+        if not candidates or not len(self.keys):
+            return None
+        hashes = np.fromiter((domain_hash(candidate) for candidate in candidates), dtype=np.uint64,
+                             count=len(candidates))
+        positions = np.searchsorted(self.keys, hashes)
+        np.minimum(positions, len(self.keys) - 1, out=positions)
+        hits = np.flatnonzero(self.keys[positions] == hashes)
+        if not len(hits):
+            return None
+        i = hits[0]
+        position = positions[i]
+        return DomainInfo(candidates[i], int(self.flags[position]), int(self.registered[position]))
+
+    def stats(self):
+        return dict(self.meta, path=self.path, entries=len(self))
+
+
+def build_reputation_index(entries, path):
+    """
+    Tulis indeks dari iterable (domain, flags, registered_days). Domain yang
+    muncul berkali-kali digabung: flag di-OR, tanggal registrasi yang paling awal dipakai.
+    """
+    # array.array: 8 + 1 + 8 byte per entri selama build, bukan objek int Python
+    keys = array('Q')
+    flags = array('B')
+    registered = array('q')
+    counts = dict.fromkeys(FLAGS, 0)
+    for domain, flag, days in entries:
+        domain = normalize_domain(domain)
+        if not domain:
+            continue
+        keys.append(domain_hash(domain))
+        flags.append(flag)
+        registered.append(days)
+    keys = np.frombuffer(keys, dtype=np.uint64)
+    flags = np.frombuffer(flags, dtype=np.uint8)
+    # Tanggal tidak diketahui diurutkan paling akhir agar minimum memilih tanggal yang ada
+    registered = np.frombuffer(registered, dtype=np.int64).copy()
+    registered[registered == UNKNOWN_DATE] = np.iinfo(np.int32).max
+
+    order = np.argsort(keys, kind='stable')
+    keys = keys[order]
+    unique_keys, starts = np.unique(keys, return_index=True)
+    if len(keys):
+        flags = np.bitwise_or.reduceat(flags[order], starts)
+        registered = np.minimum.reduceat(registered[order], starts)
+    registered[registered == np.iinfo(np.int32).max] = UNKNOWN_DATE
+
+    for name, flag in FLAGS.items():
+        counts[name] = int(np.count_nonzero(flags & flag))
+    os.makedirs(path, exist_ok=True)
+    np.save(os.path.join(path, 'keys.npy'), unique_keys)
+    np.save(os.path.join(path, 'flags.npy'), flags.astype(np.uint8))
+    np.save(os.path.join(path, 'registered.npy'), registered.astype(np.int32))
+    meta = {
+        'entries': len(unique_keys),
+        'counts': counts,
+        'with_registration_date': int(np.count_nonzero(registered != UNKNOWN_DATE)),
+        'built_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+    with open(os.path.join(path, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+    return meta
@@ -0,0 +1,47 @@
+import time
+
+
+class StageTimer:
+    """
+    Akumulasi durasi per tahap (detik) untuk satu request atau satu shard.
+
+    mark(stage) menambahkan waktu sejak mark sebelumnya ke `stage`, jadi satu
+    panggilan perf_counter per tahap sudah cukup.
+    """
+
+    __slots__ = ('totals', '_last')
+
+    def __init__(self):
+        self.totals = {}
+        self._last = time.perf_counter()
+
+    def restart(self):
+        self._last = time.perf_counter()
+
+    def mark(self, stage):
+        now = time.perf_counter()
+        self.totals[stage] = self.totals.get(stage, 0.0) + (now - self._last)
+        self._last = now
+
+    def merge(self, totals):
+        for stage, seconds in totals.items():
+            self.totals[stage] = self.totals.get(stage, 0.0) + seconds
+
+
+class _NullTimer:
+    """Timer kosong agar jalur tanpa instrumentasi tidak perlu bercabang."""
+
+    __slots__ = ()
+    totals = None
+
+    def restart(self):
+        pass
+
+    def mark(self, stage):
+        pass
+
+    def merge(self, totals):
+        pass
+
+
+NULL_TIMER = _NullTimer()
@@ -0,0 +1,112 @@
+"""
+Transform TF-IDF serving tanpa analyzer dan validasi sklearn per panggilan.
+
+TokenVectorizer memakai vocabulary_ dan idf_ dari TfidfVectorizer hasil
+training dan menulis hitungan term langsung ke buffer CSR:
+
+- cleaned_text sudah lowercase (dan str.lower idempoten untuk semua code
+  point), jadi lowercase + decode di analyzer sklearn tidak mengubah apa pun.
+  Token diambil sekali dengan token_pattern yang sudah dikompilasi.
+- n-gram tidak dibangun semua: n-gram diperpanjang hanya selama masih menjadi
+  prefix term vocabulary (sebagian besar token bukan awal bigram/trigram).
+- sublinear tf, perkalian idf dan normalisasi memakai operasi NumPy dan
+  kernel normalisasi sklearn yang sama dengan TfidfTransformer, pada indeks
+  yang sudah terurut, jadi hasilnya identik bit demi bit dengan
+  tfidf.transform(cleaned_texts) (diperiksa parity_check.py).
+"""
+import re
+from array import array
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from sklearn.utils.sparsefuncs_fast import inplace_csr_row_normalize_l1, inplace_csr_row_normalize_l2
+
+_NORMALIZERS = {
+    None: None,
+    'l1': inplace_csr_row_normalize_l1,
+    'l2': inplace_csr_row_normalize_l2,
+}
+
+
+class TokenVectorizer:
+    """Pengganti TfidfVectorizer.transform untuk cleaned_text (analyzer='word')."""
+
+    def __init__(self, tfidf):
+        if tfidf.analyzer != 'word' or tfidf.input != 'content':
+            raise ValueError("Hanya TfidfVectorizer analyzer='word' dengan input='content' yang didukung")
+        for name in ('preprocessor', 'tokenizer', 'stop_words', 'strip_accents'):
+            if getattr(tfidf, name) is not None:
+                raise ValueError(f"TfidfVectorizer.{name} tidak didukung")
+        if tfidf.norm not in _NORMALIZERS:
+            raise ValueError(f"norm={tfidf.norm!r} tidak didukung")
+
+        self.token_pattern = re.compile(tfidf.token_pattern)
+        if self.token_pattern.groups > 1:
+            raise ValueError("token_pattern dengan lebih dari satu grup tidak didukung")
+        self.min_n, self.max_n = tfidf.ngram_range
+        self.vocabulary = tfidf.vocabulary_
+        self.n_features = len(self.vocabulary)
+        self.dtype = np.dtype(tfidf.dtype)
+        self.binary = tfidf.binary
+        self.sublinear_tf = tfidf.sublinear_tf
+        self.idf = tfidf.idf_ if tfidf.use_idf else None
+        self.normalize = _NORMALIZERS[tfidf.norm]
+        # Semua prefix (per batas spasi) dari term multi-kata: n-gram yang bukan prefix tidak diperpanjang
+        self.prefixes = frozenset(
+            ' '.join(parts[:k])
+            for parts in (term.split(' ') for term in self.vocabulary)
+            for k in range(1, len(parts))
+        )
+
+    def tokenize(self, cleaned_text):
+        return self.token_pattern.findall(cleaned_text)
+
+    def count(self, tokens):
+        """Hitungan term vocabulary {indeks kolom: jumlah} untuk satu dokumen."""
+        vocabulary, prefixes = self.vocabulary, self.prefixes
+        min_n, max_n = self.min_n, self.max_n
+        n_tokens = len(tokens)
+        counts = {}
+        for i, gram in enumerate(tokens):
+            n = 1
+            while True:
+                if n >= min_n:
+                    index = vocabulary.get(gram)
+                    if index is not None:
+                        counts[index] = counts.get(index, 0) + 1
+                if n == max_n or i + n == n_tokens or gram not in prefixes:
+                    break
+                gram = gram + ' ' + tokens[i + n]
+                n += 1
+        return counts
+
+    def transform(self, cleaned_texts):
+        """CSR (N, n_features) identik dengan tfidf.transform(cleaned_texts)."""
+        # Buffer int32 (array) alih-alih list objek int Python
+        indptr = array('i', [0])
+        indices = array('i')
+        values = array('i')
+        for cleaned_text in cleaned_texts:
+            counts = self.count(self.tokenize(cleaned_text))
+            columns = sorted(counts)
+            indices.extend(columns)
+            values.extend(map(counts.__getitem__, columns))
+            indptr.append(len(indices))
+
+        data = np.frombuffer(values, dtype=np.int32).astype(self.dtype)
+        del values
+        if self.binary:
+            data.fill(1)
+        if self.sublinear_tf:
+            np.log(data, data)
+            data += 1.0
+        indices = np.frombuffer(indices, dtype=np.int32)
+        if self.idf is not None:
+            data *= self.idf[indices]
+
+        X = csr_matrix((data, indices, np.frombuffer(indptr, dtype=np.int32)),
+                       shape=(len(indptr) - 1, self.n_features))
+        X.has_sorted_indices = True
+        if self.normalize is not None:
+            self.normalize(X)
+        return X
@@ -0,0 +1,223 @@
+import json
+import os
+
+import numpy as np
+
+
+def resolve_threads(nthread=None):
+    """Jumlah thread inferensi: argumen, lalu env INFERENCE_THREADS; None berarti bawaan XGBoost."""
+    if nthread is None:
+        value = os.environ.get('INFERENCE_THREADS', '')
+        nthread = int(value) if value else None
+    return nthread
+
+
+def _iteration_range(booster):
+    # Sama dengan XGBModel._get_iteration_range: best_iteration jika training memakai early stopping
+    try:
+        return 0, booster.best_iteration + 1
+    except AttributeError:
+        return 0, 0
+
+
+class BoosterEngine:
+    """
+    Inferensi langsung ke Booster XGBoost, tanpa lapisan XGBClassifier.
+
+    inplace_predict dipanggil pada CSR (tanpa salinan DMatrix) dengan satu pass
+    probabilitas per batch. Jalankan beberapa worker Flask dengan
+    INFERENCE_THREADS kecil (misalnya 1) agar core tidak oversubscribed.
+    Booster.inplace_predict thread-safe untuk gbtree.
+    """
+
+    def __init__(self, model, nthread=None):
+        self.booster = model.get_booster() if hasattr(model, 'get_booster') else model
+        self.missing = getattr(model, 'missing', np.nan)
+        self.iteration_range = _iteration_range(self.booster)
+        self.nthread = resolve_threads(nthread)
+        if self.nthread is not None:
+            self.booster.set_param({'nthread': self.nthread})
+
+    def predict_phishing(self, X):
+        """Probabilitas kelas phishing (float32, panjang N) untuk CSR (N, 2079)."""
+        return self.booster.inplace_predict(
+            X,
+            iteration_range=self.iteration_range,
+            predict_type='value',
+            missing=self.missing,
+            validate_features=False
+        )
+
+    def predict_proba(self, X):
+        """Matriks (N, 2) [aman, phishing], identik dengan XGBClassifier.predict_proba."""
+        prob_phishing = self.predict_phishing(X)
+        return np.vstack((1 - prob_phishing, prob_phishing)).T
+
+
+class CompiledTreeEngine:
+    """
+    Prediktor tree ensemble tanpa XGBoost runtime: semua tree diratakan ke
+    array NumPy (fitur split, threshold, anak kiri/kanan, arah default, nilai
+    leaf) lalu ditelusuri serentak untuk semua baris x tree, satu level per
+    iterasi.
+
+    Semantik sama dengan XGBoost: nilai dibandingkan dalam float32 dengan
+    `x < threshold` ke kiri, entri CSR yang tidak disimpan (atau NaN) adalah
+    missing dan mengikuti default_left. Hanya untuk gbtree binary:logistic
+    tanpa split kategorikal.
+    """
+
+    # Baris per blok penelusuran; membatasi buffer padat (blok x fitur float32)
+    CHUNK_ROWS = 1024
+
+    # Opsional: batch lebih besar dari fallback_rows diteruskan ke engine lain
+    # (BoosterEngine lebih cepat mulai belasan baris per batch)
+    fallback = None
+    fallback_rows = None
+
+    def __init__(self, split_index, threshold, left, right, default_left, roots, max_depth, base_margin, num_feature):
+        self.split_index = split_index
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.default_left = default_left
+        self.roots = roots
+        self.max_depth = max_depth
+        self.base_margin = base_margin
+        self.num_feature = num_feature
+        # Anak kanan/kiri berselang-seling: anak = _children[node * 2 + go_left]
+        self._children = np.stack([right, left], axis=1).ravel()
+
+    @classmethod
+    def from_model(cls, model):
+        booster = model.get_booster() if hasattr(model, 'get_booster') else model
+        learner = json.loads(booster.save_raw('json'))['learner']
+        if learner['objective']['name'] != 'binary:logistic':
+            raise ValueError(f"Objective {learner['objective']['name']} tidak didukung")
+        gbtree = learner['gradient_booster']
+        if gbtree['name'] != 'gbtree' or gbtree['model']['gbtree_model_param']['num_parallel_tree'] != '1':
+            raise ValueError("Hanya gbtree dengan num_parallel_tree=1 yang didukung")
+
+        trees = gbtree['model']['trees'][slice(*_iteration_slice(booster))]
+        sizes = [len(tree['left_children']) for tree in trees]
+        offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(np.int32)
+
+        split_index, threshold, left, right, default_left = [], [], [], [], []
+        max_depth = 0
+        for tree, offset in zip(trees, offsets):
+            if any(tree['split_type']):
+                raise ValueError("Split kategorikal tidak didukung")
+            tree_left = np.asarray(tree['left_children'], dtype=np.int32)
+            tree_right = np.asarray(tree['right_children'], dtype=np.int32)
+            is_leaf = tree_left == -1
+            nodes = np.arange(len(tree_left), dtype=np.int32)
+
+            # Leaf menunjuk ke dirinya sendiri, jadi penelusuran cukup max_depth langkah tanpa cabang
+            left.append(np.where(is_leaf, nodes, tree_left) + offset)
+            right.append(np.where(is_leaf, nodes, tree_right) + offset)
+            split_index.append(np.where(is_leaf, 0, tree['split_indices']).astype(np.int32))
+            # Untuk leaf, split_conditions berisi nilai leaf
+            threshold.append(np.asarray(tree['split_conditions'], dtype=np.float32))
+            default_left.append(np.asarray(tree['default_left'], dtype=bool))
+            max_depth = max(max_depth, _tree_depth(tree_left, tree_right))
+
+        base_score = float(learner['learner_model_param']['base_score'].strip('[]'))
+        return cls(
+            split_index=np.concatenate(split_index),
+            threshold=np.concatenate(threshold),
+            left=np.concatenate(left),
+            right=np.concatenate(right),
+            default_left=np.concatenate(default_left),
+            roots=offsets,
+            max_depth=max_depth,
+            base_margin=float(np.log(base_score / (1 - base_score))),
+            num_feature=int(learner['learner_model_param']['num_feature'])
+        )
+
+    def save(self, path):
+        np.savez(path, split_index=self.split_index, threshold=self.threshold, left=self.left, right=self.right,
+                 default_left=self.default_left, roots=self.roots, max_depth=self.max_depth,
+                 base_margin=self.base_margin, num_feature=self.num_feature)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as arrays:
+            return cls(
+                split_index=arrays['split_index'], threshold=arrays['threshold'], left=arrays['left'],
+                right=arrays['right'], default_left=arrays['default_left'], roots=arrays['roots'],
+                max_depth=int(arrays['max_depth']), base_margin=float(arrays['base_margin']),
+                num_feature=int(arrays['num_feature'])
+            )
+
+    def _densify(self, X):
+        # Buffer padat float32 dengan NaN untuk entri yang tidak disimpan (missing)
+        dense = np.full((X.shape[0], self.num_feature), np.nan, dtype=np.float32)
+        rows = np.repeat(np.arange(X.shape[0]), np.diff(X.indptr))
+        dense[rows, X.indices] = X.data
+        return dense
+
+    def _margin(self, X):
+        values_flat = self._densify(X).ravel()
+        row_offsets = (np.arange(X.shape[0], dtype=np.int64) * self.num_feature)[:, None]
+        nodes = np.tile(self.roots, (X.shape[0], 1))
+        for _ in range(self.max_depth):
+            values = values_flat.take(row_offsets + self.split_index.take(nodes))
+            # NaN < threshold selalu False, jadi missing hanya ke kiri jika default_left
+            go_left = values < self.threshold.take(nodes)
+            go_left |= np.isnan(values) & self.default_left.take(nodes)
+            nodes = self._children.take(nodes * 2 + go_left)
+        return self.threshold.take(nodes).sum(axis=1, dtype=np.float64) + self.base_margin
+
+    def predict_phishing(self, X):
+        """Probabilitas kelas phishing (float32, panjang N) untuk CSR (N, num_feature)."""
+        if self.fallback is not None and X.shape[0] > self.fallback_rows:
+            return self.fallback.predict_phishing(X)
+        X = X.tocsr()
+        if X.shape[1] != self.num_feature:
+            raise ValueError(f"Jumlah fitur {X.shape[1]} != {self.num_feature}")
+        margins = np.concatenate([
+            self._margin(X[start:start + self.CHUNK_ROWS])
+            for start in range(0, X.shape[0], self.CHUNK_ROWS)
+        ]) if X.shape[0] else np.zeros(0)
+        return (1.0 / (1.0 + np.exp(-margins))).astype(np.float32)
+
+    def predict_proba(self, X):
+        """Matriks (N, 2) [aman, phishing] seperti XGBClassifier.predict_proba."""
+        prob_phishing = self.predict_phishing(X)
+        return np.vstack((1 - prob_phishing, prob_phishing)).T
+
+
+def _iteration_slice(booster):
+    start, end = _iteration_range(booster)
+    return start, (end or None)
+
+
+def _tree_depth(left, right):
+    depth, level = 0, [0]
+    while True:
+        level = [child for node in level for child in (left[node], right[node]) if child != -1]
+        if not level:
+            return depth
+        depth += 1
+
+
+def _compiled_with_fallback(model, nthread=None):
+    engine = CompiledTreeEngine.from_model(model)
+    engine.fallback = BoosterEngine(model, nthread)
+    engine.fallback_rows = int(os.environ.get('COMPILED_MAX_BATCH', 16))
+    return engine
+
+
+# Engine yang bisa dipilih saat startup lewat env INFERENCE_ENGINE
+ENGINES = {
+    'booster': BoosterEngine,
+    'compiled': _compiled_with_fallback,
+}
+
+
+def create_engine(model, name=None, nthread=None):
+    """Engine inferensi: argumen, lalu env INFERENCE_ENGINE (default 'booster')."""
+    name = name or os.environ.get('INFERENCE_ENGINE', 'booster')
+    if name not in ENGINES:
+        raise ValueError(f"INFERENCE_ENGINE tidak dikenal: {name} (pilihan: {', '.join(ENGINES)})")
+    return ENGINES[name](model, nthread)
@@ -0,0 +1,489 @@
+"""
+Ingest arsip email (mbox, Maildir, pohon .eml) ke scorer phishing.
+
+Pesan dibaca satu per satu dan diumpankan potong demi potong ke
+BytesFeedParser; hanya bagian text/* yang di-decode, lampiran cukup diwakili
+nama filenya. Pengirim dan tanggal diambil dari header From/Date (regex pada
+teks hanya dipakai jika header kosong). Pesan diskor per batch (satu
+featurize_batch + satu panggilan engine) dan hasilnya ditulis ke JSONL atau
+Parquet (direktori part-NNNNN.parquet, butuh pyarrow).
+
+Memori dibatasi ukuran batch (`batch_size` pesan / `batch_bytes` karakter)
+dan `max_message_bytes` per pesan, bukan ukuran arsip. Dengan --checkpoint
+posisi terakhir yang sudah ditulis disimpan setiap `checkpoint_every` batch;
+menjalankan ulang perintah yang sama melanjutkan dari posisi itu.
+
+Contoh:
+    python mailbox_ingest.py arsip.mbox Maildir/ eml/ --output hasil.jsonl --checkpoint hasil.ckpt
+    python mailbox_ingest.py arsip.mbox --output hasil.parquet --workers 4
+"""
+import argparse
+import json
+import os
+import time
+from email.header import decode_header, make_header
+from email.parser import BytesFeedParser
+from email.utils import parseaddr, parsedate_to_datetime
+
+from tqdm import tqdm
+
+from featurizer import Featurizer, combine_batches, set_stop_words
+from inference import create_engine
+from model_bundle import load_model_components
+from parallel_features import ParallelFeaturizer
+
+READ_CHUNK = 64 * 1024
+CHECKPOINT_FORMAT = 1
+
+
+# === PARSING PESAN ===
+class MessageFeeder:
+    """
+    BytesFeedParser dengan batas ukuran; byte setelah `max_bytes` dibuang (truncated).
+
+    Policy compat32 (bawaan): header tetap string mentah dan hanya yang dipakai
+    di-decode, jauh lebih murah daripada headerregistry policy.default.
+    """
+
+    def __init__(self, max_bytes=None):
+        self.parser = BytesFeedParser()
+        self.remaining = max_bytes
+        self.truncated = False
+
+    def feed(self, data):
+        if self.remaining is not None:
+            if len(data) > self.remaining:
+                data = data[:self.remaining]
+                self.truncated = True
+            self.remaining -= len(data)
+        if data:
+            self.parser.feed(data)
+
+    def close(self):
+        return self.parser.close()
+
+
+def parse_file(path, max_bytes=None):
+    feeder = MessageFeeder(max_bytes)
+    with open(path, 'rb') as f:
+        while not feeder.truncated:
+            data = f.read(READ_CHUNK)
+            if not data:
+                break
+            feeder.feed(data)
+    return feeder.close(), feeder.truncated
+
+
+def _header(message, name):
+    """Header ter-decode (encoded-word RFC 2047); byte non-UTF-8 diganti U+FFFD."""
+    value = message.get(name)
+    if value is None:
+        return ''
+    try:
+        value = str(make_header(decode_header(value)))
+    except Exception:
+        # Header yang rusak tidak boleh menggagalkan seluruh pesan
+        value = str(value)
+    # Byte mentah non-ASCII muncul sebagai surrogate dan tidak bisa ditulis sebagai UTF-8
+    return value.encode('utf-8', 'surrogateescape').decode('utf-8', 'replace')
+
+
+def header_date(message):
+    """Header Date dalam format extracted_date notebook ('%a %b %d %Y'); '' jika tidak terbaca."""
+    try:
+        date = parsedate_to_datetime(_header(message, 'Date'))
+    except (TypeError, ValueError, IndexError):
+        return ''
+    return f"{date:%a %b %d %Y}"
+
+
+def header_sender(message):
+    address = parseaddr(_header(message, 'From'))[1]
+    return address if '@' in address else ''
+
+
+def _decode_text(part):
+    payload = part.get_payload(decode=True) or b''
+    charset = part.get_content_charset() or 'utf-8'
+    try:
+        return payload.decode(charset, errors='replace')
+    except LookupError:
+        return payload.decode('utf-8', errors='replace')
+
+
+def message_text(message):
+    """Subject + isi text/plain dan text/html; lampiran hanya diwakili nama filenya."""
+    parts = [_header(message, 'Subject')]
+    for part in message.walk():
+        if part.is_multipart():
+            continue
+        filename = part.get_filename()
+        if part.get_content_maintype() == 'text' and part.get_content_disposition() != 'attachment':
+            parts.append(_decode_text(part))
+        elif filename:
+            parts.append(filename)
+    return '\n'.join(parts)
+
+
+# === SUMBER ARSIP ===
+# Setiap sumber menghasilkan (key, position, message, truncated). `position`
+# adalah token resume: iter_messages(after=position) melanjutkan tepat setelah pesan itu.
+class MboxSource:
+    def __init__(self, path):
+        self.path = path
+
+    def iter_messages(self, after=None, max_bytes=None):
+        """Baris 'From ' di awal baris memulai pesan baru (sama dengan mailbox.mbox); position = offset byte."""
+        with open(self.path, 'rb') as f:
+            offset = after or 0
+            f.seek(offset)
+            feeder = None
+            start = offset
+            at_line_start = True
+            # Baris dikumpulkan dan diumpankan per ~READ_CHUNK byte (feed per baris lambat)
+            buffered, buffered_bytes = [], 0
+            while True:
+                # readline dibatasi agar baris yang sangat panjang tidak dibaca sekaligus
+                line = f.readline(READ_CHUNK)
+                if at_line_start and (not line or line.startswith(b'From ')):
+                    if feeder is not None:
+                        feeder.feed(b''.join(buffered))
+                        buffered, buffered_bytes = [], 0
+                        yield str(start), offset, feeder.close(), feeder.truncated
+                    if not line:
+                        break
+                    feeder = MessageFeeder(max_bytes)
+                    start = offset
+                elif feeder is not None and not feeder.truncated:
+                    buffered.append(line)
+                    buffered_bytes += len(line)
+                    if buffered_bytes >= READ_CHUNK:
+                        feeder.feed(b''.join(buffered))
+                        buffered, buffered_bytes = [], 0
+                offset += len(line)
+                at_line_start = line.endswith(b'\n')
+
+
+def _walk_sorted(directory, accept, prefix=()):
+    """Path relatif (tuple komponen) dalam urutan tuple leksikografis; satu direktori dibaca per langkah."""
+    with os.scandir(directory) as entries:
+        entries = sorted(entries, key=lambda entry: entry.name)
+    for entry in entries:
+        parts = prefix + (entry.name,)
+        if entry.is_dir(follow_symlinks=False):
+            yield from _walk_sorted(entry.path, accept, parts)
+        elif accept(entry.name):
+            yield parts
+
+
+class FileTreeSource:
+    """Satu file .eml per pesan di bawah `path`; position = path relatif pesan terakhir."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def accept(self, name):
+        return name.lower().endswith('.eml')
+
+    def relative_paths(self):
+        return _walk_sorted(self.path, self.accept)
+
+    def iter_messages(self, after=None, max_bytes=None):
+        after_parts = tuple(after) if after is not None else None
+        for parts in self.relative_paths():
+            if after_parts is not None and parts <= after_parts:
+                continue
+            message, truncated = parse_file(os.path.join(self.path, *parts), max_bytes)
+            yield '/'.join(parts), list(parts), message, truncated
+
+
+class MaildirSource(FileTreeSource):
+    """Maildir: semua file di cur/ dan new/ (tmp/ diabaikan)."""
+
+    def accept(self, name):
+        return not name.startswith('.')
+
+    def relative_paths(self):
+        for subdir in ('cur', 'new'):
+            directory = os.path.join(self.path, subdir)
+            if os.path.isdir(directory):
+                for parts in _walk_sorted(directory, self.accept):
+                    yield (subdir,) + parts
+
+
+class EmlFileSource(FileTreeSource):
+    """Satu file .eml."""
+
+    def iter_messages(self, after=None, max_bytes=None):
+        if after is None:
+            message, truncated = parse_file(self.path, max_bytes)
+            yield os.path.basename(self.path), [], message, truncated
+
+
+def open_source(path):
+    """Deteksi jenis arsip: Maildir (ada cur/ dan new/), direktori .eml, file .eml, selain itu mbox."""
+    if os.path.isdir(path):
+        if os.path.isdir(os.path.join(path, 'cur')) and os.path.isdir(os.path.join(path, 'new')):
+            return MaildirSource(path)
+        return FileTreeSource(path)
+    if path.lower().endswith('.eml'):
+        return EmlFileSource(path)
+    return MboxSource(path)
+
+
+# === OUTPUT ===
+# Field record output dan tipe pyarrow-nya (semua nullable)
+RECORD_FIELDS = [
+    ('source', 'string'), ('key', 'string'), ('message_id', 'string'), ('subject', 'string'),
+    ('extracted_sender', 'string'), ('extracted_date', 'string'), ('phishing_probability', 'float64'),
+    ('is_phishing', 'bool_'), ('truncated', 'bool_'), ('error', 'string'),
+]
+
+
+class JsonlWriter:
+    """Satu objek JSON per baris; state checkpoint = offset byte file yang sudah di-fsync."""
+
+    def __init__(self, path, state=None):
+        if state is not None and os.path.exists(path):
+            self.file = open(path, 'r+b')
+            # Buang baris yang ditulis setelah checkpoint terakhir
+            self.file.seek(state['offset'])
+            self.file.truncate()
+        else:
+            self.file = open(path, 'wb')
+
+    def write(self, records):
+        self.file.write(b''.join(
+            (json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8') for record in records))
+
+    def commit(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        return {'offset': self.file.tell()}
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetWriter:
+    """
+    Direktori part-NNNNN.parquet, satu part per checkpoint (footer Parquet baru
+    ditulis saat part ditutup); state checkpoint = jumlah part yang selesai.
+    """
+
+    def __init__(self, path, state=None):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Output Parquet butuh pyarrow (pip install pyarrow)")
+        self._pa = pa
+        self._pq = pq
+        self.schema = pa.schema([(name, getattr(pa, type_name)()) for name, type_name in RECORD_FIELDS])
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self.parts = state['parts'] if state is not None else 0
+        if state is None:
+            for name in os.listdir(path):
+                if name.startswith('part-'):
+                    os.remove(os.path.join(path, name))
+        self._writer = None
+
+    def _part_path(self, suffix=''):
+        return os.path.join(self.path, f'part-{self.parts:05d}.parquet{suffix}')
+
+    def write(self, records):
+        if self._writer is None:
+            self._writer = self._pq.ParquetWriter(self._part_path('.tmp'), self.schema)
+        self._writer.write_table(self._pa.Table.from_pylist(records, schema=self.schema))
+
+    def commit(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+            os.replace(self._part_path('.tmp'), self._part_path())
+            self.parts += 1
+        return {'parts': self.parts}
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+def open_writer(path, output_format=None, state=None):
+    output_format = output_format or ('parquet' if path.endswith('.parquet') else 'jsonl')
+    return (ParquetWriter if output_format == 'parquet' else JsonlWriter)(path, state)
+
+
+# === CHECKPOINT ===
+def load_checkpoint(path, inputs):
+    if not path or not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        checkpoint = json.load(f)
+    if checkpoint.get('format') != CHECKPOINT_FORMAT or checkpoint['inputs'] != inputs:
+        raise ValueError(f"Checkpoint {path} dibuat untuk input lain; hapus file itu untuk mulai dari awal")
+    return checkpoint
+
+
+def save_checkpoint(path, checkpoint):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(checkpoint, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+# === SCORING ===
+_featurizer = None
+
+
+def init_featurizer(model_dir):
+    """Muat featurizer sekali per proses (juga initializer worker ParallelFeaturizer)."""
+    global _featurizer
+    components = load_model_components(model_dir)
+    if components.stop_words is not None:
+        set_stop_words(components.stop_words)
+    _featurizer = Featurizer(components.tfidf, components.numeric_features)
+    return components
+
+
+def featurize_messages(items):
+    """Shard [(text, (extracted_date, extracted_sender)), ...] -> FeatureBatch."""
+    return _featurizer.featurize_batch([text for text, _ in items], headers=[headers for _, headers in items])
+
+
+class IngestStats:
+    def __init__(self):
+        self.messages = 0
+        self.errors = 0
+        self.truncated = 0
+        self.score_seconds = 0.0
+        self.started = time.perf_counter()
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def summary(self):
+        elapsed = self.elapsed
+        rate = self.messages / elapsed if elapsed else 0.0
+        return (f"{self.messages} pesan dalam {elapsed:.1f} s ({rate:.0f} pesan/detik; "
+                f"skor {self.score_seconds:.1f} s, baca/parse/tulis {elapsed - self.score_seconds:.1f} s), "
+                f"{self.errors} gagal di-parse, {self.truncated} dipotong")
+
+
+def parse_record(path, key, message, truncated):
+    """(record tanpa hasil skor, teks untuk featurizer, (date, sender) dari header)."""
+    record = dict.fromkeys(name for name, _ in RECORD_FIELDS)
+    record.update(source=path, key=key, truncated=truncated)
+    try:
+        record.update(message_id=_header(message, 'Message-ID'), subject=_header(message, 'Subject'))
+        return record, message_text(message), (header_date(message), header_sender(message))
+    except Exception as e:
+        record['error'] = repr(e)
+        return record, '', None
+
+
+def score_pending(pending, pool, engine):
+    """Skor batch pesan yang sudah di-parse; isi field hasil di setiap record."""
+    scorable = [(text, headers) for record, text, headers in pending if record['error'] is None]
+    if scorable:
+        X_combined, batch = combine_batches(pool.map(scorable))
+        prob_phishing = engine.predict_phishing(X_combined)
+        meta = iter(zip(batch.meta, prob_phishing))
+    records = []
+    for record, _, _ in pending:
+        if record['error'] is None:
+            (extracted_date, extracted_sender, extras), probability = next(meta)
+            record['extracted_sender'] = extracted_sender
+            record['extracted_date'] = extracted_date
+            record['phishing_probability'] = round(float(probability), 4)
+            # Sama dengan XGBClassifier.predict: phishing jika p > 0.5
+            record['is_phishing'] = bool(probability > 0.5)
+            record['truncated'] = record['truncated'] or bool(extras.get('input_truncated', 0))
+        records.append(record)
+    return records
+
+
+def ingest(inputs, output, model_dir='phishing_detection_model', output_format=None, checkpoint_path=None,
+           batch_size=256, batch_bytes=64 * 1024 * 1024, checkpoint_every=10, workers=1,
+           max_message_bytes=32 * 1024 * 1024, progress=None):
+    """Skor semua pesan di `inputs` ke `output`; kembalikan IngestStats."""
+    inputs = [os.path.abspath(path) for path in inputs]
+    checkpoint = load_checkpoint(checkpoint_path, inputs)
+    components = init_featurizer(model_dir)
+    engine = create_engine(components.model)
+    writer = open_writer(output, output_format, checkpoint['output'] if checkpoint else None)
+    stats = IngestStats()
+    done = checkpoint['messages'] if checkpoint else 0
+    cursor = (checkpoint['source'], checkpoint['position']) if checkpoint else (0, None)
+
+    def flush(pending, commit):
+        nonlocal done, cursor
+        if pending:
+            started = time.perf_counter()
+            writer.write(score_pending(pending, pool, engine))
+            stats.score_seconds += time.perf_counter() - started
+            stats.messages += len(pending)
+            done += len(pending)
+            if progress is not None:
+                progress.update(len(pending))
+        if commit and checkpoint_path:
+            save_checkpoint(checkpoint_path, {
+                'format': CHECKPOINT_FORMAT, 'inputs': inputs, 'source': cursor[0], 'position': cursor[1],
+                'messages': done, 'output': writer.commit()
+            })
+
+    with ParallelFeaturizer(featurize_messages, workers, shard_size=64,
+                            initializer=init_featurizer, initargs=(model_dir,)) as pool:
+        pending, pending_chars, batches = [], 0, 0
+        start_source, start_position = cursor
+        for index, path in enumerate(inputs[start_source:], start=start_source):
+            source = open_source(path)
+            after = start_position if index == start_source else None
+            for key, position, message, truncated in source.iter_messages(after, max_message_bytes):
+                record, text, headers = parse_record(path, key, message, truncated)
+                stats.errors += record['error'] is not None
+                stats.truncated += truncated
+                pending.append((record, text, headers))
+                pending_chars += len(text)
+                cursor = (index, position)
+
+                if len(pending) >= batch_size or pending_chars >= batch_bytes:
+                    batches += 1
+                    flush(pending, commit=batches % checkpoint_every == 0)
+                    pending, pending_chars = [], 0
+            # Pindah sumber: posisi berikutnya adalah awal sumber selanjutnya
+            cursor = (index + 1, None)
+        flush(pending, commit=True)
+    writer.commit()
+    writer.close()
+    return stats
+
+
+# === MAIN ===
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Skor arsip email (mbox, Maildir, .eml) ke JSONL/Parquet')
+    parser.add_argument('inputs', nargs='+', help='file mbox, direktori Maildir, direktori atau file .eml')
+    parser.add_argument('--output', required=True, help='file .jsonl atau direktori .parquet')
+    parser.add_argument('--format', choices=['jsonl', 'parquet'], help='default: dari ekstensi --output')
+    parser.add_argument('--model-dir', default='phishing_detection_model')
+    parser.add_argument('--checkpoint', help='file checkpoint; jika ada, ingest dilanjutkan dari posisinya')
+    parser.add_argument('--batch-size', type=int, default=256, help='pesan per batch scoring')
+    parser.add_argument('--batch-mb', type=float, default=64, help='batas teks per batch (juta karakter)')
+    parser.add_argument('--checkpoint-every', type=int, default=10, help='simpan checkpoint setiap N batch')
+    parser.add_argument('--workers', type=int, default=1, help='proses featurization (0 = semua core)')
+    parser.add_argument('--max-message-mb', type=float, default=32, help='byte pesan di atas batas ini dibuang')
+    args = parser.parse_args()
+
+    with tqdm(desc='Scoring', unit='msg') as bar:
+        stats = ingest(
+            args.inputs, args.output, args.model_dir, args.format, args.checkpoint,
+            batch_size=args.batch_size, batch_bytes=int(args.batch_mb * 1024 * 1024),
+            checkpoint_every=args.checkpoint_every, workers=args.workers,
+            max_message_bytes=int(args.max_message_mb * 1024 * 1024), progress=bar
+        )
+    print(stats.summary())
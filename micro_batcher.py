@@ -0,0 +1,169 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+
+class QueueFullError(Exception):
+    """Antrian micro-batch penuh; pemanggil sebaiknya menjawab 503."""
+
+
+class _Item:
+    __slots__ = ('value', 'future', 'enqueued_at', 'deadline')
+
+    def __init__(self, value, enqueued_at, deadline):
+        self.value = value
+        self.future = Future()
+        self.enqueued_at = enqueued_at
+        self.deadline = deadline
+
+
+_STOP = object()
+
+
+class MicroBatcher:
+    """
+    Menggabungkan request tunggal yang datang bersamaan menjadi satu batch.
+
+    Item pertama di antrian menunggu paling lama `max_wait` detik (atau sampai
+    `max_batch` item terkumpul) sebelum batch diskor dengan satu panggilan
+    `batch_func(values)`; setiap pemanggil menerima hasilnya sendiri lewat
+    Future. Antrian dibatasi `max_queue` item (QueueFullError saat penuh) dan
+    item yang sudah melewati timeout pemanggil tidak ikut diskor.
+    """
+
+    def __init__(self, batch_func, max_batch=64, max_wait=0.005, max_queue=1024, on_batch=None,
+                 clock=time.monotonic):
+        self.batch_func = batch_func
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.max_queue = max_queue
+        # on_batch(batch_size, queue_waits) dipanggil setiap batch (untuk metrik)
+        self.on_batch = on_batch
+        self._clock = clock
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._closed = False
+        self.batches = 0
+        self.items = 0
+        self.rejected = 0
+        self.expired = 0
+
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+                    self._thread.start()
+
+    def submit(self, value, timeout=None):
+        """Masukkan satu item ke antrian; kembalikan Future hasilnya."""
+        if self._closed:
+            raise RuntimeError("MicroBatcher sudah ditutup")
+        self._ensure_started()
+        now = self._clock()
+        item = _Item(value, now, now + timeout if timeout is not None else None)
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            with self._lock:
+                self.rejected += 1
+            raise QueueFullError(f"Antrian micro-batch penuh ({self.max_queue} item)")
+        return item.future
+
+    def map(self, values, timeout=None):
+        """Skor beberapa item lewat antrian dan tunggu semua hasilnya (TimeoutError jika lewat batas)."""
+        futures = [self.submit(value, timeout) for value in values]
+        deadline = self._clock() + timeout if timeout is not None else None
+        results = []
+        for future in futures:
+            remaining = None if deadline is None else max(0.0, deadline - self._clock())
+            try:
+                results.append(future.result(remaining))
+            except FutureTimeoutError:
+                raise TimeoutError("Melewati batas waktu micro-batch")
+        return results
+
+    def _collect(self, first):
+        batch = [first]
+        window_end = first.enqueued_at + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = window_end - self._clock()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                self._queue.put(_STOP)
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is _STOP:
+                break
+            self._dispatch(self._collect(first))
+
+        # Item yang tersisa saat ditutup tidak akan diskor
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                item.future.set_exception(RuntimeError("MicroBatcher ditutup"))
+
+    def _dispatch(self, batch):
+        now = self._clock()
+        live = []
+        for item in batch:
+            if item.deadline is not None and now > item.deadline:
+                item.future.set_exception(TimeoutError("Melewati batas waktu sebelum diskor"))
+                with self._lock:
+                    self.expired += 1
+            elif item.future.set_running_or_notify_cancel():
+                live.append(item)
+        if not live:
+            return
+
+        if self.on_batch is not None:
+            self.on_batch(len(live), [now - item.enqueued_at for item in live])
+
+        try:
+            results = self.batch_func([item.value for item in live])
+        except Exception as e:
+            for item in live:
+                item.future.set_exception(e)
+            return
+
+        for item, result in zip(live, results):
+            item.future.set_result(result)
+        with self._lock:
+            self.batches += 1
+            self.items += len(live)
+
+    def close(self, timeout=None):
+        """Hentikan thread setelah batch yang sedang berjalan selesai."""
+        self._closed = True
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+            self._thread = None
+
+    def stats(self):
+        with self._lock:
+            return {
+                'max_batch': self.max_batch,
+                'max_wait_ms': self.max_wait * 1000,
+                'max_queue': self.max_queue,
+                'queue_depth': self._queue.qsize(),
+                'batches': self.batches,
+                'items': self.items,
+                'avg_batch_size': round(self.items / self.batches, 2) if self.batches else 0.0,
+                'rejected': self.rejected,
+                'expired': self.expired
+            }
@@ -0,0 +1,205 @@
+"""
+Bundle model tunggal untuk startup cepat.
+
+Satu file .npz (tanpa pickle) berisi booster XGBoost, vocabulary + idf
+TF-IDF, stopword, daftar fitur numerik, target_col dan metadata. Dengan
+bundle, app tidak perlu nltk (apalagi nltk.download) maupun lima file joblib.
+Jika bundle tidak ada, komponen dimuat dari file joblib lama. Bundle
+menyimpan hash sha256 file joblib sumbernya; jika file joblib di direktori
+model berubah (export ulang tanpa membangun bundle), bundle ditolak dan
+file joblib yang dipakai.
+
+Bangun ulang setiap kali model di-export dari notebook (butuh korpus
+stopwords NLTK yang sama dengan saat training):
+    python model_bundle.py --model-dir phishing_detection_model
+"""
+import argparse
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy as np
+
+BUNDLE_FORMAT = 1
+BUNDLE_FILENAME = 'model_bundle.npz'
+# Direktori model app; hanya direktori ini yang mengikuti env MODEL_BUNDLE
+DEFAULT_MODEL_DIR = 'phishing_detection_model'
+SOURCE_FILES = [
+    'xgboost_phishing_model.pkl', 'tfidf_vectorizer.pkl', 'numeric_features.pkl', 'target_col.pkl',
+    'model_metadata.pkl',
+]
+
+# Parameter TfidfVectorizer yang disimpan; callable (tokenizer, dll.) tidak didukung
+TFIDF_PARAMS = [
+    'analyzer', 'binary', 'decode_error', 'encoding', 'input', 'lowercase', 'max_df',
+    'max_features', 'min_df', 'ngram_range', 'norm', 'preprocessor', 'smooth_idf',
+    'stop_words', 'strip_accents', 'sublinear_tf', 'token_pattern', 'tokenizer', 'use_idf',
+]
+
+
+class StaleBundleError(ValueError):
+    """Bundle tidak cocok dengan file joblib di direktori modelnya."""
+
+
+class ModelComponents:
+    """Komponen yang dipakai app: model, tfidf, numeric_features, target_col, model_metadata."""
+
+    def __init__(self, model, tfidf, numeric_features, target_col, model_metadata, stop_words=None, source=None):
+        self.model = model
+        self.tfidf = tfidf
+        self.numeric_features = numeric_features
+        self.target_col = target_col
+        self.model_metadata = model_metadata
+        # None berarti stopword dimuat dari korpus NLTK lokal
+        self.stop_words = stop_words
+        self.source = source
+
+
+def load_legacy(model_dir):
+    """Muat lima file joblib hasil export notebook."""
+    import joblib
+
+    return ModelComponents(
+        model=joblib.load(os.path.join(model_dir, 'xgboost_phishing_model.pkl')),
+        tfidf=joblib.load(os.path.join(model_dir, 'tfidf_vectorizer.pkl')),
+        numeric_features=joblib.load(os.path.join(model_dir, 'numeric_features.pkl')),
+        target_col=joblib.load(os.path.join(model_dir, 'target_col.pkl')),
+        model_metadata=joblib.load(os.path.join(model_dir, 'model_metadata.pkl')),
+        source='joblib'
+    )
+
+
+def source_fingerprint(model_dir):
+    """sha256 per file joblib yang ada di `model_dir` (nama file -> hex)."""
+    fingerprint = {}
+    for name in SOURCE_FILES:
+        path = os.path.join(model_dir, name)
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                fingerprint[name] = hashlib.sha256(f.read()).hexdigest()
+    return fingerprint
+
+
+def build_bundle(model_dir, output_path=None, stop_words=None):
+    """Gabungkan file joblib di `model_dir` (dan stopword NLTK) menjadi satu bundle .npz."""
+    components = load_legacy(model_dir)
+    output_path = output_path or os.path.join(model_dir, BUNDLE_FILENAME)
+
+    if stop_words is None:
+        from featurizer import get_stop_words
+        stop_words = get_stop_words()
+
+    tfidf = components.tfidf
+    params = {name: getattr(tfidf, name) for name in TFIDF_PARAMS}
+    for name in ('analyzer', 'preprocessor', 'tokenizer'):
+        if callable(params[name]):
+            raise ValueError(f"TfidfVectorizer.{name} berupa callable dan tidak bisa disimpan di bundle")
+    params['dtype'] = np.dtype(tfidf.dtype).name
+
+    # Urutan term mengikuti indeks kolom vocabulary_
+    terms = [None] * len(tfidf.vocabulary_)
+    for term, index in tfidf.vocabulary_.items():
+        terms[index] = term
+
+    # save_model (bukan save_raw) agar atribut sklearn (n_classes_, dll.) ikut tersimpan
+    with tempfile.TemporaryDirectory() as tmp:
+        booster_path = os.path.join(tmp, 'model.ubj')
+        components.model.save_model(booster_path)
+        with open(booster_path, 'rb') as f:
+            booster_raw = f.read()
+
+    tmp_path = output_path + '.tmp.npz'
+    np.savez(
+        tmp_path,
+        format=np.array(BUNDLE_FORMAT),
+        booster=np.frombuffer(booster_raw, dtype=np.uint8),
+        tfidf_params=np.array(json.dumps(params)),
+        tfidf_terms=np.array(terms),
+        tfidf_idf=np.asarray(tfidf.idf_),
+        stop_words=np.array(sorted(stop_words)),
+        numeric_features=np.array(list(components.numeric_features)),
+        target_col=np.array(json.dumps(components.target_col)),
+        model_metadata=np.array(json.dumps(components.model_metadata, default=str)),
+        sources=np.array(json.dumps(source_fingerprint(model_dir))),
+    )
+    os.replace(tmp_path, output_path)
+    return output_path
+
+
+def load_bundle(path, model_dir=None):
+    """
+    Muat bundle .npz; hanya xgboost dan TfidfVectorizer yang di-import.
+
+    Dengan `model_dir`, hash file joblib di sana dibandingkan dengan yang
+    tercatat di bundle (StaleBundleError jika berbeda). Direktori tanpa file
+    joblib (hanya bundle) tidak diperiksa.
+    """
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from xgboost import XGBClassifier
+
+    with np.load(path, allow_pickle=False) as bundle:
+        if int(bundle['format']) != BUNDLE_FORMAT:
+            raise ValueError(f"Format bundle {int(bundle['format'])} tidak didukung (butuh {BUNDLE_FORMAT})")
+        if model_dir is not None:
+            current = source_fingerprint(model_dir)
+            recorded = json.loads(str(bundle['sources'])) if 'sources' in bundle.files else None
+            if current and recorded != current:
+                raise StaleBundleError(f"Bundle {path} tidak cocok dengan file joblib di {model_dir}; "
+                                       f"bangun ulang dengan: python model_bundle.py --model-dir {model_dir}")
+
+        model = XGBClassifier()
+        model.load_model(bytearray(bundle['booster'].tobytes()))
+
+        params = json.loads(str(bundle['tfidf_params']))
+        params['ngram_range'] = tuple(params['ngram_range'])
+        params['dtype'] = np.dtype(params['dtype']).type
+        tfidf = TfidfVectorizer(**params)
+        tfidf.vocabulary_ = {term: index for index, term in enumerate(bundle['tfidf_terms'].tolist())}
+        tfidf.idf_ = bundle['tfidf_idf']
+
+        return ModelComponents(
+            model=model,
+            tfidf=tfidf,
+            numeric_features=bundle['numeric_features'].tolist(),
+            target_col=json.loads(str(bundle['target_col'])),
+            model_metadata=json.loads(str(bundle['model_metadata'])),
+            stop_words=bundle['stop_words'].tolist(),
+            source=f'bundle:{path}'
+        )
+
+
+def default_bundle_path(model_dir):
+    """<model_dir>/model_bundle.npz; env MODEL_BUNDLE hanya berlaku untuk DEFAULT_MODEL_DIR."""
+    path = os.path.join(model_dir, BUNDLE_FILENAME)
+    if os.path.abspath(model_dir) == os.path.abspath(DEFAULT_MODEL_DIR):
+        return os.environ.get('MODEL_BUNDLE', path)
+    return path
+
+
+def load_model_components(model_dir, bundle_path=None):
+    """Bundle jika ada dan cocok dengan file joblib (lihat default_bundle_path), selain itu joblib."""
+    if bundle_path is None:
+        bundle_path = default_bundle_path(model_dir)
+    if bundle_path and os.path.exists(bundle_path):
+        try:
+            return load_bundle(bundle_path, model_dir)
+        except StaleBundleError as e:
+            print(f"{e}; memakai file joblib")
+    return load_legacy(model_dir)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Bangun bundle model tunggal dari file joblib')
+    parser.add_argument('--model-dir', default='phishing_detection_model')
+    parser.add_argument('--output', help=f'default: <model-dir>/{BUNDLE_FILENAME}')
+    parser.add_argument('--stopwords-file', help='satu stopword per baris (default: korpus NLTK lokal)')
+    args = parser.parse_args()
+
+    stop_words = None
+    if args.stopwords_file:
+        with open(args.stopwords_file, encoding='utf-8') as f:
+            stop_words = [line.strip() for line in f if line.strip()]
+
+    path = build_bundle(args.model_dir, args.output, stop_words)
+    print(f"Bundle disimpan ke {path} ({os.path.getsize(path) / 1024:.0f} KB)")
@@ -0,0 +1,442 @@
+"""
+Registry model berversi dan hot-swap model tanpa restart worker.
+
+Layout registry (env MODEL_REGISTRY):
+    <registry>/versions/<versi>/   artefak export notebook (file joblib dan/atau model_bundle.npz)
+    <registry>/CURRENT             nama versi aktif (ditulis atomik)
+
+Setiap proses app memegang satu ModelState aktif di ModelHolder. Versi baru
+dimuat, dipanaskan dan divalidasi dengan smoke set di thread background
+(watcher yang memantau CURRENT, atau endpoint admin), baru kemudian
+referensinya ditukar. Request memegang state lewat acquire() dari awal
+sampai selesai, jadi request yang sedang berjalan tetap memakai versi lama;
+state lama ditutup setelah request terakhirnya selesai. Jika validasi gagal,
+versi lama tetap aktif.
+
+Contoh:
+    python model_registry.py --registry model_registry publish phishing_detection_model --version 2025-01-15
+    python model_registry.py --registry model_registry activate 2025-01-15
+    python model_registry.py --registry model_registry list
+"""
+import argparse
+import json
+import os
+import re
+import shutil
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+
+import numpy as np
+
+from explanations import ContributionExplainer
+from featurizer import Featurizer, combine_batches
+from inference import create_engine
+from model_bundle import BUNDLE_FILENAME, load_model_components
+from parallel_features import ParallelFeaturizer, resolve_workers
+
+CURRENT_FILENAME = 'CURRENT'
+VERSIONS_DIRNAME = 'versions'
+# Artefak yang disalin saat publish: lima file joblib export notebook dan bundle (jika ada)
+ARTIFACT_FILES = [
+    'xgboost_phishing_model.pkl', 'tfidf_vectorizer.pkl', 'numeric_features.pkl', 'target_col.pkl',
+    'model_metadata.pkl', BUNDLE_FILENAME,
+]
+VERSION_PATTERN = re.compile(r'^[A-Za-z0-9][A-Za-z0-9._-]*$')
+
+# Smoke set bawaan: satu email phishing, satu normal, satu HTML dan satu kosong
+SMOKE_EMAILS = [
+    "From: alerts@paypa1-secure.tk URGENT: Your PayPal account has been suspended! Verify your account "
+    "immediately at http://192.168.10.5/login or it will be closed. Enter your password and card number.",
+    "Hi team, see attached file for the quarterly report. The meeting moved to Friday. Thanks, Citra",
+    "<html><body><form action=\"http://evil.example/steal\"><a href=\"https://example.com/unsubscribe\">"
+    "Unsubscribe</a></form></body></html>",
+    "",
+]
+
+
+class ModelValidationError(Exception):
+    """Versi model gagal dimuat atau gagal validasi smoke set; versi aktif tidak diganti."""
+
+
+# === REGISTRY ===
+class ModelRegistry:
+    """Direktori versi model + penunjuk CURRENT."""
+
+    def __init__(self, root):
+        self.root = root
+        self.versions_dir = os.path.join(root, VERSIONS_DIRNAME)
+
+    def versions(self):
+        if not os.path.isdir(self.versions_dir):
+            return []
+        return sorted(name for name in os.listdir(self.versions_dir) if VERSION_PATTERN.match(name))
+
+    def version_dir(self, version):
+        if not VERSION_PATTERN.match(version or ''):
+            raise ValueError(f"Nama versi tidak valid: {version!r}")
+        path = os.path.join(self.versions_dir, version)
+        if not os.path.isdir(path):
+            raise ValueError(f"Versi {version!r} tidak ada di registry {self.root}")
+        return path
+
+    def current(self):
+        """Nama versi aktif, atau None jika belum ada yang diaktifkan."""
+        try:
+            with open(os.path.join(self.root, CURRENT_FILENAME), encoding='utf-8') as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def publish(self, model_dir, version):
+        """Salin artefak `model_dir` ke versions/<versi>; versi yang sudah ada tidak ditimpa."""
+        if not VERSION_PATTERN.match(version):
+            raise ValueError(f"Nama versi tidak valid: {version!r}")
+        target = os.path.join(self.versions_dir, version)
+        if os.path.exists(target):
+            raise ValueError(f"Versi {version!r} sudah ada di registry")
+        files = [name for name in ARTIFACT_FILES if os.path.exists(os.path.join(model_dir, name))]
+        if not files:
+            raise ValueError(f"Tidak ada artefak model di {model_dir}")
+
+        # Salin ke direktori sementara lalu rename: versi tidak pernah terlihat setengah jadi
+        os.makedirs(self.versions_dir, exist_ok=True)
+        tmp_dir = os.path.join(self.versions_dir, f'.tmp-{version}-{os.getpid()}')
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        for name in files:
+            shutil.copy2(os.path.join(model_dir, name), os.path.join(tmp_dir, name))
+        os.rename(tmp_dir, target)
+        return target
+
+    def activate(self, version):
+        """Tulis CURRENT secara atomik; watcher di setiap worker akan memuat versi ini."""
+        self.version_dir(version)
+        path = os.path.join(self.root, CURRENT_FILENAME)
+        tmp_path = f'{path}.tmp-{os.getpid()}'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(version + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+
+# === STATE MODEL ===
+_worker_featurizer = None
+_worker_timed = False
+
+
+def init_feature_worker(model_dir, limits, timed, reputation=None):
+    """
+    Initializer worker ParallelFeaturizer: muat Featurizer versi model yang sama di proses worker.
+    `reputation` tiba sebagai path dan dibuka ulang (memory map bersama, bukan salinan).
+    """
+    global _worker_featurizer, _worker_timed
+    components = load_model_components(model_dir)
+    _worker_featurizer = Featurizer(components.tfidf, components.numeric_features, limits, components.stop_words,
+                                    reputation)
+    _worker_timed = timed
+
+
+def featurize_worker_shard(email_contents):
+    return _worker_featurizer.featurize_batch(email_contents, timed=_worker_timed)
+
+
+class ModelState:
+    """
+    Satu versi model yang siap dipakai: komponen, Featurizer, engine
+    inferensi dan (opsional) pool featurization miliknya sendiri.
+    """
+
+    def __init__(self, version, model_dir, components, featurizer, engine, feature_pool=None, explainer=None):
+        self.version = version
+        self.model_dir = model_dir
+        self.components = components
+        self.model = components.model
+        self.tfidf = components.tfidf
+        self.numeric_features = components.numeric_features
+        self.target_col = components.target_col
+        self.model_metadata = components.model_metadata
+        self.source = components.source
+        self.featurizer = featurizer
+        self.engine = engine
+        self.feature_pool = feature_pool
+        self.explainer = explainer
+        # Versi untuk kunci cache: creation_date ikut dipakai karena model hasil retrain bisa tetap berversi '1.0'
+        self.cache_version = f"{version}|{self.model_metadata['version']}|{self.model_metadata['creation_date']}"
+        self.loaded_at = time.time()
+        self.closed = False
+        # Request yang sedang memegang state ini (diatur ModelHolder)
+        self.active = 0
+        self.retired = False
+
+    def featurize(self, email_contents, timed=False):
+        """List FeatureBatch untuk email; pool dipakai hanya selama state belum ditutup."""
+        # Satu shard dikerjakan ParallelFeaturizer di proses ini, yang tidak punya Featurizer worker
+        if self.feature_pool is None or self.closed or len(email_contents) <= self.feature_pool.shard_size:
+            return [self.featurizer.featurize_batch(email_contents, timed=timed)]
+        return self.feature_pool.map(email_contents)
+
+    def close(self):
+        self.closed = True
+        if self.feature_pool is not None:
+            self.feature_pool.shutdown()
+
+    def info(self):
+        return {
+            'version': self.version,
+            'source': self.source,
+            'model_version': self.model_metadata['version'],
+            'creation_date': self.model_metadata['creation_date'],
+            'loaded_at': round(self.loaded_at, 3),
+        }
+
+
+def load_smoke_set(path):
+    """Smoke set JSON: list string email, atau list {"email": ..., "label": 0/1}."""
+    with open(path, encoding='utf-8') as f:
+        items = json.load(f)
+    emails = [item if isinstance(item, str) else item['email'] for item in items]
+    labels = [None if isinstance(item, str) else item.get('label') for item in items]
+    return emails, labels
+
+
+def validate_state(state, smoke_emails, smoke_labels=None, min_accuracy=None):
+    """
+    Panaskan dan validasi state dengan smoke set: jumlah fitur model cocok
+    dengan vocabulary + numeric_features, probabilitas berhingga di [0, 1]
+    dan (jika ada label) akurasi minimal `min_accuracy`.
+    """
+    n_features = len(state.tfidf.vocabulary_) + len(state.numeric_features)
+    booster = state.model.get_booster() if hasattr(state.model, 'get_booster') else state.model
+    if booster.num_features() != n_features:
+        raise ModelValidationError(
+            f"Model mengharapkan {booster.num_features()} fitur, featurizer menghasilkan {n_features}")
+
+    X_combined, _ = combine_batches(state.featurize(smoke_emails))
+    probabilities = state.engine.predict_proba(X_combined)
+    if probabilities.shape != (len(smoke_emails), 2):
+        raise ModelValidationError(f"Bentuk output predict_proba tidak valid: {probabilities.shape}")
+    if not np.all(np.isfinite(probabilities)) or probabilities.min() < 0 or probabilities.max() > 1:
+        raise ModelValidationError("Probabilitas smoke set di luar [0, 1] atau tidak berhingga")
+
+    if state.explainer is not None:
+        # Kontribusi + bias harus menjumlah ke margin yang sama dengan probabilitas engine
+        margins = state.explainer.contributions(X_combined).sum(axis=1, dtype=np.float64)
+        if not np.allclose(1 / (1 + np.exp(-margins)), probabilities[:, 1], atol=1e-4):
+            raise ModelValidationError("Kontribusi penjelasan tidak konsisten dengan probabilitas model")
+
+    labelled = [(p, label) for p, label in zip(probabilities[:, 1], smoke_labels or []) if label is not None]
+    if labelled and min_accuracy is not None:
+        accuracy = sum(int(p > 0.5) == int(label) for p, label in labelled) / len(labelled)
+        if accuracy < min_accuracy:
+            raise ModelValidationError(f"Akurasi smoke set {accuracy:.3f} di bawah batas {min_accuracy}")
+
+
+def load_model_state(model_dir, version, limits=None, feature_workers=None, shard_size=64, timed=False,
+                     smoke_emails=None, smoke_labels=None, min_accuracy=None, explain_method=None, explain_top_k=5,
+                     reputation=None):
+    """
+    Muat, panaskan dan validasi satu versi model; ModelValidationError jika gagal.
+    `explain_method` ('shap'/'approx') membuat ContributionExplainer; None tanpa explainer.
+    `reputation` (DomainReputation) opsional untuk fitur pengirim.
+    """
+    try:
+        components = load_model_components(model_dir)
+        featurizer = Featurizer(components.tfidf, components.numeric_features, limits, components.stop_words,
+                                reputation)
+        engine = create_engine(components.model)
+        explainer = None
+        if explain_method is not None:
+            explainer = ContributionExplainer(components.model, components.tfidf, components.numeric_features,
+                                              explain_method, explain_top_k)
+    except Exception as e:
+        raise ModelValidationError(f"Gagal memuat model {version} dari {model_dir}: {e}") from e
+
+    feature_pool = None
+    if resolve_workers(feature_workers) > 1:
+        feature_pool = ParallelFeaturizer(featurize_worker_shard, feature_workers, shard_size,
+                                          initializer=init_feature_worker, initargs=(model_dir, limits, timed, reputation))
+    state = ModelState(version, model_dir, components, featurizer, engine, feature_pool, explainer)
+    try:
+        if feature_pool is not None:
+            feature_pool.warm_up()
+        validate_state(state, SMOKE_EMAILS if smoke_emails is None else smoke_emails, smoke_labels, min_accuracy)
+    except Exception as e:
+        state.close()
+        if isinstance(e, ModelValidationError):
+            raise
+        raise ModelValidationError(f"Smoke test model {version} gagal: {e}") from e
+    return state
+
+
+# === HOT-SWAP ===
+class ModelHolder:
+    """
+    Referensi ke ModelState aktif dengan penukaran atomik.
+
+    `loader(version)` memuat + memvalidasi satu versi (None: versi dari
+    registry/direktori model). Dengan registry dan `watch_interval` > 0,
+    thread watcher (dibuat saat acquire pertama di setiap proses) memeriksa
+    CURRENT dan memuat versi baru di background.
+    """
+
+    def __init__(self, loader, registry=None, watch_interval=0, on_swap=None):
+        self._loader = loader
+        self.registry = registry
+        self.watch_interval = watch_interval
+        # on_swap(state) dipanggil setelah state baru aktif (mis. invalidasi cache)
+        self.on_swap = on_swap
+        self.current = None
+        self._state_lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._watcher_lock = threading.Lock()
+        self._watcher = None
+        self._watcher_pid = None
+        self._failed_version = None
+        self._draining = set()
+        self.swaps = 0
+        self.failures = 0
+        self.last_error = None
+
+    def _target_version(self):
+        return self.registry.current() if self.registry is not None else None
+
+    def start(self):
+        """Muat versi awal secara sinkron (saat import app); error di sini menggagalkan startup."""
+        self._activate(self._loader(self._target_version()))
+        return self.current
+
+    @contextmanager
+    def acquire(self):
+        """Pegang state aktif selama satu request; state lama tidak ditutup sebelum dilepas."""
+        self._ensure_watcher()
+        with self._state_lock:
+            state = self.current
+            state.active += 1
+        try:
+            yield state
+        finally:
+            with self._state_lock:
+                state.active -= 1
+                drained = state.retired and state.active == 0
+                if drained:
+                    self._draining.discard(state)
+            if drained:
+                state.close()
+
+    def reload(self, version=None, activate=False):
+        """
+        Muat `version` (None: CURRENT di registry atau direktori model) di
+        thread pemanggil lalu tukar. Dengan activate=True versi juga
+        ditulis ke CURRENT setelah lolos validasi, sehingga worker lain ikut.
+        Kembalikan state yang baru aktif.
+        """
+        with self._reload_lock:
+            target = version if version is not None else self._target_version()
+            try:
+                state = self._loader(target)
+            except ModelValidationError as e:
+                self.failures += 1
+                self.last_error = str(e)
+                self._failed_version = target
+                raise
+            if activate and self.registry is not None:
+                self.registry.activate(state.version)
+            self._activate(state)
+            return state
+
+    def _activate(self, state):
+        with self._state_lock:
+            previous, self.current = self.current, state
+            drained = False
+            if previous is not None:
+                previous.retired = True
+                drained = previous.active == 0
+                if not drained:
+                    self._draining.add(previous)
+        if previous is not None:
+            self.swaps += 1
+        self._failed_version = None
+        self.last_error = None
+        if drained:
+            previous.close()
+        if self.on_swap is not None:
+            self.on_swap(state)
+
+    def _ensure_watcher(self):
+        # Thread tidak ikut ter-fork: setiap proses worker memulai watcher-nya sendiri
+        if self.registry is None or self.watch_interval <= 0 or self._watcher_pid == os.getpid():
+            return
+        with self._watcher_lock:
+            if self._watcher_pid != os.getpid():
+                self._watcher_pid = os.getpid()
+                self._watcher = threading.Thread(target=self._watch, name='model-watcher', daemon=True)
+                self._watcher.start()
+
+    def _watch(self):
+        while True:
+            time.sleep(self.watch_interval)
+            try:
+                target = self.registry.current()
+                if target is None or target == self.current.version or target == self._failed_version:
+                    continue
+                self.reload(target)
+                print(f"Model {target} aktif (hot-swap)")
+            except Exception as e:
+                # Versi gagal tidak dicoba ulang sampai CURRENT berubah lagi; versi lama tetap melayani
+                print(f"Hot-swap model gagal: {e}")
+                if not isinstance(e, ModelValidationError):
+                    print(traceback.format_exc())
+
+    def close(self):
+        with self._state_lock:
+            states = [self.current, *self._draining]
+        for state in states:
+            if state is not None:
+                state.close()
+
+    def stats(self):
+        with self._state_lock:
+            draining = [state.version for state in self._draining]
+            current = self.current
+        return {
+            **(current.info() if current is not None else {}),
+            'registry': self.registry.root if self.registry is not None else None,
+            'watch_interval_seconds': self.watch_interval if self.registry is not None else 0,
+            'swaps': self.swaps,
+            'failures': self.failures,
+            'last_error': self.last_error,
+            'draining': draining,
+        }
+
+
+# === MAIN ===
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Registry model berversi')
+    parser.add_argument('--registry', default=os.environ.get('MODEL_REGISTRY', 'model_registry'))
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    publish_parser = subparsers.add_parser('publish', help='salin artefak export notebook sebagai versi baru')
+    publish_parser.add_argument('model_dir')
+    publish_parser.add_argument('--version', required=True)
+    publish_parser.add_argument('--activate', action='store_true', help='langsung aktifkan setelah lolos validasi')
+    activate_parser = subparsers.add_parser('activate', help='validasi lalu jadikan versi aktif (CURRENT)')
+    activate_parser.add_argument('version')
+    subparsers.add_parser('list', help='daftar versi')
+    args = parser.parse_args()
+
+    registry = ModelRegistry(args.registry)
+    if args.command == 'list':
+        current = registry.current()
+        for version in registry.versions():
+            print(f"{'*' if version == current else ' '} {version}")
+    else:
+        if args.command == 'publish':
+            print(f"Versi disalin ke {registry.publish(args.model_dir, args.version)}")
+        version = args.version
+        if args.command == 'activate' or args.activate:
+            # Validasi di sini dulu agar CURRENT tidak pernah menunjuk ke versi yang rusak
+            load_model_state(registry.version_dir(version), version).close()
+            registry.activate(version)
+            print(f"Versi aktif: {version}")
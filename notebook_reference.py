@@ -0,0 +1,541 @@
+"""
+Salinan harfiah fungsi ekstraksi fitur dari notebook training
+(ML_MakanNasi_TuPok1.ipynb pada commit baseline, sel 2-5), sebelum
+featurization dipindah ke paket featurizer.
+
+Dipakai parity_check.py sebagai acuan golden: featurizer dibandingkan dengan
+kode yang benar-benar dipakai saat model dilatih, bukan dengan dirinya
+sendiri. Jangan diubah; jika notebook training berubah, salin ulang fungsi
+dari notebook lalu jalankan `python parity_check.py --update`.
+"""
+import re
+
+from nltk.corpus import stopwords
+
+# advanced_sender_analysis di notebook membaca global `legitimate_domains` yang
+# tidak didefinisikan di sel mana pun; nilainya sama dengan daftar di
+# extract_sender_features (dan di advanced_sender_analysis app.py baseline)
+legitimate_domains = [
+    'paypal.com', 'amazon.com', 'microsoft.com', 'apple.com', 'google.com',
+    'facebook.com', 'instagram.com', 'twitter.com', 'linkedin.com',
+    'ebay.com', 'netflix.com', 'spotify.com', 'adobe.com',
+    'dropbox.com', 'slack.com', 'zoom.us', 'salesforce.com'
+]
+
+
+def enhanced_preprocess_combined_text(text):
+    # Ekstraksi komponen penting
+    date_pattern = r'\w{3}\s\w{3}\s\d{1,2}\s\d{4}'
+    sender_pattern = r'[\w\.-]+@[\w\.-]+\.\w+'
+
+    # Ekstraksi tanggal
+    date_match = re.search(date_pattern, text)
+    extracted_date = date_match.group(0) if date_match else ""
+
+    # Ekstraksi pengirim
+    sender_match = re.search(sender_pattern, text)
+    extracted_sender = sender_match.group(0) if sender_match else ""
+
+    # Bersihkan teks dengan penanganan khusus untuk phishing
+    clean_text = re.sub(date_pattern, '', text)
+    clean_text = re.sub(sender_pattern, '', clean_text)
+
+    # Normalisasi karakter evasi
+    clean_text = clean_text.replace('â€', "'")
+    clean_text = clean_text.replace('â€œ', '"')
+    clean_text = clean_text.replace('â€˜', "'")
+
+    # Hapus pola attachment
+    clean_text = re.sub(r'see attached file', '', clean_text, flags=re.IGNORECASE)
+
+    # Hapus karakter khusus tapi pertahankan tanda baca penting
+    clean_text = re.sub(r'[^\w\s\.\!\?]', '', clean_text)
+
+    # Lowercase
+    clean_text = clean_text.lower()
+
+    # Hapus stopwords
+    stop_words = set(stopwords.words('english'))
+    clean_text = ' '.join([word for word in clean_text.split() if word not in stop_words])
+
+    return clean_text, extracted_date, extracted_sender
+
+
+def extract_phishing_features(text):
+    features = {}
+
+    # 1. Suspicious Keywords (diperluas)
+    phishing_keywords = [
+        'urgent', 'immediate', 'action required', 'verify your account',
+        'suspended', 'limited time', 'click here', 'update now',
+        'confirm', 'security alert', 'unusual sign-in', 'locked account',
+        'billing issue', 'payment failed', 'account locked', 'verify identity',
+        'secure your account', 'unauthorized access', 'expiring today',
+        'act now', 'limited offer', 'exclusive deal', 'confirm immediately'
+    ]
+    features['suspicious_keyword_count'] = sum(1 for keyword in phishing_keywords if keyword in text.lower())
+
+    # 2. Realistic Suspicious Domains
+    legitimate_short_domains = ['bit.ly', 't.co', 'goo.gl', 'ow.ly', 'buff.ly', 'mcaf.ee']
+    suspicious_short_domains = [
+        'tinyurl.com', 'short.url', 'tiny.cc', 'is.gd', 'adf.ly',
+        'vzturl.com', 'cli.re', 'q.gs', 'u.to', 'yourl.io', 'po.st'
+    ]
+
+    features['has_legitimate_short_domain'] = 1 if any(domain in text.lower() for domain in legitimate_short_domains) else 0
+    features['has_suspicious_short_domain'] = 1 if any(domain in text.lower() for domain in suspicious_short_domains) else 0
+
+    # Deteksi typosquatting
+    legitimate_domains = ['paypal.com', 'amazon.com', 'microsoft.com', 'apple.com', 'google.com']
+    features['has_typosquatting'] = 0
+
+    for domain in legitimate_domains:
+        if domain in text.lower():
+            typo_variations = [
+                domain.replace('.com', '.co'),
+                domain.replace('.com', '.org'),
+                domain.replace('a', '4'), domain.replace('i', '1'),
+                domain.replace('o', '0'), domain.replace('l', '1'),
+                domain.replace('m', 'rn'), domain.replace('n', 'rn')
+            ]
+            if any(typo in text.lower() for typo in typo_variations):
+                features['has_typosquatting'] = 1
+                break
+
+    # Deteksi IP address sebagai URL
+    ip_pattern = r'https?://\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}'
+    features['has_ip_url'] = 1 if re.search(ip_pattern, text) else 0
+
+    # 3. Advanced Capital Word Analysis
+    words = text.split()
+    if words:
+        capital_words = [word for word in words if word.isupper() and len(word) > 1]
+        features['capital_word_ratio'] = len(capital_words) / len(words)
+
+        sentences = re.split(r'[.!?]+', text)
+        all_caps_sentences = sum(1 for sentence in sentences if sentence.strip() and sentence.strip().isupper())
+        features['all_caps_sentences_ratio'] = all_caps_sentences / max(len(sentences), 1)
+
+        # Deteksi kapital tidak wajar
+        brands = ['paypal', 'amazon', 'microsoft', 'apple', 'google', 'facebook']
+        acronyms = ['ID', 'URL', 'HTML', 'PDF', 'CEO', 'CFO']
+        unusual_capitals = 0
+
+        for i, word in enumerate(words):
+            if word.isupper() and len(word) > 1:
+                if i == 0 or words[i-1].endswith(('.', '!', '?')):
+                    continue
+                if word.lower() in brands or word in acronyms:
+                    continue
+                unusual_capitals += 1
+
+        features['unusual_capital_ratio'] = unusual_capitals / len(words)
+    else:
+        features['capital_word_ratio'] = 0
+        features['all_caps_sentences_ratio'] = 0
+        features['unusual_capital_ratio'] = 0
+
+    # 4. Advanced Exclamation Analysis
+    exclamation_count = text.count('!')
+    features['exclamation_count'] = exclamation_count
+    features['exclamation_ratio'] = exclamation_count / max(len(text), 1)
+    features['excessive_exclamation'] = 1 if exclamation_count > 5 else 0
+
+    consecutive_exclamation = len(re.findall(r'!{3,}', text))
+    features['consecutive_exclamation'] = consecutive_exclamation
+
+    exclamation_positions = [i for i, char in enumerate(text) if char == '!']
+    if exclamation_positions:
+        mid_sentence_exclamations = 0
+        for pos in exclamation_positions:
+            if pos + 1 < len(text) and text[pos+1] not in ['.', ' ', '\n']:
+                mid_sentence_exclamations += 1
+        features['mid_sentence_exclamation_ratio'] = mid_sentence_exclamations / len(exclamation_positions)
+    else:
+        features['mid_sentence_exclamation_ratio'] = 0
+
+    # 5. Urgency & Time Pressure
+    urgency_words = ['urgent', 'immediately', 'asap', 'hurry', 'fast', 'quick', 'now', 'today', 'soon']
+    features['urgency_word_count'] = sum(1 for word in urgency_words if word in text.lower())
+
+    time_limit_keywords = ['24 hours', '48 hours', 'by tomorrow', 'today only', 'expires today']
+    features['has_time_limit'] = 1 if any(keyword in text.lower() for keyword in time_limit_keywords) else 0
+
+    # 6. Personal Information Request
+    personal_info_keywords = [
+        'ssn', 'social security', 'credit card', 'bank account',
+        'password', 'pin', 'cvv', 'account number', 'card number',
+        'expiration date', 'security code', 'routing number'
+    ]
+    features['personal_info_request'] = 1 if any(keyword in text.lower() for keyword in personal_info_keywords) else 0
+
+    # 7. Threatening Language
+    threat_keywords = ['suspend', 'terminate', 'close', 'deactivate', 'block', 'restrict', 'penalty', 'fee', 'fine']
+    features['has_threat'] = 1 if any(keyword in text.lower() for keyword in threat_keywords) else 0
+
+    # 8. Generic & Personalization Analysis
+    generic_greetings = ['dear customer', 'dear user', 'dear sir/madam', 'valued customer', 'account holder']
+    features['has_generic_greeting'] = 1 if any(greeting in text.lower() for greeting in generic_greetings) else 0
+
+    personalization_placeholders = ['[name]', '[email]', '[customer]', '[user]']
+    features['has_personalization_placeholder'] = 1 if any(ph in text.lower() for ph in personalization_placeholders) else 0
+
+    # 9. Brand Mentions Analysis
+    brands = ['paypal', 'amazon', 'microsoft', 'apple', 'google', 'facebook', 'instagram']
+    brand_mentions = [brand for brand in brands if brand in text.lower()]
+    features['brand_mention_count'] = len(brand_mentions)
+
+    features['inconsistent_brand_mention'] = 0
+    if brand_mentions:
+        for brand in brand_mentions:
+            suspicious_variations = [
+                brand + 'support', brand + 'security', brand + 'team',
+                brand + 'update', brand + 'alert', brand + 'notice'
+            ]
+            if any(variation in text.lower() for variation in suspicious_variations):
+                features['inconsistent_brand_mention'] = 1
+                break
+
+    # 10. Spelling Errors
+    common_misspellings = {
+        'paypaI': 'paypal', 'appIe': 'apple', 'microsft': 'microsoft',
+        'amaz0n': 'amazon', 'g00gle': 'google', 'faceb00k': 'facebook',
+        'verifye': 'verify', 'securty': 'security', 'acount': 'account'
+    }
+    misspelling_count = sum(1 for misspelling in common_misspellings if misspelling in text.lower())
+    features['spelling_errors_count'] = misspelling_count
+
+    # 11. HTML & Technical Content
+    html_tags = ['<html', '<div', '<table', '<form', '<script', '<iframe']
+    features['has_html_content'] = 1 if any(tag in text.lower() for tag in html_tags) else 0
+
+    features['has_form_submission'] = 1 if '<form' in text.lower() and 'action=' in text.lower() else 0
+    features['has_javascript'] = 1 if 'javascript:' in text.lower() or '<script' in text.lower() else 0
+    features['has_tracking_pixel'] = 1 if any(pixel in text.lower() for pixel in [
+        'tracking pixel', 'open tracking', 'read receipt'
+    ]) else 0
+    features['has_unsubscribe_link'] = 1 if 'unsubscribe' in text.lower() else 0
+
+    # 12. Link Analysis
+    url_pattern = r'https?://[^\s]+'
+    urls = re.findall(url_pattern, text)
+    features['url_count'] = len(urls)
+
+    misleading_anchors = ['click here', 'verify now', 'update account', 'sign in']
+    features['has_misleading_link'] = 0
+
+    for anchor in misleading_anchors:
+        if anchor in text.lower():
+            anchor_pos = text.lower().find(anchor)
+            text_after_anchor = text[anchor_pos + len(anchor):anchor_pos + len(anchor) + 100]
+            if re.search(url_pattern, text_after_anchor):
+                features['has_misleading_link'] = 1
+                break
+
+    # 13. Behavioral Analysis
+    features['multiple_redirects'] = 1 if len(urls) > 3 else 0
+    features['shortened_url_only'] = 1 if (
+        bool(re.search(r'\b(bit\.ly|t\.co|goo\.gl)\b', text)) and len(urls) == 1
+    ) else 0
+    features['image_only_text'] = 1 if (
+        len(re.findall(r'\.(jpg|jpeg|png|gif)', text.lower())) > 0 and len(text.split()) < 20
+    ) else 0
+
+    # 14. Social Engineering Analysis
+    features['authority_impersonation'] = 1 if any(impersonation in text.lower() for impersonation in [
+        'fbi', 'cia', 'irs', 'police', 'government', 'bank', 'court'
+    ]) else 0
+
+    features['scarcity_tactic'] = 1 if any(scarcity in text.lower() for scarcity in [
+        'only 2 left', 'last chance', 'almost gone', 'running out'
+    ]) else 0
+
+    features['social_proof'] = 1 if any(proof in text.lower() for proof in [
+        'trusted by millions', 'used by fortune 500', 'recommended by experts'
+    ]) else 0
+
+    # 15. Psychological Triggers
+    fear_words = ['hack', 'breach', 'compromised', 'stolen', 'fraud', 'suspended']
+    features['fear_intensity'] = sum(1 for fear in fear_words if fear in text.lower())
+
+    greed_words = ['free', 'win', 'prize', 'reward', 'discount', 'bonus']
+    features['greed_trigger'] = sum(1 for greed in greed_words if greed in text.lower())
+
+    curiosity_words = ['see what happened', 'you won\'t believe', 'shocking discovery']
+    features['curiosity_trigger'] = sum(1 for curiosity in curiosity_words if curiosity in text.lower())
+
+    # 16. Action Requests
+    action_keywords = ['click', 'verify', 'update', 'confirm', 'sign in', 'log in', 'download']
+    features['action_request_count'] = sum(1 for keyword in action_keywords if keyword in text.lower())
+
+    # 17. Security Claims
+    security_claims = ['secure', 'encrypted', 'protected', 'safe', 'trusted']
+    features['security_claim_count'] = sum(1 for claim in security_claims if claim in text.lower())
+
+    # 18. Attachment Analysis
+    suspicious_extensions = ['.exe', '.zip', '.scr', '.bat', '.js', '.docm']
+    features['has_suspicious_attachment'] = 1 if any(ext in text.lower() for ext in suspicious_extensions) else 0
+
+    # 19. Contact Information
+    suspicious_contact = [
+        'call now', 'contact immediately', 'urgent call', 'phone verification',
+        'verify by phone', 'confirm by call'
+    ]
+    features['has_suspicious_contact'] = 1 if any(contact in text.lower() for contact in suspicious_contact) else 0
+
+    # 20. Contextual Analysis
+    features['mentions_recent_events'] = 1 if any(event in text.lower() for event in [
+        'covid', 'pandemic', 'election', 'holiday', 'black friday'
+    ]) else 0
+
+    features['seasonal_reference'] = 1 if any(season in text.lower() for season in [
+        'christmas', 'thanksgiving', 'new year', 'summer', 'winter'
+    ]) else 0
+
+    # 21. Sender Analysis
+    features['sender_content_mismatch'] = 0
+    if 'paypal' in text.lower() and 'paypal' not in text.lower():
+        features['sender_content_mismatch'] = 1
+
+    return features
+
+
+def extract_url_features(text):
+    url_pattern = r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+'
+    urls = re.findall(url_pattern, text)
+
+    features = {}
+    features['url_count'] = len(urls)
+
+    if urls:
+        features['has_url_masking'] = 1 if any('bit.ly' in url or 'tinyurl' in url for url in urls) else 0
+        features['has_homograph'] = 1 if any(
+            re.search(r'[āàáâãäåæçćčđēėęěğįıñňöőŕřśšşťțůűųźžż]', url)
+            for url in urls
+        ) else 0
+    else:
+        features['has_url_masking'] = 0
+        features['has_homograph'] = 0
+
+    return features
+
+
+def extract_brand_features(text):
+    brands = ['paypal', 'amazon', 'microsoft', 'apple', 'google', 'facebook', 'instagram']
+    features = {}
+
+    for brand in brands:
+        features[f'has_{brand}'] = 1 if brand in text.lower() else 0
+
+    brand_spoofing = [
+        'paypaI', 'arnazon', 'microsft', 'appIe', 'goggle',
+        'faceboook', 'instagrarn'
+    ]
+    features['has_brand_spoofing'] = 1 if any(spoof in text.lower() for spoof in brand_spoofing) else 0
+
+    return features
+
+
+def extract_sender_features(sender_email):
+    features = {}
+
+    if '@' not in sender_email:
+        features['sender_domain'] = 'unknown'
+        features['is_free_email'] = 0
+        features['is_legitimate_domain'] = 0
+        features['is_new_domain'] = 0
+        features['domain_age_days'] = -1
+        return features
+
+    # Ekstrak domain
+    domain = sender_email.split('@')[-1].lower().strip()
+    features['sender_domain'] = domain
+
+    # Cek apakah domain adalah email gratis
+    free_email_domains = ['gmail.com', 'yahoo.com', 'hotmail.com', 'outlook.com',
+                         'aol.com', 'icloud.com', 'protonmail.com', 'zoho.com']
+    features['is_free_email'] = 1 if domain in free_email_domains else 0
+
+    # Daftar domain resmi perusahaan besar (bisa diperluas)
+    legitimate_domains = [
+        'paypal.com', 'amazon.com', 'microsoft.com', 'apple.com', 'google.com',
+        'facebook.com', 'instagram.com', 'twitter.com', 'linkedin.com',
+        'ebay.com', 'netflix.com', 'spotify.com', 'adobe.com',
+        'dropbox.com', 'slack.com', 'zoom.us', 'salesforce.com'
+    ]
+    features['is_legitimate_domain'] = 1 if domain in legitimate_domains else 0
+
+    # Deteksi domain yang baru dibuat (kurang dari 6 bulan)
+
+    new_domain_indicators = [
+        '.tk', '.ml', '.ga', '.cf', '.gq',  # TLD gratis yang sering disalahgunakan
+        '-shop', '-store', '-service', '-secure',  # Kata kunci domain mencurigakan
+        'shop-', 'store-', 'service-', 'secure-'
+    ]
+    features['is_new_domain'] = 1 if (
+        any(tld in domain for tld in ['.tk', '.ml', '.ga', '.cf', '.gq']) or
+        any(indicator in domain for indicator in new_domain_indicators)
+    ) else 0
+
+    # Simulasi umur domain (dalam hari)
+    # Dalam implementasi nyata, gunakan API WHOIS
+    if features['is_new_domain']:
+        features['domain_age_days'] = 30  # Simulasi domain baru (30 hari)
+    elif features['is_legitimate_domain']:
+        features['domain_age_days'] = 3650  # Simulasi domain lama (10 tahun)
+    else:
+        features['domain_age_days'] = 365  # Simulasi domain menengah (1 tahun)
+
+    return features
+
+
+def extract_file_extension_features(text):
+    features = {}
+
+    # Daftar ekstensi file yang mencurigakan
+    suspicious_extensions = {
+        # Eksekusi
+        'executable': ['.exe', '.scr', '.bat', '.com', '.pif', '.cmd', '.msi', '.jar'],
+        # Script
+        'script': ['.js', '.vbs', '.ps1', '.py', '.pl', '.rb', '.php', '.asp', '.jsp'],
+        # Macro
+        'macro': ['.docm', '.xlsm', '.pptm', '.dotm', '.xltm', '.potm'],
+        # Arsip
+        'archive': ['.zip', '.rar', '.7z', '.tar', '.gz', '.bz2'],
+        # Sistem
+        'system': ['.dll', '.sys', '.drv', '.ocx', '.cpl', '.deb', '.rpm'],
+        # Lainnya
+        'other': ['.reg', '.inf', '.iso', '.dmg', '.app', '.apk', '.deb']
+    }
+
+    # Deteksi ekstensi file dalam teks
+    detected_extensions = []
+    for category, extensions in suspicious_extensions.items():
+        for ext in extensions:
+            if ext.lower() in text.lower():
+                detected_extensions.append(ext)
+
+    # Fitur dasar
+    features['has_suspicious_extension'] = 1 if detected_extensions else 0
+    features['suspicious_extension_count'] = len(detected_extensions)
+
+    # Fitur kategori
+    for category, extensions in suspicious_extensions.items():
+        features[f'has_{category}_extension'] = 1 if any(ext in text.lower() for ext in extensions) else 0
+
+    # Fitur tingkat bahaya
+    high_risk_extensions = ['.exe', '.scr', '.bat', '.js', '.docm', '.xlsm']
+    features['has_high_risk_extension'] = 1 if any(ext in text.lower() for ext in high_risk_extensions) else 0
+
+    # Deteksi multiple ekstensi (misal: file.exe.zip)
+    multiple_ext_pattern = r'\.\w+\.\w+'
+    features['has_multiple_extensions'] = 1 if re.search(multiple_ext_pattern, text.lower()) else 0
+
+    # Deteksi ekstensi tersembunyi (misal: file.jpg.exe)
+    hidden_ext_pattern = r'\.(jpg|jpeg|png|gif|pdf|txt|doc|xls)\.(exe|scr|bat|js)'
+    features['has_hidden_extension'] = 1 if re.search(hidden_ext_pattern, text.lower()) else 0
+
+    # Deteksi ekstensi yang disamarkan
+    disguised_ext_patterns = [
+        r'\.ex[e3]',  # exe, ex3
+        r'\.sc[r7]',  # scr, sc7
+        r'\.ba[t2]',  # bat, ba2
+        r'\.js[a-z0-9]'  # jsa, js1, js2, dll.
+    ]
+    features['has_disguised_extension'] = 1 if any(re.search(pattern, text.lower()) for pattern in disguised_ext_patterns) else 0
+
+    return features
+
+
+def advanced_sender_analysis(sender_email, text_content):
+    features = {}
+
+    # Deteksi ketidaksesuaian antara pengirim dan konten
+    brand_sender_mapping = {
+        'paypal.com': ['paypal', 'ebay'],
+        'amazon.com': ['amazon', 'aws'],
+        'microsoft.com': ['microsoft', 'windows', 'office', 'outlook'],
+        'apple.com': ['apple', 'icloud', 'itunes', 'iphone'],
+        'google.com': ['google', 'gmail', 'youtube', 'android'],
+        'facebook.com': ['facebook', 'instagram', 'whatsapp'],
+        'twitter.com': ['twitter', 'tweet'],
+        'linkedin.com': ['linkedin']
+    }
+
+    # Ekstrak domain pengirim
+    if '@' in sender_email:
+        sender_domain = sender_email.split('@')[-1].lower()
+
+        # Cek apakah konten menyebut merek yang tidak sesuai dengan domain
+        features['sender_content_mismatch'] = 0
+
+        for domain, brands in brand_sender_mapping.items():
+            if sender_domain == domain:
+                # Cek apakah ada merek lain yang disebut
+                other_brands = [brand for brand in brands if brand not in text_content.lower()]
+                if other_brands:
+                    # Cek apakah ada merek pesaing yang disebut
+                    competitor_brands = [
+                        'paypal', 'amazon', 'microsoft', 'apple', 'google',
+                        'facebook', 'twitter', 'linkedin'
+                    ]
+                    for brand in competitor_brands:
+                        if brand in text_content.lower() and brand not in brands:
+                            features['sender_content_mismatch'] = 1
+                            break
+                break
+
+        # Deteksi impersonasi (pengirim mengaku sebagai perusahaan lain)
+        impersonation_keywords = [
+            'security team', 'support team', 'customer service', 'billing department',
+            'account department', 'verification team', 'fraud department'
+        ]
+
+        for keyword in impersonation_keywords:
+            if keyword in text_content.lower() and sender_domain not in legitimate_domains:
+                features['sender_impersonation'] = 1
+                break
+        else:
+            features['sender_impersonation'] = 0
+    else:
+        features['sender_content_mismatch'] = 0
+        features['sender_impersonation'] = 0
+
+    return features
+
+
+def extract_email_security_features(text):
+    features = {}
+
+    # Deteksi klaim keamanan berlebihan
+    security_claims = [
+        '100% secure', 'completely safe', 'guaranteed secure',
+        'bank-level security', 'military-grade encryption',
+        'end-to-end encrypted', 'ssl secured', 'https secured'
+    ]
+    features['excessive_security_claims'] = sum(1 for claim in security_claims if claim in text.lower())
+
+    # Deteksi permintaan verifikasi yang mencurigakan
+    verification_requests = [
+        'verify your account', 'verify your identity', 'verify now',
+        'confirm your account', 'confirm your identity', 'confirm now',
+        'validate your account', 'validate your identity'
+    ]
+    features['suspicious_verification_request'] = sum(1 for request in verification_requests if request in text.lower())
+
+    # Deteksi permintaan informasi sensitif
+    sensitive_info_requests = [
+        'provide your password', 'enter your pin', 'input your cvv',
+        'send your card number', 'share your ssn', 'disclose your account details'
+    ]
+    features['sensitive_info_request'] = sum(1 for request in sensitive_info_requests if request in text.lower())
+
+    # Deteksi ancaman akun
+    account_threats = [
+        'account will be suspended', 'account will be closed',
+        'account will be terminated', 'account will be blocked',
+        'your account is at risk', 'your account has been compromised'
+    ]
+    features['account_threat_count'] = sum(1 for threat in account_threats if threat in text.lower())
+
+    return features
@@ -0,0 +1,69 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+
+def resolve_workers(workers=None):
+    """Jumlah worker: argumen, lalu env FEATURE_WORKERS; 0 berarti semua core."""
+    if workers is None:
+        workers = int(os.environ.get('FEATURE_WORKERS', 1))
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+    return workers
+
+
+def split_shards(items, shard_size):
+    return [items[i:i + shard_size] for i in range(0, len(items), shard_size)]
+
+
+class ParallelFeaturizer:
+    """
+    Menjalankan fungsi featurization per shard di pool proses.
+
+    `shard_func` harus fungsi level modul (bisa di-pickle) yang menerima list
+    email dan mengembalikan blok hasil yang ringkas (matriks numerik/sparse).
+    Worker dibuat sekali dan dipakai ulang, sehingga tabel kata kunci dan regex
+    hanya dimuat sekali per worker. Urutan hasil selalu sama dengan urutan input.
+    """
+
+    def __init__(self, shard_func, workers=None, shard_size=64, initializer=None, initargs=()):
+        self.shard_func = shard_func
+        self.workers = resolve_workers(workers)
+        self.shard_size = shard_size
+        self._initializer = initializer
+        self._initargs = initargs
+        self._executor = None
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=self._initializer,
+                initargs=self._initargs
+            )
+        return self._executor
+
+    def map(self, items):
+        shards = split_shards(list(items), self.shard_size)
+
+        # Jalur serial: tanpa overhead pickling untuk satu worker / satu shard
+        if self.workers <= 1 or len(shards) <= 1:
+            return [self.shard_func(shard) for shard in shards]
+
+        return list(self._get_executor().map(self.shard_func, shards))
+
+    def warm_up(self):
+        # Jalankan semua worker lebih dulu agar startup tidak ikut terukur
+        if self.workers > 1:
+            executor = self._get_executor()
+            list(executor.map(self.shard_func, [[] for _ in range(self.workers)]))
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
@@ -0,0 +1,484 @@
+"""
+Harness paritas fitur antara notebook training dan semua jalur serving.
+
+Korpus email sintetis yang tetap (golden/corpus.json) dijalankan melalui
+setiap jalur featurization. Untuk setiap jalur, matriks TF-IDF dan setiap
+kolom numeric_features dibandingkan dengan output golden yang dibekukan
+(golden/features.npz). Perbedaan sekecil apa pun dilaporkan per fitur dan
+membuat script keluar dengan status 1.
+
+Setelah itu setiap engine inferensi dibandingkan dengan
+XGBClassifier.predict_proba pada fitur korpus golden dan pada baris acak,
+regex yang ditulis ulang agar linear dibandingkan dengan pola notebook
+pada string acak, dan TF-IDF langsung (featurizer.vectorizer) dibandingkan
+dengan tfidf.transform sklearn pada dokumen acak.
+
+Contoh:
+    python parity_check.py                # bandingkan semua jalur dengan golden
+    python parity_check.py --update       # bekukan ulang golden dari salinan fungsi notebook
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sys
+
+import joblib
+import numpy as np
+import pandas as pd
+from scipy.sparse import csr_matrix, vstack
+
+from featurizer import (
+    Featurizer,
+    combine_batches,
+    enhanced_preprocess_combined_text,
+    find_sender,
+    get_stop_words,
+    remove_senders,
+    set_stop_words,
+)
+from featurizer.extractors import MID_SENTENCE_EXCLAMATION, URL_PATTERN
+from inference import BoosterEngine, CompiledTreeEngine
+from model_bundle import default_bundle_path, load_bundle
+from parallel_features import ParallelFeaturizer
+import notebook_reference as notebook
+
+MODEL_DIR = 'phishing_detection_model'
+GOLDEN_DIR = 'golden'
+CORPUS_PATH = os.path.join(GOLDEN_DIR, 'corpus.json')
+FEATURES_PATH = os.path.join(GOLDEN_DIR, 'features.npz')
+BUNDLE_PATH = default_bundle_path(MODEL_DIR)
+
+tfidf = joblib.load(os.path.join(MODEL_DIR, 'tfidf_vectorizer.pkl'))
+numeric_features = joblib.load(os.path.join(MODEL_DIR, 'numeric_features.pkl'))
+featurizer = Featurizer(tfidf, numeric_features)
+
+
+# === KORPUS SINTETIS ===
+def build_corpus(seed=2024):
+    """Korpus deterministik yang menyentuh setiap keluarga fitur, termasuk kasus tepi."""
+    rng = random.Random(seed)
+    senders = ['', 'From: support@paypal.com ', 'From: alerts@paypa1-secure.tk ', 'From: alice@gmail.com ',
+               'From: it-team@company.co.id ', 'From: billing@amazon.com ', 'From: noreply@shop-deals.ml ']
+    dates = ['', 'Mon Jan 12 2024 ', 'Sat Mar 2 2024 ', 'Sun Oct 13 2024 ', 'Fri Feb 30 2024 ', 'abc def 12 2024 ']
+    bodies = [
+        "URGENT: Your PayPal account has been suspended! Verify your account immediately at "
+        "http://192.168.10.5/login or it will be closed. Dear Customer, click here https://bit.ly/x1",
+        "Hi team, see attached file for the quarterly report. The meeting moved to Friday. Thanks, Citra",
+        "Congratulations!!! You WIN a FREE prize. Claim your reward now: http://tinyurl.com/abc "
+        "Only 2 left, last chance! Send your card number and cvv. Enter your PIN!",
+        "<html><body><div><form action=\"http://evil.example/steal\"><script>javascript:alert(1)</script>"
+        "<table><tr><td>Open tracking pixel</td></tr></table><a href=\"https://example.com/unsubscribe\">"
+        "Unsubscribe</a></form></div></body></html>",
+        "Invoice.pdf.exe and report.doc.js attached. Also payroll.docm, tools.zip, setup.ex3 and script.js2.",
+        "Security team: your account will be blocked. 100% secure, bank-level security, ssl secured. "
+        "Confirm your identity now and provide your password to the fraud department.",
+        "Hello [name], your amazon order #12345 shipped. Track it at https://amazon.com/track?id=1 . "
+        "Black Friday deals this winter! Christmas discount bonus.",
+        "ALL CAPS SENTENCE HERE. ANOTHER ONE! mixed Case WORDS with PAYPAL and ID URL PDF CEO acronyms.",
+        "Visit https://gооgle.com/login (homograph) or https://pаypal.com. Microsft appIe paypaI g00gle "
+        "faceb00k acount securty verifye. paypalsupport team. amazon.co and paypal.org lookalikes.",
+        "Short note",
+        "image.png",
+        "Dear user, unusual sign-in detected. Call now for phone verification within 24 hours or pay the penalty fee.",
+        "Newsletter: trusted by millions, recommended by experts. Summer holiday election covid news. "
+        "See what happened, you won't believe this shocking discovery! Download now, sign in, log in.",
+        "Plain text with ümlauts, ßtraße, İstanbul, ñandú and emoji 🎉 — also â€œquotesâ€ and â€˜ticksâ€.",
+        "Data: " + "QUJDREVGR0hJSktMTU5PUFFSU1RVVldYWVo=" * 40,
+        "!!!Wow!!! wait! what!? end!",
+    ]
+    corpus = []
+    for sender in senders:
+        for body in bodies:
+            date = rng.choice(dates)
+            corpus.append(sender + date + body)
+    # Variasi huruf besar/kecil dan whitespace
+    for body in bodies:
+        corpus.append(body.upper())
+        corpus.append('\n\n  ' + body.replace(' ', '\t') + '  \r\n')
+    return corpus
+
+
+# === JALUR FEATURIZATION ===
+def notebook_path(emails):
+    """
+    Reproduksi featurization notebook training baseline (sel 2-8) dengan salinan
+    harfiah fungsi notebook (notebook_reference.py): apply per keluarga
+    fitur, hapus kolom duplikat (keep='last') lalu isi NaN.
+    """
+    df = pd.DataFrame({'text_combined': emails})
+    df[['cleaned_text', 'extracted_date', 'extracted_sender']] = df['text_combined'].apply(
+        lambda x: pd.Series(notebook.enhanced_preprocess_combined_text(x))
+    )
+    phishing_features = df['text_combined'].apply(lambda x: pd.Series(notebook.extract_phishing_features(x)))
+    df = pd.concat([df, phishing_features], axis=1)
+    url_features = df['text_combined'].apply(lambda x: pd.Series(notebook.extract_url_features(x)))
+    brand_features = df['text_combined'].apply(lambda x: pd.Series(notebook.extract_brand_features(x)))
+    df = pd.concat([df, url_features, brand_features], axis=1)
+
+    df['is_weekend'] = pd.to_datetime(df['extracted_date'], format='%a %b %d %Y', errors='coerce').dt.dayofweek >= 5
+    df['hour_sent'] = pd.to_datetime(df['extracted_date'], format='%a %b %d %Y', errors='coerce').dt.hour
+
+    sender_features = df['extracted_sender'].apply(lambda x: pd.Series(notebook.extract_sender_features(x)))
+    df = pd.concat([df, sender_features], axis=1)
+    df['text_length'] = df['cleaned_text'].str.split().str.len()
+    df['has_attachment'] = df['text_combined'].str.contains('attached file', case=False).astype(int)
+    extension_features = df['text_combined'].apply(lambda x: pd.Series(notebook.extract_file_extension_features(x)))
+    df = pd.concat([df, extension_features], axis=1)
+    advanced_sender = df.apply(
+        lambda row: pd.Series(notebook.advanced_sender_analysis(row['extracted_sender'], row['text_combined'])),
+        axis=1
+    )
+    df = pd.concat([df, advanced_sender], axis=1)
+    security_features = df['text_combined'].apply(lambda x: pd.Series(notebook.extract_email_security_features(x)))
+    df = pd.concat([df, security_features], axis=1)
+
+    df = df.loc[:, ~df.columns.duplicated(keep='last')]
+    for col in numeric_features:
+        if df[col].isna().any():
+            if col.startswith('has_') or col.endswith('_count'):
+                df[col] = df[col].fillna(0)
+            else:
+                df[col] = df[col].fillna(-1)
+
+    return csr_matrix(tfidf.transform(df['cleaned_text'])), df[numeric_features].values.astype(np.float64)
+
+
+def serving_batch_path(emails):
+    batch = featurizer.featurize_batch(emails)
+    return batch.tfidf, batch.numeric
+
+
+def serving_single_path(emails):
+    batches = [featurizer.featurize_batch([email]) for email in emails]
+    return vstack([b.tfidf for b in batches]).tocsr(), np.vstack([b.numeric for b in batches])
+
+
+def _parallel_shard(emails):
+    return featurizer.featurize_batch(emails)
+
+
+def parallel_path(emails):
+    with ParallelFeaturizer(_parallel_shard, workers=2, shard_size=16) as pool:
+        batches = pool.map(emails)
+    return vstack([b.tfidf for b in batches]).tocsr(), np.vstack([b.numeric for b in batches])
+
+
+def confirm_csv_path(emails):
+    import confirm_csv
+    batch = confirm_csv.extract_features_batch(emails)
+    return batch.tfidf, batch.numeric
+
+
+def bundle_path(emails):
+    """Featurizer dari bundle model (vocabulary, idf dan stopword dari bundle, bukan joblib/NLTK)."""
+    components = load_bundle(BUNDLE_PATH, MODEL_DIR)
+    previous = get_stop_words()
+    set_stop_words(components.stop_words)
+    try:
+        batch = Featurizer(components.tfidf, components.numeric_features).featurize_batch(emails)
+    finally:
+        set_stop_words(previous)
+    return batch.tfidf, batch.numeric
+
+
+def feature_store_path(emails):
+    """
+    Feature store retraining: bangun store, update kedua harus memakai ulang
+    semua baris, lalu matriks dari materialize (mmap) dibandingkan.
+    """
+    import tempfile
+    from feature_store import FeatureStore, TrainingFeatures
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store_dir, out_dir = os.path.join(tmp, 'store'), os.path.join(tmp, 'out')
+        FeatureStore(store_dir).update(emails, workers=2, shard_size=16, segment_rows=40)
+        store = FeatureStore(store_dir)
+        keys, stats = store.update(emails)
+        recomputed = {name: computed for name, (_, computed) in stats.items() if computed}
+        if recomputed:
+            print(f"[feature_store] update kedua menghitung ulang {recomputed}")
+            return csr_matrix((0, len(tfidf.vocabulary_))), np.full((len(emails), len(numeric_features)), np.nan)
+        store.materialize(keys, out_dir, numeric_features)
+        features = TrainingFeatures.open(out_dir)
+        return (csr_matrix(tfidf.transform(features.cleaned_text)),
+                np.array(features.numeric, dtype=np.float64))
+
+
+PATHS = {
+    'notebook': notebook_path,
+    'serving_batch': serving_batch_path,
+    'serving_single': serving_single_path,
+    'parallel': parallel_path,
+    'confirm_csv': confirm_csv_path,
+    'bundle': bundle_path,
+    'feature_store': feature_store_path,
+}
+
+
+# === PARITAS INFERENSI ===
+# engine -> (pembuat engine dari XGBClassifier, selisih absolut maksimum yang diizinkan)
+ENGINES = {
+    'booster': (BoosterEngine, 0.0),
+    'compiled': (CompiledTreeEngine.from_model, 1e-6),
+}
+
+
+def random_rows(X, n, seed=0):
+    """Baris CSR acak: kolom TF-IDF acak dan nilai numerik yang diambil dari kolom korpus."""
+    rng = np.random.default_rng(seed)
+    n_tfidf = X.shape[1] - len(numeric_features)
+    dense_numeric = X[:, n_tfidf:].toarray()
+    rows = np.zeros((n, X.shape[1]))
+    for i in range(n):
+        columns = rng.choice(n_tfidf, size=rng.integers(0, 40), replace=False)
+        rows[i, columns] = rng.random(len(columns))
+        rows[i, n_tfidf:] = dense_numeric[rng.integers(0, len(dense_numeric), len(numeric_features)),
+                                          np.arange(len(numeric_features))]
+    return csr_matrix(rows)
+
+
+def check_inference(corpus, engines):
+    model = joblib.load(os.path.join(MODEL_DIR, 'xgboost_phishing_model.pkl'))
+    X, _ = combine_batches([featurizer.featurize_batch(corpus)])
+    inputs = {'golden': X, 'random': random_rows(X, 2000)}
+
+    failed = False
+    for name in engines:
+        make_engine, tolerance = ENGINES[name]
+        engine = make_engine(model)
+        problems = []
+        for input_name, X_input in inputs.items():
+            expected = model.predict_proba(X_input)
+            got = engine.predict_proba(X_input)
+            # Batch 1 (jalur /predict) harus sama dengan batch penuh
+            single = np.vstack([engine.predict_proba(X_input[i]) for i in range(min(50, X_input.shape[0]))])
+            max_diff = max(np.abs(got - expected).max(), np.abs(single - got[:len(single)]).max())
+            if got.shape != expected.shape or max_diff > tolerance:
+                problems.append(f"{input_name}: max |diff| {max_diff:.3g} > toleransi {tolerance:g}")
+
+        print(f"[inference:{name}] {'OK' if not problems else 'MISMATCH'}")
+        for problem in problems:
+            print(f"    - {problem}")
+        failed |= bool(problems)
+    return failed
+
+
+# === REGEX LINEAR VS POLA NOTEBOOK ===
+NOTEBOOK_SENDER = r'[\w\.-]+@[\w\.-]+\.\w+'
+NOTEBOOK_URL = r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+'
+
+
+def notebook_preprocess(text):
+    # Salinan harfiah enhanced_preprocess_combined_text di notebook training
+    date_match = re.search(r'\w{3}\s\w{3}\s\d{1,2}\s\d{4}', text)
+    extracted_date = date_match.group(0) if date_match else ""
+    sender_match = re.search(NOTEBOOK_SENDER, text)
+    extracted_sender = sender_match.group(0) if sender_match else ""
+    clean_text = re.sub(r'\w{3}\s\w{3}\s\d{1,2}\s\d{4}', '', text)
+    clean_text = re.sub(NOTEBOOK_SENDER, '', clean_text)
+    clean_text = clean_text.replace('â€', "'")
+    clean_text = clean_text.replace('â€œ', '"')
+    clean_text = clean_text.replace('â€˜', "'")
+    clean_text = re.sub(r'see attached file', '', clean_text, flags=re.IGNORECASE)
+    clean_text = re.sub(r'[^\w\s\.\!\?]', '', clean_text)
+    clean_text = clean_text.lower()
+    stop_words = get_stop_words()
+    clean_text = ' '.join([word for word in clean_text.split() if word not in stop_words])
+    return clean_text, extracted_date, extracted_sender
+
+
+def notebook_mid_sentence_exclamations(text):
+    positions = [i for i, char in enumerate(text) if char == '!']
+    return sum(1 for pos in positions if pos + 1 < len(text) and text[pos+1] not in ['.', ' ', '\n'])
+
+
+# nama -> (implementasi notebook, implementasi serving)
+REGEX_CHECKS = {
+    'sender_search': (lambda t: (re.search(NOTEBOOK_SENDER, t) or [None])[0],
+                      lambda t: (find_sender(t) or [None])[0]),
+    'sender_sub': (lambda t: re.sub(NOTEBOOK_SENDER, '', t), remove_senders),
+    'url_findall': (lambda t: re.findall(NOTEBOOK_URL, t), URL_PATTERN.findall),
+    'mid_sentence_exclamation': (notebook_mid_sentence_exclamations,
+                                 lambda t: len(MID_SENTENCE_EXCLAMATION.findall(t))),
+    'preprocess': (notebook_preprocess, enhanced_preprocess_combined_text),
+}
+
+# Alfabet kecil yang kaya karakter batas pola (@ . - ! % spasi, unicode \w); sebagian besar string
+# memakai alfabet padat agar kasus seperti 'a@b.c-x@y.z' sering muncul. Alfabet terakhir
+# berisi huruf yang berubah atau cocok secara khusus saat lowercase/IGNORECASE
+FUZZ_ALPHABETS = ['aZ9_.-@!%/ \n\té٣()*,$&+:=?#', 'a.-@!', 'a.-@', 'abcXYZ İſKΣâ€œ˜@.- 1\n']
+# Potongan yang disisipkan ke sebagian string: awal URL, tanggal, pola attachment, evasi
+FUZZ_FRAGMENTS = ['http://', 'https://', 'Mon Jan 12 2024 ', 'x@Tue Feb 3 2024y.com', 'SEE Attached file',
+                  'ſee attached file', 'â€œ', 'the and invoice']
+
+
+def check_regexes(cases, seed=0):
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(cases):
+        alphabet = rng.choice(FUZZ_ALPHABETS)
+        text = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 40)))
+        if rng.random() < 0.3:
+            text = text[:rng.randint(0, len(text))] + rng.choice(FUZZ_FRAGMENTS) + text
+        texts.append(text)
+
+    problems = []
+    for name, (notebook, serving) in REGEX_CHECKS.items():
+        mismatches = [text for text in texts if notebook(text) != serving(text)]
+        if mismatches:
+            problems.append(f"{name}: {len(mismatches)} dari {cases} string berbeda, contoh {mismatches[0]!r}")
+
+    print(f"[regex] {'OK' if not problems else 'MISMATCH'} ({cases} string acak)")
+    for problem in problems:
+        print(f"    - {problem}")
+    return bool(problems)
+
+
+# === TF-IDF LANGSUNG VS SKLEARN ===
+def csr_signature(X):
+    # Representasi persis (bit float64, indeks, indptr) untuk dibandingkan apa adanya
+    X = csr_matrix(X)
+    return X.shape, X.indptr.tolist(), X.indices.tolist(), X.data.astype(np.float64).tobytes()
+
+
+def check_vectorizer(cases, seed=0):
+    """
+    TokenVectorizer vs tfidf.transform pada dokumen acak dari potongan term
+    vocabulary (agar bigram/trigram sering muncul) dan kata di luar vocabulary,
+    per dokumen dan per batch.
+    """
+    rng = random.Random(seed)
+    words = sorted({part for term in tfidf.vocabulary_ for part in term.split(' ')})
+    terms = sorted(tfidf.vocabulary_)
+    docs = []
+    for _ in range(cases):
+        pieces = []
+        for _ in range(rng.randint(0, 60)):
+            roll = rng.random()
+            if roll < 0.4:
+                pieces.append(rng.choice(terms))
+            elif roll < 0.8:
+                pieces.append(rng.choice(words))
+            else:
+                pieces.append(rng.choice(['zzqx', 'ab', 'http', 'x1y', '!!', 'invoice.']))
+        docs.append(' '.join(pieces))
+
+    vectorizer = featurizer.vectorizer
+    problems = []
+    if csr_signature(vectorizer.transform(docs)) != csr_signature(tfidf.transform(docs)):
+        problems.append(f"batch {len(docs)} dokumen berbeda")
+    mismatches = [doc for doc in docs[:2000]
+                  if csr_signature(vectorizer.transform([doc])) != csr_signature(tfidf.transform([doc]))]
+    if mismatches:
+        problems.append(f"{len(mismatches)} dokumen tunggal berbeda, contoh {mismatches[0]!r}")
+    if csr_signature(vectorizer.transform([])) != csr_signature(csr_matrix((0, len(tfidf.vocabulary_)))):
+        problems.append("batch kosong berbeda")
+
+    print(f"[vectorizer] {'OK' if not problems else 'MISMATCH'} ({cases} dokumen acak)")
+    for problem in problems:
+        print(f"    - {problem}")
+    return bool(problems)
+
+
+# === PERBANDINGAN ===
+def compare(name, golden_tfidf, golden_numeric, tfidf_matrix, numeric):
+    """Bandingkan satu jalur dengan golden; kembalikan daftar baris laporan drift."""
+    problems = []
+
+    if tfidf_matrix.shape != golden_tfidf.shape:
+        problems.append(f"tfidf shape {tfidf_matrix.shape} != {golden_tfidf.shape}")
+    else:
+        diff = abs(csr_matrix(tfidf_matrix, dtype=np.float64) - golden_tfidf).tocsr()
+        if diff.nnz:
+            rows = np.unique(diff.nonzero()[0])
+            problems.append(f"tfidf: {len(rows)} rows differ, max |diff| {diff.max():.3g}, first row {rows[0]}")
+
+    # Bandingkan dalam float32, tipe yang benar-benar dilihat XGBoost
+    ours = np.asarray(numeric, dtype=np.float32)
+    gold = np.asarray(golden_numeric, dtype=np.float32)
+    for j, feature in enumerate(numeric_features):
+        mismatch = np.flatnonzero(ours[:, j] != gold[:, j])
+        if len(mismatch):
+            i = mismatch[0]
+            problems.append(
+                f"{feature}: {len(mismatch)} rows differ, max |diff| {np.abs(ours[:, j] - gold[:, j]).max():.6g}, "
+                f"row {i}: {ours[i, j]!r} vs golden {gold[i, j]!r}"
+            )
+
+    status = 'OK' if not problems else f'{len(problems)} MISMATCH(ES)'
+    print(f"[{name}] {status}")
+    for problem in problems:
+        print(f"    - {problem}")
+    return problems
+
+
+def save_golden(corpus, tfidf_matrix, numeric):
+    os.makedirs(GOLDEN_DIR, exist_ok=True)
+    with open(CORPUS_PATH, 'w', encoding='utf-8') as f:
+        json.dump(corpus, f, ensure_ascii=False, indent=1)
+    tfidf_matrix = csr_matrix(tfidf_matrix)
+    np.savez_compressed(
+        FEATURES_PATH,
+        tfidf_data=tfidf_matrix.data, tfidf_indices=tfidf_matrix.indices,
+        tfidf_indptr=tfidf_matrix.indptr, tfidf_shape=np.array(tfidf_matrix.shape),
+        numeric=np.asarray(numeric, dtype=np.float64), numeric_features=np.array(numeric_features)
+    )
+
+
+def load_golden():
+    with open(CORPUS_PATH, encoding='utf-8') as f:
+        corpus = json.load(f)
+    golden = np.load(FEATURES_PATH)
+    if list(golden['numeric_features']) != list(numeric_features):
+        raise SystemExit("numeric_features.pkl berubah sejak golden dibekukan; jalankan --update setelah ditinjau")
+    tfidf_matrix = csr_matrix(
+        (golden['tfidf_data'], golden['tfidf_indices'], golden['tfidf_indptr']),
+        shape=tuple(golden['tfidf_shape'])
+    )
+    return corpus, tfidf_matrix, golden['numeric']
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Paritas fitur notebook vs serving')
+    parser.add_argument('--update', action='store_true', help='bekukan ulang golden dari jalur notebook')
+    parser.add_argument('--paths', nargs='+', choices=sorted(PATHS), default=list(PATHS))
+    parser.add_argument('--engines', nargs='*', choices=sorted(ENGINES), default=list(ENGINES),
+                        help='engine inferensi yang dibandingkan dengan XGBClassifier')
+    parser.add_argument('--regex-cases', type=int, default=20000,
+                        help='jumlah string acak untuk cek regex linear (0 melewati cek)')
+    parser.add_argument('--vectorizer-cases', type=int, default=5000,
+                        help='jumlah dokumen acak untuk cek TF-IDF langsung vs sklearn (0 melewati cek)')
+    args = parser.parse_args()
+
+    if args.update:
+        corpus = build_corpus()
+        tfidf_matrix, numeric = notebook_path(corpus)
+        save_golden(corpus, tfidf_matrix, numeric)
+        print(f"Golden diperbarui: {len(corpus)} email, {len(numeric_features)} fitur numerik")
+        return 0
+
+    corpus, golden_tfidf, golden_numeric = load_golden()
+    print(f"{len(corpus)} email, {len(numeric_features)} fitur numerik, {golden_tfidf.shape[1]} kolom TF-IDF")
+
+    failed = False
+    for name in args.paths:
+        if name == 'bundle' and not os.path.exists(BUNDLE_PATH):
+            print(f"[bundle] dilewati: {BUNDLE_PATH} belum dibangun")
+            continue
+        tfidf_matrix, numeric = PATHS[name](corpus)
+        failed |= bool(compare(name, golden_tfidf, golden_numeric, tfidf_matrix, numeric))
+
+    failed |= check_inference(corpus, args.engines)
+    if args.regex_cases:
+        failed |= check_regexes(args.regex_cases)
+    if args.vectorizer_cases:
+        failed |= check_vectorizer(args.vectorizer_cases)
+
+    print("PARITY FAILED" if failed else "PARITY OK")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,102 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+
+def content_key(email_content, model_version):
+    """
+    Kunci cache: SHA-256 dari isi email + versi model.
+
+    Normalisasi sengaja hanya sebatas encoding UTF-8: fitur seperti
+    exclamation_ratio, text_length dan mid_sentence_exclamation_ratio peka
+    terhadap whitespace, jadi dua email yang berbeda satu spasi pun bisa
+    mendapat skor berbeda dan tidak boleh berbagi entri cache.
+    """
+    digest = hashlib.sha256()
+    digest.update(str(model_version).encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(email_content.encode('utf-8', 'surrogatepass'))
+    return digest.hexdigest()
+
+
+class PredictionCache:
+    """Cache hasil prediksi in-process dengan batas ukuran (LRU) dan TTL."""
+
+    def __init__(self, max_entries=10000, ttl_seconds=3600, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._model_version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0
+
+    def ensure_model_version(self, model_version):
+        # Model berganti -> semua hasil lama tidak berlaku lagi
+        with self._lock:
+            if self._model_version is not None and self._model_version != model_version:
+                self._entries.clear()
+                self.invalidations += 1
+            self._model_version = model_version
+
+    def get(self, key):
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(value)
+
+    def put(self, key, value):
+        if not self.enabled:
+            return
+
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl_seconds, dict(value))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+                'model_version': self._model_version
+            }
@@ -0,0 +1,205 @@
+"""
+Server pre-fork: model dimuat sekali di proses master, worker di-fork darinya.
+
+Halaman memori hasil fork dipakai bersama sampai ada yang menulisinya
+(copy-on-write). Sebelum fork, master:
+
+1. memuat app (model, vocabulary TF-IDF, tabel kata kunci, library) sekali;
+2. memanaskan jalur scoring (dengan dan tanpa penjelasan) agar import lazy,
+   buffer XGBoost/pred_contribs dan cache regex sudah ada di master;
+3. memanggil gc.collect() lalu gc.freeze(): objek yang sudah ada dipindah ke
+   generasi permanen, sehingga garbage collector di worker tidak pernah
+   menulis header GC-nya. Tanpa ini setiap koleksi penuh di worker menyalin
+   hampir semua halaman heap Python (lihat `benchmark.py prefork`).
+
+Booster XGBoost (heap C++), idf dan matriks model (array NumPy) hanya dibaca
+saat scoring, jadi tetap dipakai bersama. Memori privat yang tersisa per
+worker sebagian besar berasal dari alokasi baru yang mengisi slot kosong di
+arena/heap warisan master, bukan dari refcount artefak model.
+
+Setiap worker melayani app Flask (werkzeug, satu request per waktu) dari
+socket yang sama. Cache prediksi, indeks kampanye, micro-batcher dan metrik
+tetap per worker; /metrics hanya menampilkan worker yang menjawab.
+/admin/reload hanya menukar model di worker yang menerima request; untuk
+semua worker gunakan MODEL_REGISTRY + MODEL_WATCH_INTERVAL (versi baru
+dimuat per worker, tidak dipakai bersama) atau kirim SIGHUP ke master: model
+CURRENT dimuat ulang di master lalu worker diganti satu per satu.
+
+Konfigurasi (env, atau argumen CLI):
+    PREFORK_WORKERS      jumlah worker (default: jumlah CPU)
+    PREFORK_FREEZE       0 untuk melewati gc.freeze (pembanding memori)
+
+FEATURE_WORKERS > 1 tidak didukung: setiap worker sudah satu proses.
+
+Jalankan:
+    python prefork.py --host 0.0.0.0 --port 5000 --workers 4
+"""
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+
+PREFORK_WORKERS = int(os.environ.get('PREFORK_WORKERS', 0)) or os.cpu_count() or 1
+PREFORK_FREEZE = os.environ.get('PREFORK_FREEZE', '1') != '0'
+
+# Worker yang mati lebih cepat dari ini setelah start dianggap crash saat startup
+MIN_WORKER_LIFETIME = 1.0
+
+
+def warm_up(app):
+    """Jalankan jalur scoring di master (tanpa cache dan tanpa watcher) sebelum fork."""
+    from model_registry import SMOKE_EMAILS
+
+    state = app.model_holder.current
+    for explain in (True, False):
+        app.score_emails(SMOKE_EMAILS, state=state, explain=explain)
+        for email_content in SMOKE_EMAILS:
+            app.score_emails([email_content], state=state, explain=explain)
+
+
+def share_memory(app, freeze=PREFORK_FREEZE):
+    warm_up(app)
+    gc.collect()
+    if freeze:
+        gc.freeze()
+
+
+def serve_worker(app, listener):
+    """Loop worker: melayani Flask dari socket bersama sampai SIGTERM/SIGINT."""
+    from werkzeug.serving import make_server
+
+    host, port = listener.getsockname()[:2]
+    server = make_server(host, port, app.app, fd=listener.fileno())
+
+    def stop(signum, frame):
+        # shutdown() menunggu serve_forever selesai, jadi dipanggil dari thread lain
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGHUP, signal.SIG_DFL)
+    server.serve_forever()
+
+
+class PreforkServer:
+    """Master: memuat app sekali, mem-fork `workers` worker dan menggantinya jika mati."""
+
+    def __init__(self, host='127.0.0.1', port=5000, workers=PREFORK_WORKERS, freeze=PREFORK_FREEZE):
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.freeze = freeze
+        self.app = None
+        self.listener = None
+        self.pids = {}
+        self._stopping = False
+        self._reload = False
+
+    def start(self):
+        if int(os.environ.get('FEATURE_WORKERS', 1)) > 1:
+            raise SystemExit("FEATURE_WORKERS > 1 tidak didukung dengan prefork (worker sudah proses terpisah)")
+        import app
+
+        self.app = app
+        share_memory(app, self.freeze)
+        self.listener = socket.create_server((self.host, self.port), backlog=128)
+        self.listener.set_inheritable(True)
+        for _ in range(self.workers):
+            self.spawn()
+
+    def spawn(self):
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                serve_worker(self.app, self.listener)
+            except BaseException:
+                import traceback
+                traceback.print_exc()
+                code = 1
+            finally:
+                os._exit(code)
+        self.pids[pid] = time.monotonic()
+        return pid
+
+    def reload_model(self):
+        """SIGHUP: muat ulang CURRENT di master, bekukan lagi, lalu ganti worker satu per satu."""
+        try:
+            self.app.model_holder.reload()
+            share_memory(self.app, self.freeze)
+        except Exception as e:
+            print(f"Reload model di master gagal, worker lama tetap melayani: {e}")
+            return
+        for pid in list(self.pids):
+            self.spawn()
+            self.retire(pid)
+
+    def retire(self, pid):
+        self.pids.pop(pid, None)
+        try:
+            os.kill(pid, signal.SIGTERM)
+            os.waitpid(pid, 0)
+        except (ProcessLookupError, ChildProcessError):
+            pass
+
+    def serve_forever(self):
+        def stop(signum, frame):
+            self._stopping = True
+
+        def reload(signum, frame):
+            self._reload = True
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+        signal.signal(signal.SIGHUP, reload)
+        print(f"Prefork: {self.workers} worker di http://{self.host}:{self.port} "
+              f"(master {os.getpid()}, gc.freeze {'aktif' if self.freeze else 'mati'})")
+        try:
+            while not self._stopping:
+                if self._reload:
+                    self._reload = False
+                    self.reload_model()
+                try:
+                    pid, status = os.waitpid(-1, os.WNOHANG)
+                except ChildProcessError:
+                    pid = 0
+                if pid == 0:
+                    time.sleep(0.2)
+                    continue
+                started = self.pids.pop(pid, None)
+                if started is None or self._stopping:
+                    continue
+                if time.monotonic() - started < MIN_WORKER_LIFETIME:
+                    raise SystemExit(f"Worker {pid} berhenti saat startup (status {status})")
+                print(f"Worker {pid} berhenti (status {status}), diganti")
+                self.spawn()
+        finally:
+            self.stop()
+
+    def stop(self):
+        for pid in list(self.pids):
+            self.retire(pid)
+        if self.listener is not None:
+            self.listener.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Layanan deteksi phishing, pre-fork multi-worker')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5000)
+    parser.add_argument('--workers', type=int, default=PREFORK_WORKERS)
+    parser.add_argument('--no-freeze', action='store_true', help='lewati gc.freeze (pembanding memori)')
+    args = parser.parse_args()
+
+    server = PreforkServer(args.host, args.port, args.workers, PREFORK_FREEZE and not args.no_freeze)
+    server.start()
+    server.serve_forever()
+    sys.exit(0)
+
+
+if __name__ == '__main__':
+    main()